@@ -0,0 +1,204 @@
+import json
+import os
+import time
+import tracemalloc
+import warnings
+
+import pytest
+
+from karen import cleaning, utils
+from karen.adapters.espn import EspnAdapter
+
+from synthetic import SCALES, make_league
+
+
+# Differences this small are noise, not regressions
+NOISE = {"seconds": 0.01, "peak_mb": 1.0}
+
+# Timings from another machine are only a rough guide, so regressions are
+# just reported unless this is set
+STRICT_ENV = "KAREN_BENCHMARK_STRICT"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--scale",
+        action="append",
+        choices=list(SCALES),
+        help="League size(s) to benchmark at (default: small and medium).",
+    )
+    group.addoption(
+        "--rounds",
+        type=int,
+        default=3,
+        help="Times to run each function, the fastest run is reported.",
+    )
+    group.addoption(
+        "--karen-benchmark-save", help="Write the results to this JSON file."
+    )
+    group.addoption(
+        "--karen-benchmark-compare",
+        help=(
+            "Report anything slower or bigger than in this saved JSON file "
+            f"(and fail it if {STRICT_ENV} is set)."
+        ),
+    )
+    group.addoption(
+        "--karen-benchmark-tolerance",
+        type=float,
+        default=1.5,
+        help="How many times worse than the saved results is a regression.",
+    )
+
+
+def pytest_configure(config):
+    config.karen_benchmark_results = {}
+    config.karen_benchmark_baseline = {}
+    config.karen_benchmark_regressions = {}
+
+    path = config.getoption("--karen-benchmark-compare")
+    if path:
+        with open(path) as f:
+            config.karen_benchmark_baseline = json.load(f)
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = metafunc.config.getoption("--scale") or ["small", "medium"]
+        metafunc.parametrize("scale", scales, scope="session")
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    # Streamlit complains about running without a server
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+@pytest.fixture(scope="session")
+def league(scale):
+    return make_league(scale)
+
+
+@pytest.fixture(scope="session")
+def adapter(league):
+    return EspnAdapter(league)
+
+
+@pytest.fixture(scope="session")
+def player_df(league, adapter):
+    return cleaning.build_player_scores(league.current_week - 1, adapter)
+
+
+@pytest.fixture(scope="session")
+def rosters(league, adapter):
+    return adapter.get_rosters(league.current_week)
+
+
+@pytest.fixture(scope="session")
+def free_agents(league, adapter):
+    return adapter.get_free_agents(league.current_week)
+
+
+@pytest.fixture
+def fantasy_pros(monkeypatch):
+    """
+    Answer FantasyPros comparisons locally, agreeing with every other swap.
+    """
+
+    def get_recommendations(pairs, week=None, **kwargs):
+        recommendations = {}
+        for i, (player1, player2) in enumerate(dict.fromkeys(pairs)):
+            if i % 2:
+                recommendations[(player1, player2)] = {}
+            else:
+                recommendations[(player1, player2)] = {
+                    player1: "60%",
+                    player2: "40%",
+                    "url": "https://www.fantasypros.com/nfl/start/",
+                }
+        return recommendations
+
+    monkeypatch.setattr(
+        utils, "get_fantasy_pros_recommendations", get_recommendations
+    )
+
+
+@pytest.fixture
+def karen_benchmark(request):
+    """
+    Time a function over a few rounds and measure its peak memory, then
+    compare both against the saved baseline (if there is one).
+    Regressions are reported at the end, or fail the test if STRICT_ENV is
+    set.
+    """
+    config = request.config
+
+    def run(func, *args, **kwargs):
+        timings = []
+        for _ in range(config.getoption("--rounds")):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+
+        # Peak memory gets its own run, tracing slows everything down
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        stats = {"seconds": min(timings), "peak_mb": peak / 2 ** 20}
+        config.karen_benchmark_results[request.node.nodeid] = stats
+
+        baseline = config.karen_benchmark_baseline.get(request.node.nodeid)
+        if baseline:
+            tolerance = config.getoption("--karen-benchmark-tolerance")
+            regressions = [
+                f"{stat} went from {baseline[stat]:.3f} to {stats[stat]:.3f}"
+                for stat in stats
+                if stats[stat] > baseline[stat] * tolerance + NOISE[stat]
+            ]
+            if regressions:
+                message = f"Regressed: {', '.join(regressions)}"
+                if os.environ.get(STRICT_ENV):
+                    pytest.fail(message)
+                config.karen_benchmark_regressions[
+                    request.node.nodeid
+                ] = message
+
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.karen_benchmark_results
+    if not results:
+        return
+
+    terminalreporter.section("benchmarks")
+    width = max(len(name) for name in results)
+    terminalreporter.write_line(
+        f"{'Benchmark':<{width}}  {'Seconds':>9}  {'Peak MB':>9}"
+    )
+    for name, stats in sorted(results.items()):
+        terminalreporter.write_line(
+            f"{name:<{width}}  {stats['seconds']:>9.4f}"
+            f"  {stats['peak_mb']:>9.2f}"
+        )
+
+    regressions = config.karen_benchmark_regressions
+    if regressions:
+        terminalreporter.write_line("")
+        for name, message in sorted(regressions.items()):
+            terminalreporter.write_line(f"{name}: {message}", yellow=True)
+
+    path = config.getoption("--karen-benchmark-save")
+    if path:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        terminalreporter.write_line(f"Saved benchmarks to {path}")
@@ -0,0 +1,239 @@
+import random
+
+from types import SimpleNamespace
+
+from espn_api.football import League
+
+
+# Starting slots per position, everyone else sits on the bench
+STARTERS = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "D/ST": 1, "K": 1}
+BENCH_POSITIONS = ["QB", "RB", "WR", "TE"]
+
+# Sizes to benchmark at: (teams, weeks, roster size, free agents)
+SCALES = {
+    "small": {"teams": 8, "weeks": 4, "roster_size": 14, "free_agents": 50},
+    "medium": {
+        "teams": 10,
+        "weeks": 13,
+        "roster_size": 16,
+        "free_agents": 200,
+    },
+    "large": {
+        "teams": 16,
+        "weeks": 17,
+        "roster_size": 20,
+        "free_agents": 500,
+    },
+}
+
+
+class FakePlayer:
+    """
+    A rostered (or free agent) player, like `espn_api.football.Player`.
+    """
+
+    def __init__(self, player_id, position, weeks, rnd):
+        self.playerId = player_id
+        self.name = f"{position} Player {player_id}"
+        self.position = position
+        self.posRank = rnd.randint(1, 60)
+        self.projected_points = round(rnd.uniform(0, 25), 1)
+
+        # Week 0 holds the season projection, like ESPN
+        self.stats = {0: {"projected_points": round(rnd.uniform(20, 300), 1)}}
+        for week in range(1, weeks + 2):
+            self.stats[week] = {
+                "projected_points": round(rnd.uniform(0, 25), 1)
+            }
+
+
+class FakeBoxPlayer:
+    """
+    A player's line in a box score, like `espn_api.football.BoxPlayer`.
+    """
+
+    def __init__(self, player, slot_position, rnd):
+        self.playerId = player.playerId
+        self.name = player.name
+        self.position = player.position
+        self.slot_position = slot_position
+        self.points = round(rnd.uniform(-2, 35), 2)
+        self.projected_points = round(rnd.uniform(0, 25), 2)
+
+
+class FakeTeam:
+    """
+    A fantasy team, like `espn_api.football.Team`.
+    """
+
+    def __init__(self, team_id, roster):
+        self.team_id = team_id
+        self.team_name = f"Team {team_id}"
+        self.roster = roster
+
+        # Filled in as the season is played
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.standing = 0
+        self.points_for = 0.0
+        self.points_against = 0.0
+        self.scores = []
+        self.mov = []
+        self.schedule = []
+
+
+class FakeBoxScore:
+    """
+    One matchup's box score, like `espn_api.football.BoxScore`. The away
+    team is 0 when the home team is on a bye.
+    """
+
+    def __init__(self, home_team, away_team, home_lineup, away_lineup):
+        self.home_team = home_team
+        self.away_team = away_team
+        self.home_lineup = home_lineup
+        self.away_lineup = away_lineup
+        self.home_score = sum(
+            p.points for p in home_lineup if p.slot_position != "BE"
+        )
+        self.away_score = sum(
+            p.points for p in away_lineup if p.slot_position != "BE"
+        )
+
+
+class FakeLeague:
+    """
+    A whole season of a synthetic league, like `espn_api.football.League`,
+    for running the cleaning functions without touching ESPN.
+
+    Box scores exist for weeks 1 through `current_week`, the last of which is
+    "in progress". Everything is generated from `seed`, so the same arguments
+    always build the same league.
+    """
+
+    def __init__(
+        self,
+        teams=10,
+        weeks=13,
+        roster_size=16,
+        free_agents=200,
+        seed=0,
+        league_id=1,
+        year=2020,
+    ):
+        rnd = random.Random(seed)
+        self.league_id = league_id
+        self.year = year
+        self.current_week = weeks
+        self.settings = SimpleNamespace(name="Synthetic League")
+
+        self._next_player_id = 0
+        starters = sum(STARTERS.values())
+
+        self.teams = []
+        for team_id in range(1, teams + 1):
+            roster = [
+                self._make_player(position, weeks, rnd)
+                for position, count in STARTERS.items()
+                for _ in range(count)
+            ]
+            roster += [
+                self._make_player(rnd.choice(BENCH_POSITIONS), weeks, rnd)
+                for _ in range(max(roster_size - starters, 0))
+            ]
+            self.teams.append(FakeTeam(team_id, roster))
+
+        self._box_scores = {
+            week: self._play_week(rnd) for week in range(1, weeks + 1)
+        }
+        for standing, team in enumerate(
+            sorted(self.teams, key=lambda t: (-t.wins, -t.points_for)),
+            start=1,
+        ):
+            team.standing = standing
+
+        self._free_agents = [
+            self._make_player(rnd.choice(list(STARTERS)), weeks, rnd)
+            for _ in range(free_agents)
+        ]
+
+    def _make_player(self, position, weeks, rnd):
+        self._next_player_id += 1
+        return FakePlayer(self._next_player_id, position, weeks, rnd)
+
+    def _make_lineup(self, team, rnd):
+        starters = sum(STARTERS.values())
+        lineup = []
+        for i, player in enumerate(team.roster):
+            # Some players don't show up in a week's box score
+            if rnd.random() < 0.05:
+                continue
+            slot_position = player.position if i < starters else "BE"
+            lineup.append(FakeBoxPlayer(player, slot_position, rnd))
+        return lineup
+
+    def _play_week(self, rnd):
+        order = self.teams[:]
+        rnd.shuffle(order)
+
+        box_scores = []
+        if len(order) % 2:
+            bye_team = order.pop()
+            box_score = FakeBoxScore(
+                bye_team, 0, self._make_lineup(bye_team, rnd), []
+            )
+            box_scores.append(box_score)
+            # ESPN plays a bye against the team itself, for a margin of 0
+            bye_team.scores.append(box_score.home_score)
+            bye_team.mov.append(0.0)
+            bye_team.schedule.append(bye_team)
+
+        for home, away in zip(order[::2], order[1::2]):
+            box_score = FakeBoxScore(
+                home,
+                away,
+                self._make_lineup(home, rnd),
+                self._make_lineup(away, rnd),
+            )
+            box_scores.append(box_score)
+
+            sides = [
+                (home, away, box_score.home_score, box_score.away_score),
+                (away, home, box_score.away_score, box_score.home_score),
+            ]
+            for team, opponent, score, opponent_score in sides:
+                team.scores.append(score)
+                team.mov.append(score - opponent_score)
+                team.schedule.append(opponent)
+                team.points_for += score
+                team.points_against += opponent_score
+                if score > opponent_score:
+                    team.wins += 1
+                elif score < opponent_score:
+                    team.losses += 1
+                else:
+                    team.ties += 1
+
+        return box_scores
+
+    def box_scores(self, week=None):
+        return self._box_scores[week or self.current_week]
+
+    def free_agents(self, week=None, size=50, position=None):
+        free_agents = self._free_agents
+        if position:
+            free_agents = [p for p in free_agents if p.position == position]
+        return free_agents[:size]
+
+    def power_rankings(self, week=None):
+        # ESPN's own two step dominance, run over the synthetic schedule
+        return League.power_rankings(self, week=week)
+
+
+def make_league(scale="medium", seed=0, **kwargs):
+    """
+    Build a FakeLeague at one of the SCALES, with any of its sizes
+    overridden by `kwargs`.
+    """
+    return FakeLeague(**{**SCALES[scale], **kwargs}, seed=seed)
@@ -0,0 +1,122 @@
+import pytest
+
+from karen import cleaning
+
+
+def test_build_player_scores(karen_benchmark, league, adapter):
+    df = karen_benchmark(
+        cleaning.build_player_scores, league.current_week - 1, adapter
+    )
+    assert not df.empty
+
+
+@pytest.mark.parametrize("mode", cleaning.LUCK_MODES)
+def test_build_luck_df(karen_benchmark, player_df, mode):
+    df = karen_benchmark(cleaning.build_luck_df, player_df, mode=mode)
+    assert not df.empty
+
+
+def test_build_matchups_df(karen_benchmark, player_df):
+    df = karen_benchmark(cleaning.build_matchups_df, player_df)
+    assert not df.empty
+
+
+def test_build_team_df_w_results(karen_benchmark, league, player_df):
+    team_name = league.teams[0].team_name
+    df = karen_benchmark(
+        cleaning.build_team_df_w_results, team_name, player_df
+    )
+    assert not df.empty
+
+
+def test_build_power_ranking_scores(karen_benchmark, adapter, player_df):
+    teams = adapter.get_teams()
+    matchups_df = cleaning.build_matchups_df(player_df)
+    df = karen_benchmark(
+        cleaning.build_power_ranking_scores, matchups_df, teams["Team ID"]
+    )
+    assert df.shape == (player_df["Week"].max(), len(teams))
+
+
+def test_build_power_rankings_history(karen_benchmark, adapter, player_df):
+    teams = adapter.get_teams()
+    scores = cleaning.build_power_ranking_scores(
+        cleaning.build_matchups_df(player_df), teams["Team ID"]
+    )
+    df = karen_benchmark(cleaning.build_power_rankings_history, scores, teams)
+    assert len(df) == scores.size
+
+
+def test_build_base_power_rankings_df(
+    karen_benchmark, league, adapter, player_df
+):
+    teams = adapter.get_teams()
+    scores = cleaning.build_power_ranking_scores(
+        cleaning.build_matchups_df(player_df), teams["Team ID"]
+    )
+    power_rankings = cleaning.get_power_rankings(scores, league.current_week)
+    df = karen_benchmark(
+        cleaning.build_base_power_rankings_df, teams, power_rankings
+    )
+    assert len(df) == len(league.teams)
+
+
+def test_get_recommendations(
+    karen_benchmark, league, rosters, free_agents, fantasy_pros
+):
+    team_name = league.teams[0].team_name
+    karen_benchmark(
+        cleaning.get_recommendations,
+        team_name,
+        rosters,
+        free_agents,
+        league.current_week,
+    )
+
+
+def test_get_league_free_agents_dfs(
+    karen_benchmark, league, rosters, free_agents, fantasy_pros
+):
+    dfs = karen_benchmark(
+        cleaning.get_league_free_agents_dfs,
+        rosters,
+        free_agents,
+        league.current_week,
+    )
+    assert len(dfs) == len(league.teams)
+
+
+def test_build_summary_cubes(karen_benchmark, player_df):
+    karen_benchmark(cleaning.build_summary_cubes, player_df)
+
+
+def test_build_team_summary(karen_benchmark, player_df):
+    df = karen_benchmark(cleaning.build_team_summary, player_df)
+    assert not df.empty
+
+
+def test_build_player_summary(karen_benchmark, player_df):
+    df = karen_benchmark(cleaning.build_player_summary, player_df)
+    assert not df.empty
+
+
+@pytest.mark.parametrize("mode", cleaning.TOP_POSITIONS_MODES)
+def test_build_top_positions_df(karen_benchmark, player_df, mode):
+    df = karen_benchmark(cleaning.build_top_positions_df, player_df, mode=mode)
+    assert not df.empty
+
+
+def test_summaries_from_cubes(karen_benchmark, player_df):
+    cubes = cleaning.build_summary_cubes(player_df)
+    last_week = int(player_df["Week"].max())
+
+    def summarize(week_range):
+        cleaning.build_team_summary(
+            player_df, week_range=week_range, cubes=cubes
+        )
+        cleaning.build_player_summary(
+            player_df, week_range=week_range, cubes=cubes
+        )
+
+    # What the app does on every slider move
+    karen_benchmark(summarize, (1, last_week))
@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+
+# The records every adapter turns its platform's data into. They're plain
+# dataframes with these columns, so everything built from them can be
+# cached, serialized and benchmarked without a network client.
+
+# Who played who each week. "Opponent" is "" and "Opponent ID" is NaN for
+# teams on a bye.
+MATCHUP_COLUMNS = ["Week", "Team", "Team ID", "Opponent", "Opponent ID"]
+
+# Every player in every team's lineup each week, in lineup order
+LINEUP_COLUMNS = [
+    "Week",
+    "Team ID",
+    "Player Name",
+    "Points",
+    "Projected Points",
+    "Position",
+    "Slot",
+]
+
+# Each team's record so far
+TEAM_COLUMNS = [
+    "Team",
+    "Team ID",
+    "Wins",
+    "Losses",
+    "Standing",
+    "Points For",
+    "Points Against",
+]
+
+# Players on a team's roster, or available as free agents. "Position Rank"
+# is NaN for players with no rank at all. "Projected Points" are for the
+# week the records are for, "Season Projected Points" for the whole season.
+FREE_AGENT_COLUMNS = [
+    "Player Name",
+    "Position",
+    "Position Rank",
+    "Projected Points",
+    "Season Projected Points",
+]
+ROSTER_COLUMNS = ["Team", "Team ID"] + FREE_AGENT_COLUMNS
+
+# A week's power rankings, best team first (see
+# karen.cleaning.get_power_rankings)
+POWER_RANKING_COLUMNS = ["Team ID", "Power Ranking Score"]
+
+
+def build_records(rows, columns):
+    """
+    Build records from a list of row dicts (or tuples in `columns` order),
+    with the right columns even when there are no rows.
+    """
+    return pd.DataFrame(rows, columns=columns)
+
+
+def to_number(value):
+    """
+    Convert a possibly missing number to a float, with NaN for missing ones.
+    """
+    return np.nan if value is None or value == [] else float(value)
+
+
+class BaseAdapter(ABC):
+    """
+    Fetches a league's data from a platform and normalizes it into records.
+
+    Platforms that don't have some kind of record raise NotImplementedError
+    for it.
+    """
+
+    platform = None
+
+    @abstractmethod
+    def iter_weeks(self, weeks, max_workers=4):
+        """
+        Yield (week, matchups, lineups) for each week as soon as it has
+        loaded, fetching up to `max_workers` at a time. Weeks are yielded in
+        the order they finish loading.
+        """
+        pass
+
+    @abstractmethod
+    def get_teams(self):
+        pass
+
+    def get_rosters(self, week):
+        raise NotImplementedError(f"{self.platform} doesn't have rosters!")
+
+    def get_free_agents(self, week, size=200):
+        raise NotImplementedError(
+            f"{self.platform} doesn't have free agent projections!"
+        )
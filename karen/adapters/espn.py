@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+from karen import utils
+from karen.adapters.base import (
+    FREE_AGENT_COLUMNS,
+    LINEUP_COLUMNS,
+    MATCHUP_COLUMNS,
+    ROSTER_COLUMNS,
+    TEAM_COLUMNS,
+    BaseAdapter,
+    build_records,
+    to_number,
+)
+from karen.instrumentation import timed
+
+
+def get_box_score_sides(box_score):
+    """
+    Get (team, opponent, lineup) for each side of a box score that has a
+    team, away side first. The opponent is None on a bye.
+    """
+    home_exists = True
+    away_exists = True
+
+    if box_score.away_team == 0:
+        away_exists = False
+
+    elif box_score.home_team == 0:
+        home_exists = False
+
+    sides = []
+
+    if away_exists:
+        opponent = box_score.home_team if home_exists else None
+        sides.append((box_score.away_team, opponent, box_score.away_lineup))
+
+    if home_exists:
+        opponent = box_score.away_team if away_exists else None
+        sides.append((box_score.home_team, opponent, box_score.home_lineup))
+
+    return sides
+
+
+def build_week_records(week, box_scores):
+    """
+    Build a week's matchup and lineup records from its box scores.
+
+    Each lineup column is filled into an array sized up front from the
+    lineups, so no per-row Python lists are built along the way.
+    """
+    sides = []
+    for box_score in box_scores:
+        sides += get_box_score_sides(box_score)
+    n_rows = sum(len(lineup) for _, _, lineup in sides)
+
+    lineups = {
+        "Week": np.full(n_rows, week),
+        "Team ID": np.empty(n_rows, dtype=np.int64),
+        "Player Name": np.empty(n_rows, dtype=object),
+        "Points": np.empty(n_rows),
+        "Projected Points": np.empty(n_rows),
+        "Position": np.empty(n_rows, dtype=object),
+        "Slot": np.empty(n_rows, dtype=object),
+    }
+
+    start = 0
+    for team, _, lineup in sides:
+        end = start + len(lineup)
+        lineups["Team ID"][start:end] = team.team_id
+
+        for i, player in enumerate(lineup, start=start):
+            lineups["Player Name"][i] = player.name
+            lineups["Points"][i] = player.points
+            lineups["Projected Points"][i] = player.projected_points
+            lineups["Position"][i] = player.position
+            lineups["Slot"][i] = player.slot_position
+
+        start = end
+
+    matchups = [
+        (
+            week,
+            team.team_name,
+            team.team_id,
+            opponent.team_name if opponent else "",
+            opponent.team_id if opponent else None,
+        )
+        for team, opponent, _ in sides
+    ]
+
+    return (
+        build_records(matchups, MATCHUP_COLUMNS),
+        pd.DataFrame(lineups, columns=LINEUP_COLUMNS),
+    )
+
+
+def get_season_projection(player):
+    return player.stats.get(0, {}).get("projected_points")
+
+
+def build_player_record(player, projected_points):
+    return (
+        player.name,
+        player.position,
+        to_number(player.posRank),
+        to_number(projected_points),
+        to_number(get_season_projection(player)),
+    )
+
+
+class EspnAdapter(BaseAdapter):
+    """
+    Records from an `espn_api.football.League`.
+    """
+
+    platform = "ESPN"
+
+    def __init__(self, league):
+        self.league = league
+
+    def iter_weeks(self, weeks, max_workers=4):
+        for week, box_scores in utils.iter_box_scores(
+            self.league, weeks, max_workers=max_workers
+        ):
+            yield (week, *build_week_records(week, box_scores))
+
+    def get_teams(self):
+        return build_records(
+            [
+                (
+                    team.team_name,
+                    team.team_id,
+                    team.wins,
+                    team.losses,
+                    team.standing,
+                    team.points_for,
+                    team.points_against,
+                )
+                for team in self.league.teams
+            ],
+            TEAM_COLUMNS,
+        )
+
+    def get_rosters(self, week):
+        return build_records(
+            [
+                (team.team_name, team.team_id)
+                + build_player_record(
+                    player,
+                    player.stats.get(week, {}).get("projected_points"),
+                )
+                for team in self.league.teams
+                for player in team.roster
+            ],
+            ROSTER_COLUMNS,
+        )
+
+    @timed()
+    def get_free_agents(self, week, size=200):
+        return build_records(
+            [
+                build_player_record(player, player.projected_points)
+                for player in self.league.free_agents(week=week, size=size)
+            ],
+            FREE_AGENT_COLUMNS,
+        )
@@ -0,0 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from karen.adapters.base import (
+    LINEUP_COLUMNS,
+    MATCHUP_COLUMNS,
+    TEAM_COLUMNS,
+    BaseAdapter,
+    build_records,
+)
+from karen.instrumentation import timed
+
+
+# Yahoo's positions and lineup slots, as ESPN names them
+YAHOO_POSITIONS = {
+    "BN": "BE",
+    "DEF": "D/ST",
+    "W/R/T": "RB/WR/TE",
+    "W/R": "RB/WR",
+    "W/T": "WR/TE",
+    "Q/W/R/T": "OP",
+}
+
+
+def merge_fields(fields):
+    """
+    Merge a Yahoo resource, a list of single-key dicts (and lists of them,
+    with the odd empty list) into one dict.
+    """
+    merged = {}
+    for field in fields:
+        if isinstance(field, list):
+            merged.update(merge_fields(field))
+        elif isinstance(field, dict):
+            merged.update(field)
+    return merged
+
+
+def get_collection(collection, name):
+    """
+    Get the `name` resources in a Yahoo collection, which looks like
+    `{"0": {name: ...}, "1": {name: ...}, "count": 2}`. Empty collections
+    come back as empty lists.
+    """
+    if not isinstance(collection, dict):
+        return []
+    return [collection[str(i)][name] for i in range(int(collection["count"]))]
+
+
+def get_league_key(league_keys, league_id):
+    """
+    Find a league's key (e.g. "399.l.12345") among a user's league keys.
+    """
+    for league_key in league_keys:
+        if league_key.split(".l.")[-1] == str(league_id):
+            return league_key
+    raise ValueError(f"Could not find Yahoo league {league_id}!")
+
+
+def get_position(player):
+    position = player.get("primary_position") or player[
+        "display_position"
+    ].split(",")[0]
+    return YAHOO_POSITIONS.get(position, position)
+
+
+def parse_league(response):
+    """
+    Get the league's name and weeks from a `league/<key>` response.
+    """
+    league = merge_fields(response["fantasy_content"]["league"])
+    return {
+        "name": league["name"],
+        "start_week": int(league["start_week"]),
+        "current_week": int(league["current_week"]),
+        "end_week": int(league["end_week"]),
+        "is_finished": bool(int(league.get("is_finished", 0))),
+    }
+
+
+def parse_teams(response):
+    """
+    Build team records from a `league/<key>/standings` response.
+    """
+    league = merge_fields(response["fantasy_content"]["league"])
+
+    rows = []
+    for team in get_collection(league["standings"][0]["teams"], "team"):
+        team = merge_fields(team)
+        standings = team["team_standings"]
+        rows.append(
+            (
+                team["name"],
+                int(team["team_id"]),
+                int(standings["outcome_totals"]["wins"]),
+                int(standings["outcome_totals"]["losses"]),
+                int(standings["rank"] or 0),
+                float(standings["points_for"]),
+                float(standings["points_against"]),
+            )
+        )
+    return build_records(rows, TEAM_COLUMNS)
+
+
+def parse_matchups(response, weeks):
+    """
+    Build matchup records for `weeks` from a
+    `league/<key>/teams/matchups;weeks=...` response. Teams without a
+    matchup in a week are on a bye.
+    """
+    league = merge_fields(response["fantasy_content"]["league"])
+
+    rows = []
+    for team in get_collection(league["teams"], "team"):
+        team = merge_fields(team)
+
+        opponents = {}
+        for matchup in get_collection(team["matchups"], "matchup"):
+            sides = [
+                merge_fields(side)
+                for side in get_collection(matchup["0"]["teams"], "team")
+            ]
+            opponents[int(matchup["week"])] = [
+                s for s in sides if s["team_key"] != team["team_key"]
+            ]
+
+        for week in weeks:
+            opponent = (opponents.get(week) or [None])[0]
+            rows.append(
+                (
+                    week,
+                    team["name"],
+                    int(team["team_id"]),
+                    opponent["name"] if opponent else "",
+                    int(opponent["team_id"]) if opponent else None,
+                )
+            )
+    return build_records(rows, MATCHUP_COLUMNS)
+
+
+def parse_lineups(week, response):
+    """
+    Build a week's lineup records from a
+    `league/<key>/teams/roster;week=<week>/players/stats;type=week;week=<week>`
+    response.
+
+    Yahoo's API doesn't have player projections, so "Projected Points" are
+    all 0.
+    """
+    league = merge_fields(response["fantasy_content"]["league"])
+
+    rows = []
+    for team in get_collection(league["teams"], "team"):
+        team = merge_fields(team)
+        players = team["roster"]["0"]["players"]
+        for player in get_collection(players, "player"):
+            player = merge_fields(player)
+            slot = merge_fields(player["selected_position"])["position"]
+            rows.append(
+                (
+                    week,
+                    int(team["team_id"]),
+                    player["name"]["full"],
+                    float(player["player_points"]["total"]),
+                    0.0,
+                    get_position(player),
+                    YAHOO_POSITIONS.get(slot, slot),
+                )
+            )
+    return build_records(rows, LINEUP_COLUMNS)
+
+
+class YahooAdapter(BaseAdapter):
+    """
+    Records from Yahoo's Fantasy Sports API. `get(uri)` returns the JSON
+    response for an API URI, e.g. `yahoo_fantasy_api.yhandler.YHandler.get`.
+
+    Requests are batched across teams and weeks wherever the API allows.
+    """
+
+    platform = "Yahoo"
+
+    def __init__(self, get, league_key):
+        self.get = get
+        self.league_key = league_key
+
+    def get_league(self):
+        return parse_league(self.get(f"league/{self.league_key}"))
+
+    @timed()
+    def get_teams(self):
+        return parse_teams(self.get(f"league/{self.league_key}/standings"))
+
+    @timed()
+    def get_matchups(self, weeks):
+        """
+        Get every team's matchups for several weeks, in one request.
+        """
+        weeks = list(weeks)
+        uri = (
+            f"league/{self.league_key}/teams/matchups;"
+            f"weeks={','.join(str(w) for w in weeks)}"
+        )
+        return parse_matchups(self.get(uri), weeks)
+
+    @timed()
+    def get_lineups(self, week):
+        """
+        Get every team's lineup for a week, in one request.
+        """
+        uri = (
+            f"league/{self.league_key}/teams/roster;week={week}"
+            f"/players/stats;type=week;week={week}"
+        )
+        return parse_lineups(week, self.get(uri))
+
+    def iter_weeks(self, weeks, max_workers=4):
+        weeks = list(weeks)
+        if not weeks:
+            return
+
+        matchups = self.get_matchups(weeks)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(self.get_lineups, week): week
+                for week in weeks
+            }
+            try:
+                for future in as_completed(futures):
+                    week = futures[future]
+                    yield (
+                        week,
+                        matchups[matchups["Week"] == week],
+                        future.result(),
+                    )
+            finally:
+                # Don't keep fetching if the caller stopped early
+                for future in futures:
+                    future.cancel()
@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+
+DEFAULT_ARTIFACTS_DIR = os.path.join(
+    os.path.expanduser("~"), ".karen", "artifacts"
+)
+
+# The league-level dataframes that get precomputed
+FRAMES = ["player_df", "luck_df", "matchups_df"]
+
+
+class ArtifactStore:
+    """
+    A local directory of precomputed league dataframes, laid out as
+    `<root>/<platform>/<league_id>/<year>/`, so the app can start from them
+    instead of rebuilding everything from ESPN.
+
+    Each season directory has a `manifest.json` recording the week it was
+    built for, and one Parquet file per dataframe. Power rankings are kept
+    per week under `power_rankings/week=<week>.parquet`.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.environ.get(
+            "KAREN_ARTIFACTS_DIR", DEFAULT_ARTIFACTS_DIR
+        )
+
+    def _season_dir(self, platform, league_id, year):
+        return os.path.join(
+            self.root, platform.lower(), str(league_id), str(year)
+        )
+
+    def manifest(self, platform, league_id, year):
+        """
+        Get a season's manifest, or None if it was never precomputed.
+        """
+        path = os.path.join(
+            self._season_dir(platform, league_id, year), "manifest.json"
+        )
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as f:
+            return json.load(f)
+
+    def write(
+        self, platform, league_id, year, current_week, frames, power_rankings
+    ):
+        """
+        Write a season's precomputed dataframes, replacing any old ones.
+
+        `frames` is a dict of name -> dataframe and `power_rankings` a dict
+        of week -> dataframe.
+        """
+        season_dir = self._season_dir(platform, league_id, year)
+
+        # Build everything next to the real directory, then swap it in
+        tmp_dir = f"{season_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(os.path.join(tmp_dir, "power_rankings"))
+
+        for name, df in frames.items():
+            df.to_parquet(os.path.join(tmp_dir, f"{name}.parquet"))
+
+        for week, df in power_rankings.items():
+            df.to_parquet(
+                os.path.join(tmp_dir, "power_rankings", f"week={week}.parquet")
+            )
+
+        manifest = {
+            "current_week": current_week,
+            "frames": list(frames),
+            "power_ranking_weeks": sorted(power_rankings),
+            "built_at": time.time(),
+        }
+        with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(season_dir, ignore_errors=True)
+        os.replace(tmp_dir, season_dir)
+
+    def read(self, platform, league_id, year):
+        """
+        Read a season's precomputed dataframes back as
+        (manifest, frames, power_rankings), or None if there aren't any.
+        """
+        manifest = self.manifest(platform, league_id, year)
+        if manifest is None:
+            return None
+
+        season_dir = self._season_dir(platform, league_id, year)
+        frames = {
+            name: pd.read_parquet(os.path.join(season_dir, f"{name}.parquet"))
+            for name in manifest["frames"]
+        }
+        power_rankings_dir = os.path.join(season_dir, "power_rankings")
+        power_rankings = {
+            week: pd.read_parquet(
+                os.path.join(power_rankings_dir, f"week={week}.parquet")
+            )
+            for week in manifest["power_ranking_weeks"]
+        }
+        return manifest, frames, power_rankings
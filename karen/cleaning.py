@@ -1,73 +1,192 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
 
-from scipy.stats import zscore
+from karen import takes, utils
+from karen.adapters.base import (
+    LINEUP_COLUMNS,
+    MATCHUP_COLUMNS,
+    POWER_RANKING_COLUMNS,
+    build_records,
+)
+from karen.cube import WeekCube
+from karen.instrumentation import timed
 
-from karen import utils
+
+def build_power_ranking_scores(matchups_df, team_ids):
+    """
+    Compute every team's power ranking score after every week at once from
+    a matchups_df, the way ESPN does: 80% two-step dominance (M + M², where
+    M counts who has beaten who), 15% average score and 5% average margin of
+    victory, each truncated to a whole number. Teams on a bye beat nobody
+    and have no margin of victory.
+
+    Returns a dataframe with a row per week and a column per team ID.
+    """
+    team_ids = pd.Index(sorted(team_ids), name="Team ID")
+    n_weeks = int(matchups_df["Week"].max()) if len(matchups_df) else 0
+    weeks = np.arange(1, n_weeks + 1)
+
+    week_pos = matchups_df["Week"].to_numpy(dtype=int) - 1
+    team_pos = team_ids.get_indexer(matchups_df["Team ID"])
+    opponent_pos = team_ids.get_indexer(
+        matchups_df["Opponent ID"].fillna(-1).astype(int)
+    )
+    played = opponent_pos >= 0
+    points = matchups_df["Points"].to_numpy(dtype=float)
+    margins = np.where(
+        played, points - matchups_df["Opponent Points"].to_numpy(float), 0.0
+    )
+
+    shape = (n_weeks, len(team_ids))
+    won = played & (margins > 0)
+    wins = np.zeros(shape + (len(team_ids),))
+    np.add.at(wins, (week_pos[won], team_pos[won], opponent_pos[won]), 1)
+    week_points = np.zeros(shape)
+    np.add.at(week_points, (week_pos, team_pos), points)
+    week_margins = np.zeros(shape)
+    np.add.at(week_margins, (week_pos, team_pos), margins)
+
+    # Every week's M at once, then M + M² in one batched matrix product
+    dominance_matrices = wins.cumsum(axis=0)
+    dominance = (
+        dominance_matrices @ dominance_matrices + dominance_matrices
+    ).sum(axis=2)
+    average_points = week_points.cumsum(axis=0) / weeks[:, None]
+    average_margins = week_margins.cumsum(axis=0) / weeks[:, None]
+
+    # Points are summed in a different order than ESPN does, so round off
+    # the float noise before truncating (46 shouldn't truncate to 45)
+    scores = (
+        np.trunc(dominance) * 0.8
+        + np.trunc(average_points.round(6)) * 0.15
+        + np.trunc(average_margins.round(6)) * 0.05
+    )
+    # ESPN compares scores to two decimal places, so ties are ties here too
+    return pd.DataFrame(
+        scores.round(2), index=pd.Index(weeks, name="Week"), columns=team_ids
+    )
 
 
-def build_power_rankings_df(league, week):
+def get_power_rankings(scores_df, week):
     """
-    Build a nice clean dataframe of the power rankings.
+    Look a week's power ranking records up in a dataframe from
+    build_power_ranking_scores, best team first (ties go to the lower team
+    ID). Weeks after the last one get its rankings, and before any week has
+    been played every team scores 0.
     """
+    if scores_df.empty:
+        scores = pd.Series(0.0, index=scores_df.columns)
+    else:
+        scores = scores_df.loc[min(week, scores_df.index[-1])]
 
-    power_rankings = league.power_rankings(week=week)
+    scores = scores.sort_values(ascending=False, kind="stable")
+    return build_records(
+        {"Team ID": scores.index, "Power Ranking Score": scores.to_numpy()},
+        POWER_RANKING_COLUMNS,
+    )
 
-    columns = [
-        "Team",
-        "Team ID",
-        "Power Rank Index",
-        "Power Ranking",
-        "League Ranking",
-        "Record",
-        "Points Scored",
-        "Points Allowed",
-        "Point Differential",
-        "Power Ranking Score",
-    ]
-    power_ranking_list = []
 
-    for i, ranking_tuple in enumerate(power_rankings):
+def build_power_rankings_history(scores_df, teams):
+    """
+    Rank every team after every week at once from a dataframe from
+    build_power_ranking_scores, with a row per team per week. "Rank Change"
+    is how many places a team moved up since the week before.
+    """
+    ranks = scores_df.rank(axis=1, method="first", ascending=False)
+    changes = (ranks.shift(1) - ranks).fillna(0)
+
+    history_df = pd.DataFrame(
+        {
+            "Power Ranking": ranks.stack().astype(int),
+            "Power Ranking Score": scores_df.stack().astype(float),
+            "Rank Change": changes.stack().astype(int),
+        }
+    ).reset_index()
+    team_names = dict(zip(teams["Team ID"], teams["Team"]))
+    history_df.insert(1, "Team", history_df["Team ID"].map(team_names))
+    return history_df.sort_values(["Week", "Power Ranking"], ignore_index=True)
+
+
+def build_power_rankings_movement_chart(history_df):
+    """
+    Build a plotly chart of every team's power ranking over the season, with
+    the teams in the legend in their latest order.
+    """
+    last_week = history_df[history_df["Week"] == history_df["Week"].max()]
 
-        # Get the values for the rows
-        two_step_score = ranking_tuple[0]
-        team = ranking_tuple[1]
-        record = f"{team.wins}-{team.losses}"
-        differential = team.points_for - team.points_against
-        differential_prefix = ""
-        if team.points_for - team.points_against > 0:
-            differential_prefix = "+"
+    fig = go.Figure()
+    for team_name in last_week["Team"]:
+        team_df = history_df[history_df["Team"] == team_name]
+        fig.add_trace(
+            go.Scatter(
+                x=team_df["Week"],
+                y=team_df["Power Ranking"],
+                mode="lines+markers",
+                name=team_name,
+                customdata=team_df[["Power Ranking Score", "Rank Change"]],
+                hovertemplate=(
+                    "Week %{x}: #%{y} (%{customdata[1]:+d})"
+                    "<br>Score: %{customdata[0]:.2f}"
+                ),
+            )
+        )
 
-        # Build the row
-        row = [
-            team.team_name,
-            team.team_id,
-            "",
-            i + 1,
-            team.standing,
-            record,
-            round(team.points_for, 0),
-            round(team.points_against, 0),
-            f"{differential_prefix}{differential}",
-            two_step_score,
-        ]
-        power_ranking_list.append(row)
+    fig.update_layout(
+        title="Power Ranking Movement",
+        xaxis_title="Week",
+        yaxis_title="Power Ranking",
+        xaxis=dict(dtick=1),
+        # First place goes at the top
+        yaxis=dict(autorange="reversed", dtick=1),
+        font=dict(family="IBM Plex Sans", size=14, color="#262730"),
+        width=900,
+    )
+    return fig
 
-    df = pd.DataFrame(power_ranking_list, columns=columns)
 
-    # Get the manually updated power rankings and filter it this year and week
-    power_ranking_takes = utils.get_spreadsheet_takes()
-    power_ranking_takes["Team ID"] = power_ranking_takes["Team ID"].astype(str)
-    power_ranking_takes["Year"] = power_ranking_takes["Year"].astype(str)
-    power_ranking_takes = power_ranking_takes[
-        (power_ranking_takes["Year"] == str(league.year))
-        & (power_ranking_takes["Week"] == str(week))
-    ]
+def build_base_power_rankings_df(teams, power_rankings):
+    """
+    Build a dataframe of a week's power rankings from team and power ranking
+    records, before any of the manual takes are added.
+    """
+    df = power_rankings.merge(teams, how="left", on="Team ID")
+    differential = df["Points For"] - df["Points Against"]
+
+    return pd.DataFrame(
+        {
+            "Team": df["Team"],
+            "Team ID": df["Team ID"],
+            "Power Rank Index": "",
+            "Power Ranking": np.arange(1, len(df) + 1),
+            "League Ranking": df["Standing"],
+            "Record": (
+                df["Wins"].astype(str) + "-" + df["Losses"].astype(str)
+            ),
+            "Points Scored": df["Points For"].round(0),
+            "Points Allowed": df["Points Against"].round(0),
+            "Point Differential": (
+                np.where(differential > 0, "+", "") + differential.astype(str)
+            ),
+            "Power Ranking Score": df["Power Ranking Score"].map(
+                "{:.2f}".format
+            ),
+        }
+    )
+
+
+def build_power_rankings_df(base_df, year, week):
+    """
+    Build a nice clean dataframe of the power rankings, adding the manual
+    takes to a `base_df` from build_base_power_rankings_df.
+    """
+    # Get the manually updated power rankings for this year and week
+    power_ranking_takes = takes.get_takes(year, week)
 
     # Join the two df's
-    left = df
+    left = base_df.copy()
     right = power_ranking_takes
     left["Team ID"] = left["Team ID"].astype(str)
 
@@ -122,39 +241,112 @@ def build_power_rankings_df(league, week):
     return merged_df[order]
 
 
-def build_score_df(team, current_week):
+def build_standings_df(matchups_df, week):
     """
-    Build a nice clean df of a given team's data.
-
-    :param Team team: Team object.
+    Build a dataframe of the standings after a week from a matchups_df, with
+    teams ranked by wins and then points scored. Bye weeks don't count.
     """
-    columns = ["Week", "Points Scores"]
-    team_data = []
+    df = matchups_df[
+        (matchups_df["Week"] <= week) & matchups_df["Opponent ID"].notna()
+    ]
+    df = df.assign(
+        Wins=df["Result"] == "W",
+        Losses=df["Result"] == "L",
+        Ties=df["Result"] == "T",
+    )
 
-    for i in range(1, current_week + 1):
-        row = [
-            i,
-            team.scores[i - 1],
+    standings = (
+        df.groupby(["Team"], as_index=False, observed=True)[
+            ["Wins", "Losses", "Ties", "Points", "Opponent Points"]
         ]
-        team_data.append(row)
+        .sum()
+        .sort_values(
+            ["Wins", "Points"], ascending=False, ignore_index=True
+        )
+    )
 
-    team_df = pd.DataFrame(team_data, columns=columns)
-    team_df.set_index("Week", inplace=True)
-    return team_df
+    standings["League Ranking"] = standings.index + 1
+    standings["Record"] = (
+        standings["Wins"].astype(str) + "-" + standings["Losses"].astype(str)
+    )
+    has_ties = standings["Ties"] > 0
+    standings.loc[has_ties, "Record"] += "-" + standings.loc[
+        has_ties, "Ties"
+    ].astype(str)
 
+    differential = (standings["Points"] - standings["Opponent Points"]).round(
+        2
+    )
+    standings["Points Scored"] = standings["Points"].round(0)
+    standings["Points Allowed"] = standings["Opponent Points"].round(0)
+    standings["Point Differential"] = (
+        np.where(differential > 0, "+", "") + differential.astype(str)
+    )
 
-def get_projected_points(lineup):
+    standings.index = pd.Index([""] * len(standings), name="Power Rank Index")
+    return standings[
+        [
+            "Team",
+            "League Ranking",
+            "Record",
+            "Points Scored",
+            "Points Allowed",
+            "Point Differential",
+        ]
+    ]
+
+
+def build_season_records(matchups_df):
     """
-    Build projected points from a lineup.
+    Build every team's record in every season from matchups with a "Year"
+    column, e.g. from karen.warehouse.Warehouse. Teams are identified by
+    their team ID, which stays with a manager across seasons, and named
+    what they were called at the end of the season. Bye weeks don't count.
     """
-    projected = 0
-
-    for player in lineup:
+    df = matchups_df[matchups_df["Opponent ID"].notna()]
+    df = df.assign(
+        Wins=df["Result"] == "W",
+        Losses=df["Result"] == "L",
+        Ties=df["Result"] == "T",
+    ).sort_values(["Year", "Week"], kind="stable")
+
+    records = df.groupby(["Year", "Team ID"], as_index=False).agg(
+        **{
+            "Team": ("Team", "last"),
+            "Wins": ("Wins", "sum"),
+            "Losses": ("Losses", "sum"),
+            "Ties": ("Ties", "sum"),
+            "Points For": ("Points", "sum"),
+            "Points Against": ("Opponent Points", "sum"),
+        }
+    )
+    records["Team"] = records["Team"].astype(str)
+    return records
 
-        if player.slot_position != "BE":
-            projected += player.projected_points
 
-    return projected
+def build_all_time_records(season_records):
+    """
+    Add up every team's season records from build_season_records, best
+    record first. Teams are named what they were called most recently.
+    """
+    records = season_records.groupby("Team ID", as_index=False).agg(
+        **{
+            "Team": ("Team", "last"),
+            "Seasons": ("Year", "nunique"),
+            "Wins": ("Wins", "sum"),
+            "Losses": ("Losses", "sum"),
+            "Ties": ("Ties", "sum"),
+            "Points For": ("Points For", "sum"),
+            "Points Against": ("Points Against", "sum"),
+        }
+    )
+    games = records["Wins"] + records["Losses"] + records["Ties"]
+    records["Win %"] = (
+        (records["Wins"] + records["Ties"] / 2) / games.where(games > 0)
+    ).round(3)
+    return records.sort_values(
+        ["Win %", "Points For"], ascending=False, ignore_index=True
+    )
 
 
 def build_team_df(team_name, df):
@@ -165,74 +357,90 @@ def build_team_df(team_name, df):
         .groupby(
             ["Team", "Week", "Team ID", "Opponent", "Opponent ID"],
             as_index=False,
+            observed=True,
+            dropna=False,
         )
         .sum()
+        .sort_values(["Week"], ignore_index=True)
     )
     return team_df
 
 
-def build_team_df_w_results(team_name, df):
-    home_df = build_team_df(team_name, df)
+MATCHUP_KEYS = ["Team", "Week", "Team ID", "Opponent", "Opponent ID"]
+SCORE_COLUMNS = [
+    "Points",
+    "Projected Points",
+    "Projection Diff",
+    "Cumulative Score",
+]
 
-    rows = []
-    for i, row in home_df.iterrows():
-        opponent_df = build_team_df(row["Opponent"], df)
-        opponent_df = opponent_df[opponent_df["Week"] == row["Week"]]
-
-        home_projected = row["Projected Points"]
-        home_actual = row["Points"]
-
-        if opponent_df.empty:
-            opponent_projected = 0
-            opponent_actual = 0
-            opponent_projected_diff = 0
-        else:
-            opponent_projected = opponent_df["Projected Points"].values[0]
-            opponent_actual = opponent_df["Points"].values[0]
-            opponent_projected_diff = opponent_df["Projection Diff"].values[0]
-
-        if home_projected > opponent_projected:
-            projected_result = "W"
-        elif home_projected < opponent_projected:
-            projected_result = "L"
-        else:
-            projected_result = "T"
-
-        if home_actual > opponent_actual:
-            actual_result = "W"
-        elif home_actual < opponent_actual:
-            actual_result = "L"
-        else:
-            actual_result = "T"
 
-        row = [
-            row["Week"],
-            opponent_actual,
-            opponent_projected,
-            opponent_projected_diff,
-            projected_result,
-            actual_result,
+def get_results(points, opponent_points):
+    """
+    Get "W", "L" or "T" for two columns of points.
+    """
+    return np.select(
+        [points > opponent_points, points < opponent_points], ["W", "L"], "T"
+    )
+
+
+def build_matchups_df(df):
+    """
+    Build a dataframe of every team's matchup for every week, with both
+    sides' projected and actual points and the projected and actual results.
+    """
+    team_df = (
+        df[df["Slot"] != "BE"]
+        .groupby(MATCHUP_KEYS, as_index=False, observed=True, dropna=False)[
+            SCORE_COLUMNS
         ]
-        rows.append(row)
+        .sum()
+        .sort_values(MATCHUP_KEYS, ignore_index=True)
+    )
 
-    opponent_scores_df_columns = [
-        "Week",
+    # Self join to line each team up against its opponent
+    opponent_df = team_df[
+        ["Team", "Week", "Points", "Projected Points", "Projection Diff"]
+    ].rename(
+        columns={
+            "Team": "Opponent",
+            "Points": "Opponent Points",
+            "Projected Points": "Opponent Projected Points",
+            "Projection Diff": "Opponent Projection Diff",
+        }
+    )
+    matchups_df = team_df.merge(
+        opponent_df, how="left", on=["Week", "Opponent"]
+    )
+
+    # Teams on a bye play against nobody
+    opponent_columns = [
         "Opponent Points",
         "Opponent Projected Points",
         "Opponent Projection Diff",
-        "Projected Result",
-        "Result",
     ]
+    matchups_df[opponent_columns] = matchups_df[opponent_columns].fillna(0)
 
-    opponents_df = pd.DataFrame(rows, columns=opponent_scores_df_columns)
+    matchups_df["Projected Result"] = get_results(
+        matchups_df["Projected Points"],
+        matchups_df["Opponent Projected Points"],
+    )
+    matchups_df["Result"] = get_results(
+        matchups_df["Points"], matchups_df["Opponent Points"]
+    )
+    return matchups_df
 
-    # Join the two
-    left = home_df
-    right = opponents_df
 
-    combined_df = pd.merge(left, right, how="inner", on=["Week"])
+def build_team_df_w_results(team_name, df, matchups_df=None):
+    """
+    Get a team's weekly matchups. Pass in a prebuilt `matchups_df` to avoid
+    rebuilding it for every team.
+    """
+    if matchups_df is None:
+        matchups_df = build_matchups_df(df)
 
-    return combined_df
+    team_df = matchups_df[matchups_df["Team"] == team_name]
+    return team_df.reset_index(drop=True)
 
 
 def build_projected_vs_actual_chart(df):
@@ -261,15 +469,17 @@ def build_projected_vs_actual_chart(df):
         )
     )
 
-    for i, row in df.iterrows():
-        week = row["Week"]
-        proj_result = row["Projected Result"]
-        act_result = row["Result"]
-        if proj_result != act_result:
-
-            fig.add_annotation(x=week, y=row["Points"], text=act_result)
+    # Label every unexpected outcome, all at once
+    unexpected = df[df["Projected Result"] != df["Result"]]
+    annotations = [
+        dict(x=week, y=points, text=result)
+        for week, points, result in zip(
+            unexpected["Week"], unexpected["Points"], unexpected["Result"]
+        )
+    ]
 
     fig.update_layout(
+        annotations=annotations,
         title="Unexpected Outcomes",
         xaxis_title="Week",
         yaxis_title="Points",
@@ -279,134 +489,202 @@ def build_projected_vs_actual_chart(df):
     return fig
 
 
-def cumulative_score(row, player_df):
+@timed()
+def build_cumulative_scores(player_df, window=None):
+    """
+    Build each player's running score for every row of the player_df.
 
-    current_week = row["Week"]
+    Weeks a player didn't appear in count as 0. If `window` is set, only the
+    last `window` weeks (including the current one) are summed, which is handy
+    for rolling charts.
+    """
+    if player_df.empty:
+        return pd.Series(dtype=float, index=player_df.index)
+
+    first_week = min(player_df["Week"])
+    last_week = max(player_df["Week"])
+
+    # One row per player, one column per week
+    weekly_points = (
+        player_df.drop_duplicates(["Player Name", "Week"])
+        .pivot(index="Player Name", columns="Week", values="Points")
+        .reindex(columns=range(1, last_week + 1))
+        .fillna(0)
+    )
 
-    if current_week == min(player_df["Week"]):
-        return row["Points"]
+    running_points = weekly_points.cumsum(axis=1)
+    if window:
+        running_points = running_points - running_points.shift(
+            window, axis=1, fill_value=0
+        )
 
-    else:
-        cumulative_score = 0
-        for i in range(current_week):
-            week = i + 1
-            filtered = player_df[
-                (player_df["Week"] == week)
-                & (player_df["Player Name"] == row["Player Name"])
-            ]
+    keys = pd.MultiIndex.from_frame(player_df[["Player Name", "Week"]])
+    scores = running_points.stack().reindex(keys).values
 
-            if filtered["Points"].empty:
-                weekly_score = 0
-            else:
-                weekly_score = filtered["Points"].values[0]
+    # The first week is just the row's own points
+    scores = np.where(
+        player_df["Week"] == first_week, player_df["Points"], scores
+    )
+    return pd.Series(scores, index=player_df.index)
+
+
+# Compact dtypes for the player_df. Repeated strings are categoricals, and
+# "Opponent ID" is nullable since teams on a bye have no opponent.
+PLAYER_DF_SCHEMA = {
+    "Week": "int8",
+    "Player Name": "category",
+    "Points": "float64",
+    "Projected Points": "float64",
+    "Projection Diff": "float64",
+    "Position": "category",
+    "Slot": "category",
+    "Team": "category",
+    "Team ID": "int16",
+    "Opponent": "category",
+    "Opponent ID": "Int16",
+}
+
+
+def validate_player_df(df):
+    """
+    Check that a player_df has the columns, dtypes and values the rest of
+    the cleaning functions expect, raising a ValueError if it doesn't.
+    """
+    missing = [c for c in PLAYER_DF_SCHEMA if c not in df.columns]
+    if missing:
+        raise ValueError(f"player_df is missing columns: {', '.join(missing)}")
+
+    problems = [
+        f"'{column}' is {df[column].dtype}, not {dtype}"
+        for column, dtype in PLAYER_DF_SCHEMA.items()
+        if str(df[column].dtype) != dtype
+    ]
+    required = [c for c in PLAYER_DF_SCHEMA if c != "Opponent ID"]
+    for column in required:
+        if df[column].isna().any():
+            problems.append(f"'{column}' has missing values")
+
+    if not df.empty and df["Week"].min() < 1:
+        problems.append("'Week' must start at 1")
+
+    no_opponent = df["Opponent"] == ""
+    if (df["Opponent ID"].isna() != no_opponent).any():
+        problems.append("'Opponent ID' must be blank only on bye weeks")
 
-            cumulative_score += weekly_score
-        return cumulative_score
+    if problems:
+        raise ValueError(f"Invalid player_df: {'; '.join(problems)}")
 
 
-def build_player_scores(current_week, league):
+def apply_player_df_schema(df):
     """
-    Get a dataframe of the league's players performance.
+    Cast a player_df to the compact dtypes in PLAYER_DF_SCHEMA and validate
+    it.
     """
-    columns = [
-        "Index",
-        "Week",
-        "Player Name",
-        "Points",
-        "Projected Points",
-        "Projection Diff",
-        "Position",
-        "Slot",
-        "Team",
-        "Team ID",
-        "Opponent",
-        "Opponent ID",
-    ]
-    players = []
+    df = df.copy()
+    df["Opponent ID"] = pd.to_numeric(
+        df["Opponent ID"].replace("", np.nan), errors="coerce"
+    )
+    df = df.astype(PLAYER_DF_SCHEMA)
+    validate_player_df(df)
+    return df
+
+
+def build_week_player_df(week, matchups, lineups):
+    """
+    Build a single week's player rows from its matchup and lineup records
+    (see karen.adapters), without applying PLAYER_DF_SCHEMA.
+    """
+    lineups = lineups[lineups["Week"] == week]
+    week_matchups = matchups[matchups["Week"] == week].set_index("Team ID")
+
+    # Each row's side of its matchup, looked up by team
+    sides = week_matchups.reindex(lineups["Team ID"].values)
+
+    points = lineups["Points"].values
+    projected_points = lineups["Projected Points"].values
+    columns = {
+        "Week": lineups["Week"].values,
+        "Player Name": lineups["Player Name"].values,
+        "Points": points,
+        "Projected Points": projected_points,
+        "Projection Diff": points - projected_points,
+        "Position": lineups["Position"].values,
+        "Slot": lineups["Slot"].values,
+        "Team": sides["Team"].values,
+        "Team ID": lineups["Team ID"].values,
+        "Opponent": sides["Opponent"].fillna("").values,
+        "Opponent ID": sides["Opponent ID"].values,
+    }
+
+    return pd.DataFrame(
+        columns, index=pd.Index([""] * len(lineups), name="Index")
+    )
+
+
+def iter_weekly_player_dfs(weeks, adapter, max_workers=4):
+    """
+    Yield (week, player rows) for each week as soon as it has loaded, so
+    later stages can start before every week has come in. Weeks are
+    yielded in the order they finish loading.
+    """
+    for week, matchups, lineups in adapter.iter_weeks(
+        weeks, max_workers=max_workers
+    ):
+        print(f"Building players for week: {week}...")
+        yield week, build_week_player_df(week, matchups, lineups)
+
+
+@timed()
+def build_weekly_player_df(
+    weeks, adapter, max_workers=4, on_week_loaded=None
+):
+    """
+    Get a dataframe of the league's players performance for specific weeks,
+    without any season-level columns like "Cumulative Score". The schema
+    isn't applied yet, so callers cast the whole season once with
+    apply_player_df_schema.
 
+    Weeks are fetched from an adapter `max_workers` at a time.
+    `on_week_loaded(week, week_df)` is called as each week comes in.
+    """
+    weeks = list(weeks)
     bar = st.progress(0.0)
 
-    for i in range(1, current_week + 1):
-        print(f"Building players for week: {i}...")
-        progress = i / len([i for i in range(current_week)])
-        bar.progress(progress)
-
-        box_scores = league.box_scores(week=i)
-
-        for box_score in box_scores:
-
-            home_exists = True
-            away_exists = True
-
-            if box_score.away_team == 0:
-                away_exists = False
-
-            elif box_score.home_team == 0:
-                home_exists = False
-
-            if away_exists:
-
-                if home_exists:
-                    opponent = box_score.home_team.team_name
-                    opponent_id = box_score.home_team.team_id
-                else:
-                    opponent = ""
-                    opponent_id = ""
-
-                for player in box_score.away_lineup:
-                    row = [
-                        "",
-                        i,
-                        player.name,
-                        player.points,
-                        player.projected_points,
-                        player.points - player.projected_points,
-                        player.position,
-                        player.slot_position,
-                        box_score.away_team.team_name,
-                        box_score.away_team.team_id,
-                        opponent,
-                        opponent_id,
-                    ]
-
-                    players.append(row)
-
-            if home_exists:
-
-                if away_exists:
-                    opponent = box_score.away_team.team_name
-                    opponent_id = box_score.away_team.team_id
-                else:
-                    opponent = ""
-                    opponent_id = ""
-
-                for player in box_score.home_lineup:
-                    row = [
-                        "",
-                        i,
-                        player.name,
-                        player.points,
-                        player.projected_points,
-                        player.points - player.projected_points,
-                        player.position,
-                        player.slot_position,
-                        box_score.home_team.team_name,
-                        box_score.home_team.team_id,
-                        opponent,
-                        opponent_id,
-                    ]
-
-                    players.append(row)
-
-    df = pd.DataFrame(players, columns=columns)
-    df.set_index("Index", inplace=True)
-
-    df["Cumulative Score"] = df.apply(cumulative_score, args=[df], axis=1)
+    frames = {}
+    for week, week_df in iter_weekly_player_dfs(
+        weeks, adapter, max_workers=max_workers
+    ):
+        frames[week] = week_df
+        bar.progress(len(frames) / len(weeks))
+        if on_week_loaded:
+            on_week_loaded(week, week_df)
+
+    if frames:
+        df = pd.concat([frames[week] for week in sorted(frames)])
+    else:
+        df = build_week_player_df(
+            0,
+            pd.DataFrame(columns=MATCHUP_COLUMNS),
+            pd.DataFrame(columns=LINEUP_COLUMNS),
+        )
 
     bar.empty()
     return df
 
 
+def build_player_scores(current_week, adapter, max_workers=4):
+    """
+    Get a dataframe of the league's players performance.
+    """
+    df = apply_player_df_schema(
+        build_weekly_player_df(
+            range(1, current_week + 1), adapter, max_workers=max_workers
+        )
+    )
+    df["Cumulative Score"] = build_cumulative_scores(df)
+    return df
+
+
 def build_mvp_chart(team, player_df):
     """
     """
@@ -426,30 +704,49 @@ def build_mvp_chart(team, player_df):
     return fig
 
 
-def build_team_summary(player_df, top=3, week_range=None):
+def build_summary_cubes(player_df):
     """
-    Build a clean dataframe of the team summary.
+    Build the per-week aggregates behind the team, player and position
+    summaries, so they can be recomputed for any range of weeks cheaply.
     """
+    bench = player_df["Slot"] == "BE"
+    return {
+        "bench": WeekCube(player_df[bench], ["Team"], ["Points"]),
+        "starters": WeekCube(
+            player_df[~bench], ["Team"], ["Projection Diff"]
+        ),
+        "players": WeekCube(
+            player_df, ["Player Name", "Team"], ["Points", "Projection Diff"]
+        ),
+        "positions": WeekCube(
+            player_df,
+            ["Position", "Player Name"],
+            ["Points", "Projection Diff"],
+        ),
+    }
+
+
+def build_team_summary(player_df, top=3, week_range=None, cubes=None):
+    """
+    Build a clean dataframe of the team summary.
 
-    if week_range:
-        player_df = player_df[
-            (player_df["Week"] >= week_range[0])
-            & (player_df["Week"] <= week_range[1])
-        ]
+    Pass in `cubes` from build_summary_cubes to skip rescanning the
+    player_df.
+    """
+    if cubes is None:
+        cubes = build_summary_cubes(player_df)
 
     # Bench points
     bench_points = (
-        player_df[player_df["Slot"] == "BE"][["Team", "Points"]]
-        .groupby(["Team"])
-        .sum()
+        cubes["bench"]
+        .sum(week_range)[["Points"]]
         .sort_values("Points", ascending=False)
     )
 
     # Projections
     projections = (
-        player_df[player_df["Slot"] != "BE"][["Team", "Projection Diff"]]
-        .groupby(["Team"])
-        .sum()
+        cubes["starters"]
+        .sum(week_range)[["Projection Diff"]]
         .sort_values("Projection Diff", ascending=False)
     )
 
@@ -486,34 +783,37 @@ def build_team_summary(player_df, top=3, week_range=None):
     return league_overview_df
 
 
-def build_player_summary(player_df, top=10, week_range=None, on_teams=None):
+def build_player_summary(
+    player_df, top=10, week_range=None, on_teams=None, cubes=None
+):
     """
     Build a clean dataframe of player level information.
+
+    Pass in `cubes` from build_summary_cubes to skip rescanning the
+    player_df.
     """
+    if cubes is None:
+        cubes = build_summary_cubes(player_df)
 
-    if week_range:
-        player_df = player_df[
-            (player_df["Week"] >= week_range[0])
-            & (player_df["Week"] <= week_range[1])
-        ]
+    player_totals = cubes["players"].sum(week_range)
 
     if on_teams:
-        player_df = player_df[player_df["Team"].isin(on_teams)]
+        player_totals = player_totals[
+            player_totals.index.get_level_values("Team").isin(on_teams)
+        ]
+
+    player_totals = (
+        player_totals.groupby("Player Name", observed=True).sum().sort_index()
+    )
 
     # Most points for a certain player
-    most_points = (
-        player_df[["Player Name", "Points"]]
-        .groupby("Player Name")
-        .sum()
-        .sort_values("Points", ascending=False)
+    most_points = player_totals[["Points"]].sort_values(
+        "Points", ascending=False
     )
 
     # Beat the projection most often
-    beat_projection = (
-        player_df[["Player Name", "Projection Diff"]]
-        .groupby("Player Name")
-        .sum()
-        .sort_values("Projection Diff", ascending=False)
+    beat_projection = player_totals[["Projection Diff"]].sort_values(
+        "Projection Diff", ascending=False
     )
 
     headers = [
@@ -544,222 +844,342 @@ def build_player_summary(player_df, top=10, week_range=None, on_teams=None):
     return df
 
 
-def build_top_positions_df(
-    player_df, top=5, week_range=None, mode="Most points scored"
+POSITIONS = ["QB", "RB", "TE", "WR", "D/ST", "K"]
+
+# Mode -> (column to rank by, ascending)
+TOP_POSITIONS_MODES = {
+    "Most points scored": ("Points", False),
+    "Out-performed projection": ("Projection Diff", False),
+    "Under-performed projection": ("Projection Diff", True),
+}
+
+
+def build_top_positions_dfs(
+    player_df, top=5, week_range=None, modes=None, positions=None, cubes=None
 ):
     """
-    Build a dataframe of the top n players at each position.
+    Build a dataframe of the top n players at each position for several
+    modes at once, returned as a dict of mode -> dataframe.
+
+    Positions with fewer than `top` players get blank cells. Pass in `cubes`
+    from build_summary_cubes to skip rescanning the player_df.
     """
+    modes = modes or list(TOP_POSITIONS_MODES)
+    positions = positions or POSITIONS
+
+    for mode in modes:
+        if mode not in TOP_POSITIONS_MODES:
+            raise ValueError(
+                f"'{mode}' is not a valid mode!"
+                f"\nMust be one of: {', '.join(TOP_POSITIONS_MODES)}"
+            )
 
-    if week_range:
-        player_df = player_df[
-            (player_df["Week"] >= week_range[0])
-            & (player_df["Week"] <= week_range[1])
-        ]
+    if cubes is None:
+        cubes = build_summary_cubes(player_df)
 
-    positions = ["QB", "RB", "TE", "WR", "D/ST", "K"]
-    rows = []
+    position_totals = cubes["positions"].sum(week_range).reset_index()
+    position_totals = position_totals[
+        position_totals["Position"].isin(positions)
+    ]
 
-    for i in range(top):
+    top_positions_dfs = {}
 
-        row = []
-        row.append(i + 1)
+    for mode in modes:
+        sort_col, ascending = TOP_POSITIONS_MODES[mode]
 
-        for position in positions:
+        ranked = position_totals.sort_values(
+            sort_col, ascending=ascending, kind="mergesort"
+        )
+        ranked["Index"] = (
+            ranked.groupby("Position", observed=True).cumcount() + 1
+        )
+        ranked = ranked[ranked["Index"] <= top]
+        ranked["Player"] = (
+            ranked["Player Name"].astype(str)
+            + " ("
+            + ranked[sort_col].round(2).astype(str)
+            + ")"
+        )
 
-            if mode == "Most points scored":
-                sort_col = "Points"
-                ascending = False
-            elif mode == "Out-performed projection":
-                sort_col = "Projection Diff"
-                ascending = False
-            elif mode == "Under-performed projection":
-                sort_col = "Projection Diff"
-                ascending = True
+        top_positions_df = (
+            ranked.pivot(index="Index", columns="Position", values="Player")
+            .reindex(index=range(1, top + 1), columns=positions)
+            .fillna("")
+        )
+        top_positions_df.index.name = "Index"
+        top_positions_df.columns.name = None
+        top_positions_dfs[mode] = top_positions_df
 
-            position_df = (
-                player_df[player_df["Position"] == position]
-                .groupby("Player Name", as_index=False)
-                .sum()
-                .sort_values(sort_col, ascending=ascending)
-            )
+    return top_positions_dfs
 
-            name = position_df["Player Name"].values[i]
-            points = round(position_df[sort_col].values[i], 2)
 
-            to_add = f"{name} ({points})"
+def build_top_positions_df(
+    player_df,
+    top=5,
+    week_range=None,
+    mode="Most points scored",
+    positions=None,
+    cubes=None,
+):
+    """
+    Build a dataframe of the top n players at each position.
+    """
+    return build_top_positions_dfs(
+        player_df,
+        top=top,
+        week_range=week_range,
+        modes=[mode],
+        positions=positions,
+        cubes=cubes,
+    )[mode]
 
-            row.append(to_add)
 
-        rows.append(row)
+def is_unranked(player):
+    rank = player["Position Rank"]
+    return np.isnan(rank) or rank == 0
+
 
-    positions.insert(0, "Index")
-    top_positions_df = pd.DataFrame(rows, columns=positions)
-    top_positions_df.set_index("Index", inplace=True)
+def get_rank(player):
+    """
+    Get a player's position rank, with players the platform has no rank for
+    at all ranked last.
+    """
+    rank = player["Position Rank"]
+    return np.inf if np.isnan(rank) else rank
 
-    return top_positions_df
 
+def format_rank(player):
+    rank = player["Position Rank"]
+    return "[]" if np.isnan(rank) else int(rank)
 
-def get_recommendations(team_name, league):
+
+def build_free_agent_index(candidates):
     """
-    Get a list of recommendations for free agent swaps.
+    Index a position's free agents by position rank, along with their weekly
+    and season projections, so they can be compared against a rostered player
+    without looping over all of them.
     """
-    fas = league.free_agents(size=200)
-    free_agents = {}
-
-    rows = []
-    for agent in fas:
-        row = []
+    order = sorted(
+        range(len(candidates)), key=lambda i: get_rank(candidates[i])
+    )
+    return {
+        "order": np.array(order, dtype=int),
+        "posRank": np.array(
+            [get_rank(candidates[i]) for i in order], dtype=float
+        ),
+        "projected": np.array(
+            [candidates[i]["Projected Points"] for i in order], dtype=float
+        ),
+        "season": np.array(
+            [candidates[i]["Season Projected Points"] for i in order],
+            dtype=float,
+        ),
+    }
+
+
+def get_better_candidates(player, index):
+    """
+    Get the positions (in the original free agent order) of the candidates
+    that beat a player on position rank, weekly projection and season
+    projection.
+    """
+    player_projected = player["Projected Points"]
+    season_projected = player["Season Projected Points"]
+    if (
+        np.isnan(player_projected)
+        or not player_projected
+        or np.isnan(season_projected)
+    ):
+        return []
+
+    # Candidates are sorted by rank, so the better ranked ones are a prefix
+    higher_ranked = np.searchsorted(index["posRank"], get_rank(player))
+    projected = index["projected"][:higher_ranked]
+    season = index["season"][:higher_ranked]
+
+    better = (
+        (projected != 0)
+        & (projected > player_projected)
+        & (season > season_projected)
+    )
+    return sorted(index["order"][:higher_ranked][better])
 
-        row.append(agent.name)
-        row.append(agent.projected_points)
-        row.append(agent.position)
-        row.append(agent.posRank)
 
-        rows.append(row)
+def group_free_agents(free_agents):
+    """
+    Group free agent records by position, keeping their original order.
+    """
+    grouped = {}
 
-        this_position_free_agents = free_agents.get(agent.position, [])
-        this_position_free_agents.append(agent)
-        free_agents[agent.position] = this_position_free_agents
+    for agent in free_agents.to_dict("records"):
+        grouped.setdefault(agent["Position"], []).append(agent)
 
-    # Look for recommendations for a specific team
-    recommendations = {}
+    return grouped
 
-    team = [t for t in league.teams if t.team_name == team_name][0]
 
-    for player in team.roster:
-        candidates = free_agents[player.position]
+def get_swap_finalists(roster, free_agents):
+    """
+    Get (player, candidate, for_arguments) for every swap on a team that
+    passes all of the checks. `roster` is the team's roster records and
+    `free_agents` the free agents grouped by group_free_agents, whose ranks
+    get back-filled along the way.
+    """
+    finalists = []
+    indexes = {}
 
-        player_projected_points = player.stats.get(
-            league.current_week, {}
-        ).get("projected_points")
-        player.projected_points = player_projected_points
+    for player in roster.to_dict("records"):
+        position = player["Position"]
+        candidates = free_agents.get(position, [])
 
         # For now, don't mess with injured players
-        if player.projected_points != 0.0:
+        if player["Projected Points"] == 0.0 or not candidates:
+            continue
 
+        # Unranked players are ranked just behind whoever they're first
+        # compared against
+        if position not in indexes:
             for candidate in candidates:
-                recommendation = {}
-                against_arguments = []
-                for_arguments = []
-
-                # If candidate has a higher position rank, add argue to swap
-                if candidate.posRank == [] or candidate.posRank == 0:
-                    candidate.posRank = player.posRank + 1
-
-                if player.posRank == [] or player.posRank == 0:
-                    player.posRank = candidate.posRank + 1
-
-                if candidate.posRank < player.posRank:
-                    for_arguments.append(
-                        f"{candidate.name} has a higher position rank ({candidate.posRank}) than {player.name} ({player.posRank})"  # noqa:E501
-                    )
-
-                else:
-                    against_arguments.append(
-                        f"{candidate.name} has a lower position rank ({candidate.posRank}) than {player.name} ({player.posRank})"  # noqa:E501
-                    )
-
-                # If a candidate has more projected points for this week, argue
-                # to swap
-                if (
-                    not candidate.projected_points
-                    or not player.projected_points
+                if is_unranked(candidate) and not np.isnan(
+                    player["Position Rank"]
+                ):
+                    candidate["Position Rank"] = player["Position Rank"] + 1
+                if is_unranked(player) and not np.isnan(
+                    candidate["Position Rank"]
                 ):
-                    against_arguments.append(
-                        f"Neither {candidate.name} nor {player.name} are projected to score any points this week."  # noqa:E501
-                    )
-
-                elif candidate.projected_points > player.projected_points:
-                    for_arguments.append(
-                        f"{candidate.name} is projected to score more points this week ({candidate.projected_points}) than {player.name} ({player.projected_points})"  # noqa:E501
-                    )
-
-                else:
-                    against_arguments.append(
-                        f"{candidate.name} is projected to score fewer points this week ({candidate.projected_points}) than {player.name} ({player.projected_points})"  # noqa:E501
-                    )
-
-                # If a candidate has more points for season, argue to swap
-                player_season_points = player.stats.get(0, {}).get(
-                    "projected_points"
+                    player["Position Rank"] = candidate["Position Rank"] + 1
+            indexes[position] = build_free_agent_index(candidates)
+
+        elif is_unranked(player) and not np.isnan(
+            candidates[0]["Position Rank"]
+        ):
+            player["Position Rank"] = candidates[0]["Position Rank"] + 1
+
+        # Only candidates that win on every count need any more work
+        for i in get_better_candidates(player, indexes[position]):
+            candidate = candidates[i]
+
+            for_arguments = [
+                f"{candidate['Player Name']} has a higher position rank ({format_rank(candidate)}) than {player['Player Name']} ({format_rank(player)})",  # noqa:E501
+                f"{candidate['Player Name']} is projected to score more points this week ({candidate['Projected Points']}) than {player['Player Name']} ({player['Projected Points']})",  # noqa:E501
+                f"{candidate['Player Name']} is projected to score more points this year ({candidate['Season Projected Points']}) than {player['Player Name']} ({player['Season Projected Points']})",  # noqa:E501
+            ]
+            finalists.append(
+                (
+                    player["Player Name"],
+                    candidate["Player Name"],
+                    for_arguments,
                 )
-                player.season_projected = player_season_points
+            )
 
-                candidate_season_points = candidate.stats.get(0, {}).get(
-                    "projected_points"
+    return finalists
+
+
+def apply_fantasy_pros_recommendations(finalists, fantasy_pros_recs):
+    """
+    Turn a team's swap finalists into recommendations, dropping any swap
+    fantasy pros disagrees with.
+    """
+    recommendations = {}
+
+    for player, candidate, for_arguments in finalists:
+        against_arguments = []
+        for_arguments = list(for_arguments)
+        fantasy_pros_rec = fantasy_pros_recs[(candidate, player)]
+
+        # If fantasy pros recommends a candidate, argue for it
+        if fantasy_pros_rec != {}:
+
+            player_pcnt = fantasy_pros_rec[player]
+            candidate_pcnt = fantasy_pros_rec[candidate]
+            fantasy_pros_url = fantasy_pros_rec["url"]
+
+            if candidate_pcnt > player_pcnt:
+                for_arguments.append(
+                    f"Fantasy pros would start {candidate} "
+                    f"({candidate_pcnt}) over {player} "
+                    f"({player_pcnt}) ({fantasy_pros_url})"
+                )
+            else:
+                against_arguments.append(
+                    f"Fantasy pros would start {player} "
+                    f"({player_pcnt}) over {candidate} "
+                    f"({candidate_pcnt}) ({fantasy_pros_url})"
                 )
-                candidate.season_projected = candidate_season_points
-
-                if candidate.season_projected > player.season_projected:
-                    for_arguments.append(
-                        f"{candidate.name} is projected to score more points this year ({candidate.season_projected}) than {player.name} ({player.season_projected})"  # noqa:E501
-                    )
-
-                else:
-                    against_arguments.append(
-                        f"{candidate.name} is projected to score fewer points this year ({candidate.season_projected}) than {player.name} ({player.season_projected})"  # noqa:E501
-                    )
-
-                if len(against_arguments) == 0:
-                    # If fantasy pros recommends a candidate, argue for it
-                    fantasy_pros_rec = utils.get_fantasy_pros_recommendation(
-                        candidate.name, player.name
-                    )
-
-                    if fantasy_pros_rec != {}:
-
-                        player_pcnt = fantasy_pros_rec[player.name]
-                        candidate_pcnt = fantasy_pros_rec[candidate.name]
-                        fantasy_pros_url = fantasy_pros_rec["url"]
-
-                        if candidate_pcnt > player_pcnt:
-                            for_arguments.append(
-                                f"Fantasy pros would start {candidate.name} "
-                                f"({candidate_pcnt}) over {player.name} "
-                                f"({player_pcnt}) ({fantasy_pros_url})"
-                            )
-                        else:
-                            against_arguments.append(
-                                f"Fantasy pros would start {player.name} "
-                                f"({player_pcnt}) over {candidate.name} "
-                                f"({candidate_pcnt}) ({fantasy_pros_url})"
-                            )
-                    if len(against_arguments) == 0:
-                        requires_action = True
-                    else:
-                        requires_action = False
-                else:
-                    requires_action = False
-
-                arguments = ", ".join(for_arguments + against_arguments)
-
-                recommendation = {
-                    "swap_for": candidate.name,
-                    "reasons": arguments,
-                    "for_reasons": for_arguments,
-                    "against_reasons": against_arguments,
-                }
-
-                if requires_action:
-                    player_recommendations = recommendations.get(
-                        player.name, []
-                    )
-                    player_recommendations.append(recommendation)
-                    recommendations[player.name] = player_recommendations
+
+        if len(against_arguments) == 0:
+            arguments = ", ".join(for_arguments)
+
+            recommendation = {
+                "swap_for": candidate,
+                "reasons": arguments,
+                "for_reasons": for_arguments,
+                "against_reasons": against_arguments,
+            }
+
+            player_recommendations = recommendations.get(player, [])
+            player_recommendations.append(recommendation)
+            recommendations[player] = player_recommendations
 
     return recommendations
 
 
-def get_free_agents_df(fa_team_name, league):
-    fa_team = [t for t in league.teams if t.team_name == fa_team_name][0]
+@timed()
+def get_league_recommendations(rosters, free_agents, week, team_names=None):
+    """
+    Get free agent swap recommendations for every team (or just
+    `team_names`) from roster and free agent records (see karen.adapters),
+    asking fantasy pros only once.
+
+    Returns a dict of team name -> recommendations.
+    """
+    grouped_free_agents = group_free_agents(free_agents)
+
+    finalists = {}
+    for team_name, roster in rosters.groupby("Team", sort=False):
+        if team_names is not None and team_name not in team_names:
+            continue
+
+        # Ranks get back-filled relative to each team's players, so every
+        # team starts from the ranks the platform gave us
+        team_free_agents = {
+            position: [dict(agent) for agent in agents]
+            for position, agents in grouped_free_agents.items()
+        }
+        finalists[team_name] = get_swap_finalists(roster, team_free_agents)
+
+    fantasy_pros_recs = utils.get_fantasy_pros_recommendations(
+        [
+            (candidate, player)
+            for team_finalists in finalists.values()
+            for player, candidate, _ in team_finalists
+        ],
+        week=week,
+    )
+
+    return {
+        team_name: apply_fantasy_pros_recommendations(
+            team_finalists, fantasy_pros_recs
+        )
+        for team_name, team_finalists in finalists.items()
+    }
+
+
+def get_recommendations(team_name, rosters, free_agents, week):
+    """
+    Get a list of recommendations for free agent swaps.
+    """
+    return get_league_recommendations(
+        rosters, free_agents, week, team_names=[team_name]
+    )[team_name]
+
 
-    fa_recommendations = get_recommendations(fa_team.team_name, league)
-    recommended_players = [p for p in fa_recommendations]
+def build_free_agents_df(fa_recommendations):
+    """
+    Build a dataframe of a team's free agent recommendations.
+    """
     rows = []
 
-    for player in recommended_players:
-        recommended_actions = fa_recommendations[player]
+    for player, recommended_actions in fa_recommendations.items():
 
         for action in recommended_actions:
             swap_for = action["swap_for"]
@@ -773,6 +1193,25 @@ def get_free_agents_df(fa_team_name, league):
     return fa_df
 
 
+def get_free_agents_df(fa_team_name, rosters, free_agents, week):
+    fa_recommendations = get_recommendations(
+        fa_team_name, rosters, free_agents, week
+    )
+    return build_free_agents_df(fa_recommendations)
+
+
+def get_league_free_agents_dfs(rosters, free_agents, week):
+    """
+    Build every team's free agent recommendations dataframe in one pass.
+    """
+    return {
+        team_name: build_free_agents_df(fa_recommendations)
+        for team_name, fa_recommendations in get_league_recommendations(
+            rosters, free_agents, week
+        ).items()
+    }
+
+
 def get_player_analysis_chart(player_name, df):
     # Player Level
     player = df[df["Player Name"] == player_name]
@@ -781,23 +1220,6 @@ def get_player_analysis_chart(player_name, df):
     # diff = sum(player["Projection Diff"])
     position = player["Position"].unique()[0]
 
-    # League Level
-    grouped = df.groupby(by=["Player Name", "Position"]).sum()
-
-    # Zscores and aggregate
-    zscores = (
-        df.groupby(by=["Player Name", "Position"])
-        .sum()
-        .apply(zscore)[["Points", "Projected Points", "Projection Diff"]]
-    )
-    zscores.columns = ["Points_z", "Projected Points_z", "Projection Diff_z"]
-    zscores.query("Position == 'RB'").sort_values("Points_z", ascending=True)
-    left = grouped
-    right = zscores
-    merged = left.merge(right, on=["Player Name", "Position"])
-    del merged["Week"]
-    merged.sort_values(by="Projection Diff_z", ascending=False)
-
     # Grouped by week
     weekly_grouped = (
         df.query(f"Position == '{position}'")[
@@ -883,80 +1305,99 @@ def get_player_analysis_chart(player_name, df):
     return fig
 
 
-def luck(row, return_val="lucky"):
-    won = row["Won"]
-    points = row["Points"]
-    avg_points = row["League Points"]
+LUCK_MODES = ["mean", "median", "expected"]
 
-    if won and points < avg_points:
-        lucky = 1
-        unlucky = 0
 
-    elif not won and points > avg_points:
-        lucky = 0
-        unlucky = 1
-
-    else:
-        lucky = 0
-        unlucky = 0
-
-    if return_val == "lucky":
-        return lucky
-    elif return_val == "unlucky":
-        return unlucky
-
-
-def build_luck_df(df):
+def build_weekly_team_points(df):
     """
-    Build a dataframe of Lucky and Unlucky teams.
+    Build a dataframe of each team's (non-bench) points for every week.
     """
-    # Grab the weekly average of points for the league
-    weekly_averages_df = (
+    keys = ["Week", "Team", "Opponent"]
+    return (
         df[df["Slot"] != "BE"]
-        .groupby(["Week", "Team"], as_index=False)
+        .groupby(keys, as_index=False, observed=True)["Points"]
         .sum()
-        .groupby(["Week"])
-        .mean()[["Points"]]
+        .sort_values(keys, ignore_index=True)
     )
-    weekly_averages_df["League Points"] = weekly_averages_df["Points"]
-    del weekly_averages_df["Points"]
 
-    # Grab each team's points
-    team_points_df = (
-        df[df["Slot"] != "BE"]
-        .groupby(["Week", "Team", "Opponent"], as_index=False)
-        .sum()[["Week", "Team", "Points", "Opponent"]]
-    )
-    team_points_df["Team Points"] = team_points_df["Points"]
-    del team_points_df["Points"]
+
+def build_luck_df(df, mode="mean"):
+    """
+    Build a dataframe of Lucky and Unlucky teams.
+
+    `mode` decides what counts as lucky:
+
+    - "mean": a win while scoring less than the league average is lucky, a
+      loss while scoring more than it is unlucky.
+    - "median": the same, but against the league median.
+    - "expected": how far each result was from the share of the league the
+      team would have beaten that week (so luck can be fractional).
+    """
+    if mode not in LUCK_MODES:
+        raise ValueError(
+            f"'{mode}' is not a valid luck mode!"
+            f"\nMust be one of: {', '.join(LUCK_MODES)}"
+        )
+
+    team_points_df = build_weekly_team_points(df)
+    weekly_points = team_points_df.groupby("Week")["Points"]
+
+    if mode == "median":
+        team_points_df["League Points"] = weekly_points.transform("median")
+    else:
+        team_points_df["League Points"] = weekly_points.transform("mean")
+
+    if mode == "expected":
+        teams_per_week = weekly_points.transform("count")
+        team_points_df["Expected Wins"] = (
+            weekly_points.rank(method="average") - 1
+        ) / (teams_per_week - 1)
+
     # Self join to get opponent points
-    w_opponent_score = team_points_df.merge(
-        team_points_df[["Week", "Opponent", "Team Points"]],
-        left_on=["Week", "Team"],
-        right_on=["Week", "Opponent"],
+    opponent_points_df = team_points_df[["Week", "Team", "Points"]].rename(
+        columns={"Team": "Opponent", "Points": "Opponent Points"}
     )
-    w_opponent_score["Won"] = (
-        w_opponent_score["Team Points_x"] > w_opponent_score["Team Points_y"]
+    # (teams on a bye have no opponent, so they're left out)
+    joined_df = team_points_df.merge(
+        opponent_points_df, how="left", on=["Week", "Opponent"]
     )
-    w_opponent_score["Opponent"] = w_opponent_score["Opponent_x"]
-    w_opponent_score["Points"] = w_opponent_score["Team Points_x"]
-    w_opponent_score["Opponent Points"] = w_opponent_score["Team Points_y"]
-    del w_opponent_score["Team Points_x"]
-    del w_opponent_score["Team Points_y"]
-    del w_opponent_score["Opponent_x"]
-    del w_opponent_score["Opponent_y"]
-    teams_df = w_opponent_score[
-        ["Week", "Team", "Opponent", "Points", "Opponent Points", "Won"]
-    ]
+    joined_df = joined_df[joined_df["Opponent Points"].notna()].reset_index(
+        drop=True
+    )
+    joined_df["Won"] = joined_df["Points"] > joined_df["Opponent Points"]
 
-    # Join them together
-    joined_df = teams_df.merge(weekly_averages_df, on=["Week"])
+    won = joined_df["Won"]
 
-    joined_df["Lucky Wins"] = joined_df.apply(luck, axis=1)
-    joined_df["Unlucky Losses"] = joined_df.apply(
-        luck, axis=1, return_val="unlucky"
-    )
-    return joined_df
+    if mode == "expected":
+        joined_df["Lucky Wins"] = (won - joined_df["Expected Wins"]).clip(
+            lower=0
+        )
+        joined_df["Unlucky Losses"] = (joined_df["Expected Wins"] - won).clip(
+            lower=0
+        )
+    else:
+        points = joined_df["Points"]
+        league_points = joined_df["League Points"]
+        joined_df["Lucky Wins"] = (won & (points < league_points)).astype(int)
+        joined_df["Unlucky Losses"] = (
+            ~won & (points > league_points)
+        ).astype(int)
+
+    columns = [
+        "Week",
+        "Team",
+        "Opponent",
+        "Points",
+        "Opponent Points",
+        "Won",
+        "League Points",
+        "Lucky Wins",
+        "Unlucky Losses",
+    ]
+    if mode == "expected":
+        columns.insert(-2, "Expected Wins")
+
+    return joined_df[columns]
 
 
 def build_team_luck_chart(team_name, luck_df):
@@ -990,39 +1431,32 @@ def build_team_luck_chart(team_name, luck_df):
         )
     )
 
-    for i, row in luck_df_team.iterrows():
-
-        if row["Lucky Wins"] != 0:
-            x = row["Week"]
-            y = row["Points"]
-            fig.add_annotation(
-                x=x,
-                y=y,
-                text="Lucky win!!!",
-                showarrow=True,
-                font=dict(family="IBM Plex Sans", size=14, color="#262730"),
-                align="center",
-                arrowhead=2,
-                arrowsize=1,
-                arrowwidth=2,
-            )
-
-        elif row["Unlucky Losses"] != 0:
-            x = row["Week"]
-            y = row["Points"]
-            fig.add_annotation(
-                x=x,
-                y=y,
-                text="Unlucky loss!",
-                showarrow=True,
-                font=dict(family="IBM Plex Sans", size=14, color="#262730"),
-                align="center",
-                arrowhead=2,
-                arrowsize=1,
-                arrowwidth=2,
-            )
+    # Label every lucky win and unlucky loss, all at once
+    labels = np.select(
+        [luck_df_team["Lucky Wins"] != 0, luck_df_team["Unlucky Losses"] != 0],
+        ["Lucky win!!!", "Unlucky loss!"],
+        "",
+    )
+    annotations = [
+        dict(
+            x=week,
+            y=points,
+            text=label,
+            showarrow=True,
+            font=dict(family="IBM Plex Sans", size=14, color="#262730"),
+            align="center",
+            arrowhead=2,
+            arrowsize=1,
+            arrowwidth=2,
+        )
+        for week, points, label in zip(
+            luck_df_team["Week"], luck_df_team["Points"], labels
+        )
+        if label
+    ]
 
     fig.update_layout(
+        annotations=annotations,
         title=f"{team_name}'s Lucky Wins & Unlucky Losses",
         xaxis_title="Week",
         yaxis_title="Points",
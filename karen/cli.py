@@ -0,0 +1,159 @@
+import argparse
+import logging
+import os
+
+from karen import constant, get_league
+from karen.artifacts import ArtifactStore
+from karen.instrumentation import COUNT_ESPN_BYTES_ENV, instrumentation
+from karen.warehouse import Warehouse
+
+
+def precompute(platform, league_id, year, secret_name, artifacts):
+    """
+    Build every league-level dataframe for one season and write them to
+    `artifacts`.
+    """
+    league = get_league(platform, league_id, year, secret_name)
+    league.connect()
+    league.build_player_df()
+    league.build_luck_df()
+    league.build_matchups_df()
+
+    # Power rankings for every week the app's slider can show
+    for week in range(1, league.espn_league.current_week + 1):
+        league.build_power_rankings_df(week=week)
+
+    league.save_artifacts(artifacts)
+    return league
+
+
+def ingest(platform, league_id, years, secret_name, warehouse):
+    """
+    Ingest every season in `years` that `warehouse` doesn't have yet (or
+    that wasn't over when it was ingested). Returns the years ingested.
+    """
+    missing_years = warehouse.missing_years(platform, league_id, years)
+    for year in missing_years:
+        print(f"Ingesting {platform} league {league_id} ({year})")
+        league = get_league(platform, league_id, year, secret_name)
+        league.connect()
+        league.build_player_df()
+        warehouse.ingest(league)
+    return missing_years
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="karen")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    precompute_parser = subparsers.add_parser(
+        "precompute",
+        help="Precompute a league's dataframes so the app can start warm.",
+    )
+    # Only ESPN leagues can be precomputed for now
+    precompute_parser.add_argument(
+        "--platform",
+        choices=["ESPN"],
+        default=os.environ.get("KAREN_PLATFORM", "ESPN"),
+    )
+    precompute_parser.add_argument(
+        "--league-id", default=os.environ.get("KAREN_LEAGUE_ID", 503767)
+    )
+    precompute_parser.add_argument(
+        "--secret-name",
+        default=os.environ.get(
+            "KAREN_SECRET_NAME", "fantasy-football-secrets"
+        ),
+    )
+    precompute_parser.add_argument(
+        "--year",
+        type=int,
+        action="append",
+        dest="years",
+        help="Can be given more than once (default: all supported years).",
+    )
+    precompute_parser.add_argument(
+        "--out", help="Artifact directory (default: ~/.karen/artifacts)."
+    )
+    precompute_parser.add_argument(
+        "--stats",
+        choices=["log", "prometheus"],
+        help="Print per-stage timings as JSON logs or Prometheus text.",
+    )
+
+    ingest_parser = subparsers.add_parser(
+        "ingest",
+        help="Add a league's seasons to the multi-season warehouse.",
+    )
+    ingest_parser.add_argument(
+        "--platform",
+        choices=["ESPN", "Yahoo"],
+        default=os.environ.get("KAREN_PLATFORM", "ESPN"),
+    )
+    ingest_parser.add_argument(
+        "--league-id", default=os.environ.get("KAREN_LEAGUE_ID", 503767)
+    )
+    ingest_parser.add_argument(
+        "--secret-name",
+        default=os.environ.get(
+            "KAREN_SECRET_NAME", "fantasy-football-secrets"
+        ),
+    )
+    ingest_parser.add_argument(
+        "--year",
+        type=int,
+        action="append",
+        dest="years",
+        help="Can be given more than once (default: all supported years).",
+    )
+    ingest_parser.add_argument(
+        "--out", help="Warehouse directory (default: ~/.karen/warehouse)."
+    )
+    ingest_parser.add_argument(
+        "--stats",
+        choices=["log", "prometheus"],
+        help="Print per-stage timings as JSON logs or Prometheus text.",
+    )
+
+    args = parser.parse_args(argv)
+    years = args.years or constant.SUPPORTED_YEARS
+
+    if args.stats:
+        # Worth the extra work when the stats are going to be printed
+        os.environ[COUNT_ESPN_BYTES_ENV] = "1"
+
+    if args.command == "ingest":
+        warehouse = Warehouse(args.out)
+        ingested = ingest(
+            args.platform, args.league_id, years, args.secret_name, warehouse
+        )
+        if not ingested:
+            print("Every season is already in the warehouse")
+        print(f"Warehouse is at {warehouse.root}")
+
+    else:
+        artifacts = ArtifactStore(args.out)
+        for year in years:
+            print(
+                f"Precomputing {args.platform} league {args.league_id} "
+                f"({year})"
+            )
+            precompute(
+                args.platform,
+                args.league_id,
+                year,
+                args.secret_name,
+                artifacts,
+            )
+
+        print(f"Wrote artifacts to {artifacts.root}")
+
+    if args.stats == "log":
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        instrumentation.log_stats()
+    elif args.stats == "prometheus":
+        print(instrumentation.to_prometheus(), end="")
+
+
+if __name__ == "__main__":
+    main()
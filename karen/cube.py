@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+
+class WeekCube:
+    """
+    Weekly sums of some of the player_df's columns, grouped by `keys`.
+
+    The sums are stored as running totals over the weeks, so the sum over
+    any range of weeks is the difference of two columns instead of another
+    pass over the player_df.
+    """
+
+    def __init__(self, player_df, keys, values):
+        self.keys = keys
+        self.values = values
+        self.last_week = int(max(player_df["Week"], default=0))
+        weeks = range(1, self.last_week + 1)
+
+        weekly = player_df.groupby(keys + ["Week"], observed=True)[
+            values
+        ].agg(["sum", "count"])
+        weekly = weekly.unstack("Week", fill_value=0).sort_index()
+        self.index = weekly.index
+
+        # Column 0 is all zeros so week 1 needs no special casing
+        self.prefix = {}
+        for value in values:
+            for agg in ["sum", "count"]:
+                # Without any rows, unstacking leaves no columns at all
+                by_week = (
+                    weekly[(value, agg)]
+                    if not weekly.empty
+                    else pd.DataFrame(index=self.index)
+                )
+                by_week = by_week.reindex(columns=weeks, fill_value=0)
+                self.prefix[(value, agg)] = np.hstack(
+                    [
+                        np.zeros((len(self.index), 1)),
+                        np.cumsum(by_week.values, axis=1),
+                    ]
+                )
+
+    def sum(self, week_range=None):
+        """
+        Get a dataframe of the sums for an inclusive (start, end) range of
+        weeks, or for every week. Groups with no rows in that range are left
+        out.
+        """
+        start, end = week_range if week_range else (1, self.last_week)
+        start = max(start, 1)
+        end = min(end, self.last_week)
+
+        if start > end:
+            index = self.index[:0]
+            return pd.DataFrame(columns=self.values, index=index, dtype=float)
+
+        def range_sum(value, agg):
+            prefix = self.prefix[(value, agg)]
+            return prefix[:, end] - prefix[:, start - 1]
+
+        df = pd.DataFrame(
+            {value: range_sum(value, "sum") for value in self.values},
+            index=self.index,
+        )
+        # Any value's count will do, they all count the same rows
+        present = range_sum(self.values[0], "count") > 0
+        return df[present]
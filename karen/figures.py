@@ -0,0 +1,86 @@
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.io as pio
+
+
+MAX_FIGURES = 256
+
+
+def get_data_version(*dfs):
+    """
+    Fingerprint the contents of some dataframes, so anything built from
+    them can be reused for as long as they don't change.
+    """
+    digest = hashlib.sha1()
+    for df in dfs:
+        digest.update(str(list(df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df).values.tobytes())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """
+    A process-wide cache of Plotly figures, stored as JSON and keyed by
+    (chart, entity, data version), e.g. ("mvp", "Team 1", <player_df
+    version>).
+
+    Serialized figures can't be changed by whoever renders them, and
+    rebuilding one from JSON skips all the work of building it from the
+    data. The least recently used figures are evicted first once there are
+    more than `max_size`.
+    """
+
+    def __init__(self, max_size=MAX_FIGURES):
+        self.max_size = max_size
+
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, chart, entity, version, build):
+        """
+        Get a figure from the cache, calling `build()` to build it if it
+        isn't cached.
+        """
+        key = (chart, entity, version)
+
+        with self._lock:
+            figure_json = self._figures.get(key)
+            if figure_json is not None:
+                self._figures.move_to_end(key)
+                self.metrics["hits"] += 1
+            else:
+                self.metrics["misses"] += 1
+
+        if figure_json is not None:
+            return pio.from_json(figure_json)
+
+        fig = build()
+        figure_json = fig.to_json()
+
+        with self._lock:
+            self._figures[key] = figure_json
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_size:
+                self._figures.popitem(last=False)
+                self.metrics["evictions"] += 1
+
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self):
+        """
+        Get the cache's hit/miss metrics along with its current size.
+        """
+        with self._lock:
+            return {**self.metrics, "size": len(self._figures)}
+
+
+figure_cache = FigureCache()
@@ -0,0 +1,230 @@
+import cProfile
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+
+
+# Set to "cprofile" or "pyinstrument" to profile every top-level stage
+PROFILE_ENV = "KAREN_PROFILE"
+# Set to count the bytes of every ESPN response, which costs re-encoding them
+COUNT_ESPN_BYTES_ENV = "KAREN_COUNT_ESPN_BYTES"
+DEFAULT_PROFILE_DIR = os.path.join(
+    os.path.expanduser("~"), ".karen", "profiles"
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Instrumentation:
+    """
+    Wall time, call counts, errors and bytes fetched per named stage, e.g.
+    `BaseLeague.build_player_df` or `get_week_box_scores`.
+
+    Times are inclusive, so a stage's time includes any stages it calls.
+    Bytes are added to the innermost stage running on the current thread.
+
+    If the KAREN_PROFILE env var is set, every stage that isn't nested in
+    another one (on its thread) is also profiled, and the profile is written
+    to `profile_dir`.
+    """
+
+    def __init__(self, profile_dir=None):
+        self.profile_dir = profile_dir or os.environ.get(
+            "KAREN_PROFILE_DIR", DEFAULT_PROFILE_DIR
+        )
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _get_stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record(self, name, **amounts):
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {"calls": 0, "errors": 0, "seconds": 0.0, "bytes": 0}
+            )
+            for key, amount in amounts.items():
+                stats[key] += amount
+
+    @contextmanager
+    def _profile(self, name):
+        mode = os.environ.get(PROFILE_ENV, "").lower()
+        if not mode:
+            yield
+            return
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{name}-{time.time_ns()}")
+
+        if mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("pyinstrument isn't installed, using cProfile instead")
+            else:
+                profiler = Profiler()
+                profiler.start()
+                try:
+                    yield
+                finally:
+                    profiler.stop()
+                    with open(f"{path}.html", "w") as f:
+                        f.write(profiler.output_html())
+                return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(f"{path}.prof")
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Record a block of code as a run of the stage `name`.
+        """
+        stack = self._get_stack()
+        outermost = not stack
+        stack.append(name)
+
+        start = time.perf_counter()
+        try:
+            if outermost:
+                with self._profile(name):
+                    yield
+            else:
+                yield
+        except Exception:
+            self._record(name, errors=1)
+            raise
+        finally:
+            self._record(name, calls=1, seconds=time.perf_counter() - start)
+            stack.pop()
+
+    def timed(self, name=None):
+        """
+        Decorate a function so every call to it is recorded as a stage,
+        named after the function by default.
+        """
+
+        def decorator(func):
+            stage_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record_bytes(self, amount, name=None):
+        """
+        Add to the bytes fetched by a stage, the one that's currently running
+        by default.
+        """
+        if name is None:
+            stack = self._get_stack()
+            if not stack:
+                return
+            name = stack[-1]
+        self._record(name, bytes=amount)
+
+    def stats(self):
+        """
+        Get a copy of every stage's stats, keyed by stage name.
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_records(self):
+        """
+        Get the stats as a list of flat dicts, one per stage.
+        """
+        return [
+            {"stage": name, **stats}
+            for name, stats in sorted(self.stats().items())
+        ]
+
+    def log_stats(self):
+        """
+        Log every stage's stats as a line of JSON.
+        """
+        for record in self.to_records():
+            logger.info(json.dumps(record))
+
+    def to_prometheus(self):
+        """
+        Get the stats in Prometheus' text exposition format.
+        """
+        metrics = [
+            ("calls", "karen_stage_calls_total", "Calls per stage."),
+            ("errors", "karen_stage_errors_total", "Failed calls per stage."),
+            ("seconds", "karen_stage_seconds_total", "Wall time per stage."),
+            ("bytes", "karen_stage_bytes_total", "Bytes fetched per stage."),
+        ]
+        stats = sorted(self.stats().items())
+
+        lines = []
+        for key, metric, description in metrics:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stage_stats in stats:
+                lines.append(f'{metric}{{stage="{name}"}} {stage_stats[key]}')
+        return "\n".join(lines) + "\n"
+
+
+class ByteCountingLogger:
+    """
+    Stands in for an `espn_api` request logger, which sees every decoded
+    ESPN response, to count the bytes fetched by the current stage.
+
+    `espn_api` doesn't hand out the raw responses, so they're measured by
+    encoding them again. That's too slow to leave on, so it's only used when
+    the KAREN_COUNT_ESPN_BYTES env var is set (see count_espn_bytes).
+    """
+
+    def __init__(self, espn_logger):
+        self.espn_logger = espn_logger
+
+    def log_request(self, endpoint, response, params=None, headers=None):
+        instrumentation.record_bytes(len(json.dumps(response)))
+        if self.espn_logger.logging.isEnabledFor(logging.DEBUG):
+            self.espn_logger.log_request(
+                endpoint, response, params=params, headers=headers
+            )
+
+
+def count_espn_bytes(league):
+    """
+    Count the bytes of every ESPN response an `espn_api` League gets from
+    now on, if the KAREN_COUNT_ESPN_BYTES env var is set.
+    """
+    if not os.environ.get(COUNT_ESPN_BYTES_ENV):
+        return league
+
+    espn_request = league.espn_request
+    if not isinstance(espn_request.logger, ByteCountingLogger):
+        espn_request.logger = ByteCountingLogger(espn_request.logger)
+    return league
+
+
+instrumentation = Instrumentation()
+stage = instrumentation.stage
+timed = instrumentation.timed
+record_bytes = instrumentation.record_bytes
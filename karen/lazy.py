@@ -0,0 +1,91 @@
+import threading
+
+from karen.instrumentation import stage
+
+
+class artifact:
+    """
+    A lazily built, memoized attribute, declared with the names of the
+    artifacts it's built from:
+
+        @artifact("player_df")
+        def matchups_df(self):
+            return cleaning.build_matchups_df(self.player_df)
+
+    The method runs the first time the attribute is read and its result is
+    kept until the attribute is set. Setting it (to None to just forget it)
+    also forgets every artifact that depends on it, directly or not, so they
+    get rebuilt from the new value the next time they're read.
+    """
+
+    def __init__(self, *depends_on):
+        self.depends_on = depends_on
+
+    def __call__(self, build):
+        self.build = build
+        self.__doc__ = build.__doc__
+        return self
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+
+        value = obj.__dict__.get(self.name)
+        if value is not None:
+            return value
+
+        # One build at a time per object, builds can read other artifacts
+        with _get_lock(obj):
+            value = obj.__dict__.get(self.name)
+            if value is None:
+                with stage(f"{type(obj).__name__}.{self.name}"):
+                    value = self.build(obj)
+                obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        with _get_lock(obj):
+            for name in [self.name] + get_dependents(type(obj), self.name):
+                obj.__dict__.pop(name, None)
+            if value is not None:
+                obj.__dict__[self.name] = value
+
+
+_dependents = {}
+
+
+def _get_lock(obj):
+    # dict.setdefault is atomic, so every thread gets the same lock
+    return obj.__dict__.setdefault("_artifacts_lock", threading.RLock())
+
+
+def get_dependents(cls, name):
+    """
+    Get the names of every artifact on `cls` built (directly or not) from
+    the artifact `name`.
+    """
+    if cls not in _dependents:
+        artifacts = {
+            attr_name: attr
+            for klass in reversed(cls.__mro__)
+            for attr_name, attr in vars(klass).items()
+            if isinstance(attr, artifact)
+        }
+        graph = {attr_name: [] for attr_name in artifacts}
+        for attr_name, attr in artifacts.items():
+            for dependency in attr.depends_on:
+                graph.setdefault(dependency, []).append(attr_name)
+        _dependents[cls] = graph
+
+    graph = _dependents[cls]
+    dependents = []
+    to_visit = list(graph.get(name, []))
+    while to_visit:
+        dependent = to_visit.pop()
+        if dependent not in dependents:
+            dependents.append(dependent)
+            to_visit.extend(graph[dependent])
+    return dependents
@@ -1,38 +1,322 @@
 from abc import ABC, abstractmethod
 
+import pandas as pd
+
+from karen import cleaning, utils
+from karen.figures import figure_cache, get_data_version
+from karen.instrumentation import timed
+from karen.lazy import artifact
+from karen.store import SeasonStore
+
 
 class BaseLeague(ABC):
-    def __init__(self):
+    """
+    A fantasy league on some platform.
+
+    Platforms connect and build power rankings. Their data comes in through
+    an adapter (see karen.adapters), so everything built from it works the
+    same way on every platform and lives here. Platforms declare the
+    `adapter` and `player_df` (built with `_build_player_df`) artifacts,
+    depending on their connection.
+    """
+
+    platform = None
+    team_class = None
+
+    def __init__(
+        self, league_id, year, secret_name, debug=False, store=None,
+    ):
         super().__init__()
+        self.league_id = league_id
+        self.year = year
+        self.secret_name = secret_name
+        self.debug = debug
+        self.store = store or SeasonStore()
+
+        # Can be set later
+        self.power_rankings_df = None
+        self.team_summary_df = None
+        self.player_summary_df = None
+        self.top_positions_df = None
+        self.player_analysis_chart = None
 
     @abstractmethod
     def connect(self):
         pass
 
+    @property
     @abstractmethod
-    def build_player_df(self):
+    def current_week(self):
         pass
 
     @abstractmethod
-    def build_power_rankings_df(self):
+    def _get_default_week(self):
+        """
+        Get the last week to build the player_df up to by default.
+        """
         pass
 
     @abstractmethod
-    def build_team_summary_df(self):
+    def build_power_rankings_df(self):
         pass
 
-    @abstractmethod
-    def build_player_summary_df(self):
-        pass
+    # Everything below is built from the adapter or the player_df the first
+    # time it's read (see karen.lazy), and rebuilt once they change
 
-    @abstractmethod
-    def build_top_positions_df(self):
-        pass
+    @artifact("adapter")
+    def teams_df(self):
+        """
+        The team records, with every team's record so far.
+        """
+        return self.adapter.get_teams()
+
+    @artifact("teams_df")
+    def teams(self):
+        return [
+            {"name": name, "id": team_id}
+            for name, team_id in zip(
+                self.teams_df["Team"].tolist(),
+                self.teams_df["Team ID"].tolist(),
+            )
+        ]
+
+    @artifact("adapter")
+    def free_agents_recommendations(self):
+        """
+        Every team's free agent recommendations by week, then team name.
+        """
+        return {}
+
+    @artifact("player_df")
+    def matchups_df(self):
+        return cleaning.build_matchups_df(self.player_df)
+
+    @artifact("teams_df", "matchups_df")
+    def power_ranking_scores(self):
+        """
+        Every team's power ranking score after every week, by week and then
+        team ID.
+        """
+        return cleaning.build_power_ranking_scores(
+            self.matchups_df, self.teams_df["Team ID"]
+        )
+
+    @artifact("player_df")
+    def luck_df(self):
+        return cleaning.build_luck_df(self.player_df)
+
+    @artifact("player_df")
+    def player_df_version(self):
+        return get_data_version(self.player_df)
+
+    @artifact("luck_df")
+    def luck_df_version(self):
+        return get_data_version(self.luck_df)
+
+    @artifact("player_df")
+    def summary_cubes(self):
+        return cleaning.build_summary_cubes(self.player_df)
+
+    @artifact("player_df")
+    def team_objects(self):
+        """
+        Every team handed out so far, by name. They're built from the
+        player_df, so they're dropped along with it.
+        """
+        return {}
+
+    def _is_final(self, week):
+        """
+        A week's scores are final once the platform has moved on from it, or
+        once the whole season is over.
+        """
+        return (
+            week < self.current_week
+            or self.year < utils.get_current_season()
+        )
+
+    def _build_player_df(self, week=None, max_workers=4):
+        if not week:
+            week = self._get_default_week()
+
+        key = (self.platform, self.league_id, self.year)
+        weeks = range(1, week + 1)
+
+        # Only go to the platform for weeks that aren't stored or might
+        # still change
+        stored_weeks = [
+            w
+            for w in self.store.weeks(*key)
+            if w in weeks and self._is_final(w)
+        ]
+        stored_df = self.store.read(*key, weeks=stored_weeks)
+        missing_weeks = [w for w in weeks if w not in stored_weeks]
+
+        frames = [stored_df] if stored_df is not None else []
+
+        def store_week(fetched_week, week_df):
+            if self._is_final(fetched_week):
+                self.store.write(week_df, *key, fetched_week)
+
+        if missing_weeks or not frames:
+            fetched_df = cleaning.build_weekly_player_df(
+                missing_weeks,
+                self.adapter,
+                max_workers=max_workers,
+                on_week_loaded=store_week,
+            )
+            frames.append(fetched_df)
+
+        player_df = cleaning.apply_player_df_schema(
+            pd.concat(frames).sort_values("Week", kind="stable")
+        )
+        player_df["Cumulative Score"] = cleaning.build_cumulative_scores(
+            player_df
+        )
+        return player_df
+
+    @timed()
+    def build_player_df(self, week=None, max_workers=4):
+        self.player_df = self._build_player_df(
+            week=week, max_workers=max_workers
+        )
+
+    def invalidate_weeks(self, weeks=None):
+        """
+        Forget stored weeks (all of them by default), e.g. after the
+        platform issues stat corrections. They'll be re-fetched on the next
+        build_player_df.
+        """
+        self.store.invalidate(
+            self.platform, self.league_id, self.year, weeks=weeks
+        )
+        self.player_df = None
+
+    def build_summary_cubes(self):
+        self.summary_cubes = None
+        return self.summary_cubes
+
+    @timed()
+    def build_team_summary_df(self, week=None):
+
+        team_summary_df = cleaning.build_team_summary(
+            self.player_df, week_range=week, cubes=self.summary_cubes
+        )
+        self.team_summary_df = team_summary_df
+
+    @timed()
+    def build_player_summary_df(self, week=None, on_teams=None):
+
+        player_summary_df = cleaning.build_player_summary(
+            self.player_df,
+            week_range=week,
+            on_teams=on_teams,
+            cubes=self.summary_cubes,
+        )
+        self.player_summary_df = player_summary_df
+
+    @timed()
+    def build_top_positions_df(self, week=None, mode="Most points scored"):
+
+        top_positions_df = cleaning.build_top_positions_df(
+            self.player_df,
+            week_range=week,
+            mode=mode,
+            cubes=self.summary_cubes,
+        )
+        self.top_positions_df = top_positions_df
+
+    @timed()
+    def build_free_agents_recommendations(self):
+        """
+        Build every team's free agent recommendations for the current week,
+        keyed by week and then team name.
+        """
+        week = self.current_week
+        if week not in self.free_agents_recommendations:
+            self.free_agents_recommendations = {
+                week: cleaning.get_league_free_agents_dfs(
+                    self.adapter.get_rosters(week),
+                    self.adapter.get_free_agents(week),
+                    week,
+                )
+            }
 
-    @abstractmethod
     def build_teams(self):
-        pass
+        self.teams_df = None
+        return self.teams
 
-    @abstractmethod
-    def get_team(self):
-        pass
+    def get_team_record(self, team_name):
+        """
+        Get a team's record from the team records, as a dict.
+        """
+        return self.teams_df[self.teams_df["Team"] == team_name].to_dict(
+            "records"
+        )[0]
+
+    def get_team(self, team_name):
+        teams = [t["name"] for t in self.teams]
+
+        if team_name not in teams:
+            raise ValueError(
+                f"{team_name} is not a valid team in this league!"
+                f"\nMust be one of: {', '.join(teams)}"
+            )
+        if team_name not in self.team_objects:
+            self.team_objects[team_name] = self.team_class(
+                team_name, self.year, self
+            )
+        return self.team_objects[team_name]
+
+    @timed()
+    def build_player_analysis_chart(self, player_name):
+        chart = figure_cache.get(
+            "player_analysis",
+            player_name,
+            self.player_df_version,
+            lambda: cleaning.get_player_analysis_chart(
+                player_name, self.player_df
+            ),
+        )
+
+        self.player_analysis_chart = chart
+
+    def build_matchups_df(self):
+        self.matchups_df = None
+        return self.matchups_df
+
+    @timed()
+    def build_luck_df(self, mode="mean"):
+        self.luck_df = cleaning.build_luck_df(self.player_df, mode=mode)
+
+    def luckiest(self):
+        df = (
+            self.luck_df.groupby(["Team"], as_index=False, observed=True)[
+                "Lucky Wins"
+            ]
+            .sum()
+            .sort_values(by=["Lucky Wins", "Team"], ascending=False)
+        )
+        df.set_index("Team", inplace=True)
+        return df
+
+    def unluckiest(self):
+        df = (
+            self.luck_df.groupby(["Team"], as_index=False, observed=True)[
+                "Unlucky Losses"
+            ]
+            .sum()
+            .sort_values(by=["Unlucky Losses", "Team"], ascending=False)
+        )
+        df.set_index("Team", inplace=True)
+        return df
+
+    @timed()
+    def build_team_luck_chart(self, team_name):
+        chart = figure_cache.get(
+            "team_luck",
+            team_name,
+            self.luck_df_version,
+            lambda: cleaning.build_team_luck_chart(team_name, self.luck_df),
+        )
+        return chart
@@ -0,0 +1,152 @@
+import datetime
+import threading
+import time
+
+from collections import OrderedDict
+
+from dateutil import tz
+
+from karen import utils
+
+
+MAX_LEAGUES = 8
+LEAGUE_TTL = 60 * 60
+LIVE_LEAGUE_TTL = 5 * 60
+
+# Kickoff windows (US/Eastern) by weekday: Thursday, Sunday and Monday
+GAME_WINDOWS = {3: (20, 24), 6: (13, 24), 0: (20, 24)}
+NFL_TIMEZONE = tz.gettz("America/New_York")
+
+
+def is_game_time(now=None):
+    """
+    Check whether NFL games are likely being played right now.
+    """
+    now = now or datetime.datetime.now(NFL_TIMEZONE)
+    now = now.astimezone(NFL_TIMEZONE)
+
+    if now.month not in [9, 10, 11, 12, 1]:
+        return False
+
+    window = GAME_WINDOWS.get(now.weekday())
+    return bool(window) and window[0] <= now.hour < window[1]
+
+
+class LeagueCache:
+    """
+    A process-wide cache of loaded leagues, shared by every Streamlit session.
+
+    Leagues are keyed by (platform, league_id, year) and evicted least
+    recently used first once there are more than `max_size`. Finished seasons
+    never expire, the current one expires after `ttl` seconds, or after
+    `live_ttl` seconds while games are being played, so a new week is picked
+    up by the next load. Only one caller loads a given league at a time;
+    anyone else asking for it waits for that load.
+    """
+
+    def __init__(
+        self, max_size=MAX_LEAGUES, ttl=LEAGUE_TTL, live_ttl=LIVE_LEAGUE_TTL
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.live_ttl = live_ttl
+
+        self._leagues = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "expirations": 0,
+            "evictions": 0,
+        }
+
+    def _get_ttl(self, year):
+        if year < utils.get_current_season():
+            return None
+        return self.live_ttl if is_game_time() else self.ttl
+
+    def _get_fresh(self, key):
+        cached = self._leagues.get(key)
+        if cached is None:
+            return None
+
+        loaded_at, league = cached
+        ttl = self._get_ttl(key[2])
+        if ttl is not None and time.monotonic() - loaded_at > ttl:
+            del self._leagues[key]
+            self.metrics["expirations"] += 1
+            return None
+
+        self._leagues.move_to_end(key)
+        return league
+
+    def get(self, platform, league_id, year, loader):
+        """
+        Get a league from the cache, calling `loader()` to load it if it
+        isn't cached (or has expired).
+        """
+        key = (platform, str(league_id), int(year))
+
+        while True:
+            with self._lock:
+                league = self._get_fresh(key)
+                if league is not None:
+                    self.metrics["hits"] += 1
+                    return league
+
+                loading = self._loading.get(key)
+                if loading is None:
+                    self.metrics["misses"] += 1
+                    loading = self._loading[key] = threading.Event()
+                    break
+
+            # Someone else is loading this league, wait and check again
+            loading.wait()
+
+        try:
+            league = loader()
+        except Exception:
+            with self._lock:
+                self.metrics["load_errors"] += 1
+            raise
+        else:
+            with self._lock:
+                self.metrics["loads"] += 1
+                self._leagues[key] = (time.monotonic(), league)
+                self._leagues.move_to_end(key)
+                while len(self._leagues) > self.max_size:
+                    self._leagues.popitem(last=False)
+                    self.metrics["evictions"] += 1
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+
+        return league
+
+    def invalidate(self, platform=None, league_id=None, year=None):
+        """
+        Drop cached leagues, either all of them or the ones matching the
+        given platform, league and/or year.
+        """
+        with self._lock:
+            for key in list(self._leagues):
+                if (
+                    (platform is None or key[0] == platform)
+                    and (league_id is None or key[1] == str(league_id))
+                    and (year is None or key[2] == int(year))
+                ):
+                    del self._leagues[key]
+
+    def stats(self):
+        """
+        Get the cache's hit/miss metrics along with its current size.
+        """
+        with self._lock:
+            return {**self.metrics, "size": len(self._leagues)}
+
+
+league_cache = LeagueCache()
@@ -1,32 +1,59 @@
 from espn_api.football import League
+from espn_api.requests.espn_requests import ESPNAccessDenied
 
 from karen import cleaning, utils
+from karen.adapters.espn import EspnAdapter
+from karen.artifacts import FRAMES, ArtifactStore
+from karen.figures import figure_cache, get_data_version
+from karen.instrumentation import count_espn_bytes, timed
+from karen.lazy import artifact
 from karen.leagues.base import BaseLeague
 from karen.teams.espn import EspnTeam
 
 
 class EspnLeague(BaseLeague):
-    def __init__(
-        self, league_id, year, secret_name, debug=False,
-    ):
-        self.league_id = league_id
-        self.year = year
-        self.secret_name = secret_name
-        self.debug = debug
-
-        # Can be set later
-        self.espn_league = None
-        self.player_df = None
-        self.power_rankings_df = None
-        self.team_summary_df = None
-        self.player_summary_df = None
-        self.top_positions_df = None
-        self.teams = None
-        self.player_analysis_chart = None
-        self.luck_df = None
+    platform = "ESPN"
+    team_class = EspnTeam
+
+    # Everything else is built from the ESPN league the first time it's read
+    # (see karen.lazy), and rebuilt once what it was built from changes
+
+    @artifact()
+    def espn_league(self):
+        try:
+            league = self._connect(utils.get_secrets(self.secret_name))
+        except ESPNAccessDenied:
+            # The cached credentials may have been rotated
+            league = self._connect(
+                utils.get_secrets(self.secret_name, refresh=True)
+            )
+        return league
+
+    @artifact("espn_league")
+    def adapter(self):
+        return EspnAdapter(self.espn_league)
+
+    @artifact("espn_league")
+    def player_df(self):
+        return self._build_player_df()
+
+    @artifact("power_ranking_scores")
+    def base_power_rankings(self):
+        """
+        The power rankings (without the takes) by week.
+        """
+        return {}
+
+    @artifact("power_ranking_scores")
+    def power_rankings_history(self):
+        """
+        Every team's power ranking and rank change after every week.
+        """
+        return cleaning.build_power_rankings_history(
+            self.power_ranking_scores, self.teams_df
+        )
 
-    def connect(self):
-        secrets = utils.get_secrets(self.secret_name)
+    def _connect(self, secrets):
         # TODO: Add some check for keys in the secret string?
         league = League(
             league_id=self.league_id,
@@ -37,120 +64,90 @@ class EspnLeague(BaseLeague):
             swid=secrets["espn_swid"],
             debug=self.debug,
         )
-        self.espn_league = league
-
-    def build_player_df(self, week=None):
+        return count_espn_bytes(league)
 
-        if not self.espn_league:
-            self.connect()
-
-        if not week:
-            if self.espn_league.current_week < 15:
-                week = self.espn_league.current_week - 1
-            else:
-                week = self.espn_league.current_week
+    def connect(self):
+        # (Re)connect now, dropping everything built from the old connection
+        self.espn_league = None
+        return self.espn_league
 
-        player_df = cleaning.build_player_scores(week, self.espn_league)
+    @property
+    def current_week(self):
+        return self.espn_league.current_week
 
-        self.player_df = player_df
+    def _get_default_week(self):
+        if self.current_week < 15:
+            return self.current_week - 1
+        return self.current_week
 
+    @timed()
     def build_power_rankings_df(self, week=None):
 
-        if not self.espn_league:
-            self.connect()
-
         if not week:
             week = self.espn_league.current_week
 
+        if week not in self.base_power_rankings:
+            self.base_power_rankings[
+                week
+            ] = cleaning.build_base_power_rankings_df(
+                self.teams_df,
+                cleaning.get_power_rankings(self.power_ranking_scores, week),
+            )
+
         power_rankings_df = cleaning.build_power_rankings_df(
-            self.espn_league, week
+            self.base_power_rankings[week], self.year, week
         )
         self.power_rankings_df = power_rankings_df
 
-    def build_team_summary_df(self, week=None):
-
-        if not self.espn_league:
-            self.connect()
-
-        team_summary_df = cleaning.build_team_summary(
-            self.player_df, week_range=week
-        )
-        self.team_summary_df = team_summary_df
-
-    def build_player_summary_df(self, week=None, on_teams=None):
-
-        if not self.espn_league:
-            self.connect()
-
-        player_summary_df = cleaning.build_player_summary(
-            self.player_df, week_range=week, on_teams=on_teams,
+    def build_power_rankings_history(self):
+        self.power_rankings_history = None
+        return self.power_rankings_history
+
+    @timed()
+    def build_power_rankings_movement_chart(self):
+        chart = figure_cache.get(
+            "power_rankings_movement",
+            self.league_id,
+            get_data_version(self.power_rankings_history),
+            lambda: cleaning.build_power_rankings_movement_chart(
+                self.power_rankings_history
+            ),
         )
-        self.player_summary_df = player_summary_df
-
-    def build_top_positions_df(self, week=None, mode="Most points scored"):
-
-        if not self.espn_league:
-            self.connect()
-
-        top_positions_df = cleaning.build_top_positions_df(
-            self.player_df, week_range=week, mode=mode,
-        )
-        self.top_positions_df = top_positions_df
-
-    def build_teams(self):
-        t = [
-            {"name": t.team_name, "id": t.team_id}
-            for t in self.espn_league.teams
-        ]
-        self.teams = t
-
-    def get_team(self, team_name):
-        if not self.espn_league:
-            self.connect()
-
-        if not self.teams:
-            self.build_teams()
-
-        teams = [t["name"] for t in self.teams]
-
-        if team_name not in teams:
-            raise ValueError(
-                f"{team_name} is not a valid team in this league!"
-                f"\nMust be one of: {', '.join(teams)}"
-            )
-        else:
-            return EspnTeam(team_name, self.year, self)
-
-    def build_player_analysis_chart(self, player_name):
-
-        if not self.espn_league:
-            self.connect()
-
-        chart = cleaning.get_player_analysis_chart(player_name, self.player_df)
-
-        self.player_analysis_chart = chart
-
-    def build_luck_df(self):
-        self.luck_df = cleaning.build_luck_df(self.player_df)
+        return chart
 
-    def luckiest(self):
-        df = (
-            self.luck_df.groupby(["Team"], as_index=False)
-            .sum()[["Team", "Lucky Wins"]]
-            .sort_values(by=["Lucky Wins", "Team"], ascending=False)
+    def save_artifacts(self, artifacts=None):
+        """
+        Write the player_df, luck_df, matchups_df and every week's power
+        rankings built so far to an ArtifactStore.
+        """
+        artifacts = artifacts or ArtifactStore()
+        artifacts.write(
+            self.platform,
+            self.league_id,
+            self.year,
+            self.espn_league.current_week,
+            {name: getattr(self, name) for name in FRAMES},
+            self.base_power_rankings,
         )
-        df.set_index("Team", inplace=True)
-        return df
-
-    def unluckiest(self):
-        df = (
-            self.luck_df.groupby(["Team"], as_index=False)
-            .sum()[["Team", "Unlucky Losses"]]
-            .sort_values(by=["Unlucky Losses", "Team"], ascending=False)
-        )
-        df.set_index("Team", inplace=True)
-        return df
 
-    def build_team_luck_chart(self, team_name):
-        chart = cleaning.build_team_luck_chart(team_name, self.luck_df)
-        return chart
+    def load_artifacts(self, artifacts=None):
+        """
+        Load precomputed dataframes from an ArtifactStore instead of building
+        them. They're only used if they were built for ESPN's current week.
+        Returns whether anything was loaded.
+        """
+        artifacts = artifacts or ArtifactStore()
+        loaded = artifacts.read(self.platform, self.league_id, self.year)
+        if loaded is None:
+            return False
+
+        manifest, frames, power_rankings = loaded
+        if manifest["current_week"] != self.espn_league.current_week:
+            return False
+
+        cleaning.validate_player_df(frames["player_df"])
+        # The player_df goes first, setting it drops the other frames
+        for name, df in frames.items():
+            setattr(self, name, df)
+        self.base_power_rankings = power_rankings
+        return True
@@ -1,46 +1,177 @@
 import base64
 import tempfile
+import threading
 
 import yahoo_fantasy_api as yfa
 
+from yahoo_fantasy_api.yhandler import YHandler
 from yahoo_oauth import OAuth2
 
-from karen import utils
+from karen import cleaning, utils
+from karen.adapters.yahoo import YahooAdapter, get_league_key
+from karen.instrumentation import timed
+from karen.lazy import artifact
 from karen.leagues.base import BaseLeague
+from karen.teams.yahoo import YahooTeam
+
+
+# What's in the errors yahoo_oauth and yahoo_fantasy_api raise when Yahoo
+# won't take (or refresh) a token
+TOKEN_REJECTED_MESSAGES = ["oauth_problem", "Failed to refresh OAuth token"]
+
+
+def is_token_rejected(e):
+    """
+    Check whether an error from Yahoo means it rejected the OAuth token.
+    """
+    if isinstance(e, KeyError):
+        # yahoo_oauth looks for a new token in a rejected refresh's response
+        return e.args == ("access_token",)
+    return isinstance(e, RuntimeError) and any(
+        message in str(e) for message in TOKEN_REJECTED_MESSAGES
+    )
 
 
 class YahooLeague(BaseLeague):
+    platform = "Yahoo"
+    team_class = YahooTeam
+
     def __init__(
-        self, league_id, year, secret_name, debug=False,
+        self,
+        league_id,
+        year,
+        secret_name,
+        debug=False,
+        store=None,
+        handler=None,
     ):
-        self.league_id = league_id
-        self.year = year
-        self.secret_name = secret_name
-        self.debug = debug
+        super().__init__(
+            league_id, year, secret_name, debug=debug, store=store
+        )
+
+        # Yahoo addresses leagues by key, e.g. "399.l.12345", which can be
+        # passed in as the league_id. Otherwise it's looked up on connect.
+        self.league_key = league_id if "." in str(league_id) else None
 
-        # Can be set later
         self.oauth = None
-        self.yahoo_league = None
-        self.player_df = None
-        self.power_rankings_df = None
-        self.team_summary_df = None
-        self.player_summary_df = None
-        self.top_positions_df = None
-        self.teams = None
+        self._token_lock = threading.Lock()
 
-    def _reconnect(self):
-        self.oauth.refresh_access_token()
+        # Anything with a `get(uri)` that returns Yahoo's JSON, e.g. recorded
+        # responses, instead of connecting
+        if handler is not None:
+            self.yahoo_handler = handler
 
-    def connect(self):
-        secrets = utils.get_secrets(self.secret_name)
+    # Everything else is built from Yahoo the first time it's read (see
+    # karen.lazy), and rebuilt once what it was built from changes
+
+    @artifact()
+    def yahoo_handler(self):
+        try:
+            handler = self._connect(utils.get_secrets(self.secret_name))
+        except (KeyError, RuntimeError) as e:
+            if not is_token_rejected(e):
+                raise
+            # The cached token may have been rotated
+            handler = self._connect(
+                utils.get_secrets(self.secret_name, refresh=True)
+            )
+        return handler
+
+    @artifact("yahoo_handler")
+    def adapter(self):
+        # The league key is looked up on connect
+        self.yahoo_handler
+        return YahooAdapter(self._get, self.league_key)
+
+    @artifact("adapter")
+    def settings(self):
+        return self.adapter.get_league()
+
+    @artifact("adapter")
+    def player_df(self):
+        return self._build_player_df()
+
+    def _get_oauth(self, secrets):
         # TODO: Add some checks that the credentials are valid
         secrets_file_text = base64.b64decode(secrets["yahoo_oauth_file"])
 
         with tempfile.NamedTemporaryFile() as f:
             f.write(secrets_file_text)
             f.seek(0)
-            oauth = OAuth2(None, None, from_file=f.name)
-            gm = yfa.Game(oauth, "nfl")
-            lg = gm.to_league(self.league_id)
-            self.oauth = oauth
-            self.yahoo_league = lg
+            return OAuth2(None, None, from_file=f.name)
+
+    def _connect(self, secrets):
+        oauth = self._get_oauth(secrets)
+
+        self.oauth = oauth
+        if self.league_key is None:
+            game = yfa.Game(oauth, "nfl")
+            self.league_key = get_league_key(
+                game.league_ids(year=self.year), self.league_id
+            )
+        return YHandler(oauth)
+
+    def _reconnect(self):
+        credentials = self.oauth.refresh_access_token()
+        self.oauth.access_token = credentials["access_token"]
+        self.oauth.session = self.oauth.oauth.get_session(
+            token=self.oauth.access_token
+        )
+
+    def _get(self, uri):
+        try:
+            # Refresh the token before it expires, rather than have requests
+            # fail part way through loading a season
+            with self._token_lock:
+                if self.oauth is not None and not self.oauth.token_is_valid():
+                    self._reconnect()
+            return self.yahoo_handler.get(uri)
+        except (KeyError, RuntimeError) as e:
+            if self.oauth is None or not is_token_rejected(e):
+                raise
+
+        # The token in the cached secret may have been rotated. The handler
+        # keeps its place, so nothing built from it gets dropped.
+        with self._token_lock:
+            self.oauth = self._get_oauth(
+                utils.get_secrets(self.secret_name, refresh=True)
+            )
+            self.yahoo_handler.sc = self.oauth
+        return self.yahoo_handler.get(uri)
+
+    def connect(self):
+        # (Re)connect now, dropping everything built from the old connection
+        self.yahoo_handler = None
+        return self.yahoo_handler
+
+    @property
+    def current_week(self):
+        return self.settings["current_week"]
+
+    def _get_default_week(self):
+        if self.settings["is_finished"]:
+            return self.settings["end_week"]
+        return self.current_week - 1
+
+    @timed()
+    def build_free_agents_recommendations(self):
+        # Yahoo's API doesn't have player projections to recommend free
+        # agents with, so every team gets none
+        week = self.current_week
+        if week not in self.free_agents_recommendations:
+            self.free_agents_recommendations = {
+                week: {
+                    t["name"]: cleaning.build_free_agents_df({})
+                    for t in self.teams
+                }
+            }
+
+    @timed()
+    def build_power_rankings_df(self, week=None):
+        # Yahoo doesn't have power rankings, so these are the standings
+        if not week:
+            week = self._get_default_week()
+
+        self.power_rankings_df = cleaning.build_standings_df(
+            self.matchups_df, week
+        )
@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".karen", "store")
+
+
+class SeasonStore:
+    """
+    A local Parquet store of weekly player data.
+
+    Each week is its own file, laid out as
+    `<root>/<platform>/<league_id>/<year>/week=<week>.parquet`, so completed
+    weeks can be read back without touching the network and corrected weeks
+    can be dropped individually.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.environ.get(
+            "KAREN_STORE_DIR", DEFAULT_STORE_DIR
+        )
+
+    def _season_dir(self, platform, league_id, year):
+        return os.path.join(
+            self.root, platform.lower(), str(league_id), str(year)
+        )
+
+    def _week_path(self, platform, league_id, year, week):
+        season_dir = self._season_dir(platform, league_id, year)
+        return os.path.join(season_dir, f"week={week}.parquet")
+
+    def weeks(self, platform, league_id, year):
+        """
+        Get the weeks that are stored for a season.
+        """
+        season_dir = self._season_dir(platform, league_id, year)
+        if not os.path.isdir(season_dir):
+            return []
+
+        weeks = [
+            int(f[len("week=") : -len(".parquet")])  # noqa:E203
+            for f in os.listdir(season_dir)
+            if f.startswith("week=") and f.endswith(".parquet")
+        ]
+        return sorted(weeks)
+
+    def read(self, platform, league_id, year, weeks=None):
+        """
+        Read stored weeks back into one dataframe (all of them by default).
+        Returns None if nothing is stored.
+        """
+        stored = self.weeks(platform, league_id, year)
+        if weeks is not None:
+            stored = [w for w in stored if w in weeks]
+
+        if not stored:
+            return None
+
+        df = pd.concat(
+            [
+                pd.read_parquet(
+                    self._week_path(platform, league_id, year, week)
+                )
+                for week in stored
+            ]
+        )
+        return df
+
+    def write(self, df, platform, league_id, year, week):
+        """
+        Write a single week of player data, replacing whatever was there.
+        """
+        path = self._week_path(platform, league_id, year, week)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial week
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, platform, league_id, year, weeks=None):
+        """
+        Drop stored weeks (all of them by default) so they get re-fetched,
+        e.g. after a stat correction.
+        """
+        if weeks is None:
+            weeks = self.weeks(platform, league_id, year)
+
+        for week in weeks:
+            path = self._week_path(platform, league_id, year, week)
+            if os.path.exists(path):
+                os.remove(path)
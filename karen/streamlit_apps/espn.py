@@ -1,5 +1,5 @@
 from karen import constant, get_league
-from karen.leagues.espn import EspnLeague
+from karen.leagues.cache import league_cache
 
 
 def build_app(
@@ -14,17 +14,18 @@ def build_app(
         page_title=APP_TITLE, page_icon=FAVICON, layout="wide"
     )
 
-    @st.cache(
-        suppress_st_warning=True,
-        show_spinner=False,
-        hash_funcs={EspnLeague: lambda _: None},
-    )
     def get_league_cached(platform, league_id, year, secret_name):
-        league = get_league(platform, league_id, year, secret_name)
-        league.connect()
-        league.build_player_df()
-        league.build_luck_df()
-        return league
+        def load_league():
+            league = get_league(platform, league_id, year, secret_name)
+            league.connect()
+            # Start from `karen precompute` output when it's up to date
+            if not league.load_artifacts():
+                league.build_player_df()
+                league.build_luck_df()
+            return league
+
+        # Shared by every session in this process
+        return league_cache.get(platform, league_id, year, load_league)
 
     # User-level settings - should change with every user/session in a browser.
     year = st.sidebar.selectbox("Year:", YEARS)
@@ -70,6 +71,11 @@ def build_app(
     full_league.build_power_rankings_df(week=for_week_pr)
     st.table(full_league.power_rankings_df)
 
+    # Every week's rankings are computed together, so this doesn't depend
+    # on the slider
+    st.write("### Power Ranking Movement")
+    st.write(full_league.build_power_rankings_movement_chart())
+
     # Around the league section
     st.write("## Around the league")
     st.write("### Lucky and Unlucky Teams (Beta)")
@@ -152,11 +158,8 @@ def build_app(
     st.write("## Unexpected Outcomes")
     team_name = st.selectbox("Team:", teams)
 
+    # Teams build each of these the first time they're shown
     team = full_league.get_team(team_name)
-    team.build_record()
-    team.build_unexpected_outcomes_df()
-    team.build_unexpected_outcomes_text()
-    team.build_unexpected_outcomes_chart()
 
     st.write(f"### {team.team_name} ({team.record})")
     st.write(team.unexpected_outcomes_text)
@@ -164,9 +167,6 @@ def build_app(
 
     # MVP Analysis Section
     st.write("## MVP Analysis")
-    team.build_mvp_analysis_df()
-    team.build_mvp_analysis_text()
-    team.build_mvp_analysis_chart()
     st.write(team.mvp_analysis_text)
     st.write(team.mvp_analysis_chart)
 
@@ -193,7 +193,6 @@ def build_app(
     )
     fa_team_name = st.selectbox("Team:", teams, key="fa-teams")
     fa_team = full_league.get_team(fa_team_name)
-    fa_team.build_free_agents_recommendations()
 
     if fa_team.free_agents_recommendations.empty:
         st.write(f"No recommendations for {fa_team_name} :ok_hand:")
@@ -1,8 +1,148 @@
-# TODO
+from karen import constant, get_league
+from karen.leagues.cache import league_cache
 
 
 def build_app(
     st, league_id, secret_name,
 ):
-    st.write("Yahoo bar!!")
+    # Global configs - should never really change
+    YEARS = constant.SUPPORTED_YEARS
+    LOGO_URL = constant.LOGO_URL
+    APP_TITLE = constant.APP_TITLE
+    FAVICON = constant.FAVICON
+    st.beta_set_page_config(
+        page_title=APP_TITLE, page_icon=FAVICON, layout="wide"
+    )
+
+    def get_league_cached(platform, league_id, year, secret_name):
+        def load_league():
+            league = get_league(platform, league_id, year, secret_name)
+            league.connect()
+            league.build_player_df()
+            league.build_luck_df()
+            return league
+
+        # Shared by every session in this process
+        return league_cache.get(platform, league_id, year, load_league)
+
+    # User-level settings - should change with every user/session in a browser.
+    year = st.sidebar.selectbox("Year:", YEARS)
+    full_league = get_league_cached("Yahoo", league_id, year, secret_name)
+    teams = [t["name"] for t in full_league.teams]
+    num_weeks = sorted(full_league.player_df["Week"].unique())
+
+    week_min = min(num_weeks)
+    week_max = max(num_weeks)
+
+    # Title section
+    st.title(
+        f"Karen's Fantasy Outlook for {full_league.settings['name']} ({year})"
+    )
+    st.image(LOGO_URL)
+
+    # Standings section, Yahoo doesn't have power rankings
+    st.write("## Standings")
+    if week_min < week_max:
+        for_week_standings = st.slider(
+            "Week:",
+            min_value=week_min,
+            max_value=week_max,
+            value=week_max,
+            key="week-standings",
+        )
+    else:
+        for_week_standings = week_min
+
+    full_league.build_power_rankings_df(week=for_week_standings)
+    st.table(full_league.power_rankings_df)
+
+    # Around the league section
+    st.write("## Around the league")
+    st.write("### Lucky and Unlucky Teams (Beta)")
+
+    st.dataframe(full_league.luckiest())
+    st.dataframe(full_league.unluckiest())
+
+    luck_team_name = st.selectbox("Team:", teams, key="luck-teams")
+    st.write(full_league.build_team_luck_chart(luck_team_name))
+
+    # Team level stats section
+    st.write("### Team Level Stats")
+
+    # If there has been more than 1 week, show a slider for week selection
+    if week_min < week_max:
+        for_weeks_teams = st.slider(
+            "For weeks:",
+            min_value=week_min,
+            max_value=week_max,
+            value=(week_min, week_max),
+            key="weeks-teams",
+        )
+    else:
+        for_weeks_teams = (week_min, week_max)
+
+    full_league.build_team_summary_df(week=for_weeks_teams)
+    st.table(full_league.team_summary_df)
+
+    # Player level stats section
+    st.write("### Player Level Stats")
+
+    # If there has been more than 1 week, show a slider for week selection
+    if week_min < week_max:
+        for_weeks_players = st.slider(
+            "For weeks:",
+            min_value=week_min,
+            max_value=week_max,
+            value=(week_min, week_max),
+            key="weeks-players",
+        )
+    else:
+        for_weeks_players = (week_min, week_max)
+
+    on_teams = st.multiselect("For teams:", teams)
+    full_league.build_player_summary_df(
+        week=for_weeks_players, on_teams=on_teams
+    )
+    st.table(full_league.player_summary_df)
+
+    # Position level stats section, Yahoo doesn't have player projections
+    st.write("### Player Performance by Position")
+
+    # If there has been more than 1 week, show a slider for week selection
+    if week_min < week_max:
+        for_weeks_positions = st.slider(
+            "For weeks:",
+            min_value=week_min,
+            max_value=week_max,
+            value=(week_min, week_max),
+            key="weeks-positions",
+        )
+    else:
+        for_weeks_positions = (week_min, week_max)
+
+    full_league.build_top_positions_df(week=for_weeks_positions)
+    st.table(full_league.top_positions_df)
+
+    # MVP Analysis Section
+    st.write("## MVP Analysis")
+    team_name = st.selectbox("Team:", teams)
+
+    # Teams build each of these the first time they're shown
+    team = full_league.get_team(team_name)
+
+    st.write(f"### {team.team_name} ({team.record})")
+    st.write(team.mvp_analysis_text)
+    st.write(team.mvp_analysis_chart)
+
+    # Player Explorer
+    st.write("## Player Explorer")
+    players = list(
+        full_league.player_df.sort_values("Cumulative Score", ascending=False)[
+            "Player Name"
+        ].unique()
+    )
+    player = st.selectbox("Pick a player:", players)
+    full_league.build_player_analysis_chart(player)
+    st.write(full_league.player_analysis_chart)
+
     return st
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+from karen import utils
+
+
+TAKES_TTL = 600
+DEFAULT_SNAPSHOT_PATH = os.path.join(
+    os.path.expanduser("~"), ".karen", "takes.parquet"
+)
+
+
+class TakesCache:
+    """
+    A cache of the manual power ranking "takes" from the Google Sheet.
+
+    The sheet is loaded once and indexed by (Year, Week, Team ID), so looking
+    up a week's or a team's takes doesn't touch the network. Once the data is
+    older than `ttl` seconds it is refreshed in a background thread while the
+    old data keeps being served. Every good load is also written to
+    `snapshot_path`, which is used instead if the sheet can't be loaded.
+    """
+
+    def __init__(
+        self, ttl=TAKES_TTL, snapshot_path=None, loader=None,
+    ):
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path or os.environ.get(
+            "KAREN_TAKES_SNAPSHOT", DEFAULT_SNAPSHOT_PATH
+        )
+        self.loader = loader or utils.get_spreadsheet_takes
+
+        self.columns = []
+        self.takes = None
+        self.loaded_at = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _index(self, df):
+        df = df.astype(str)
+        self.columns = list(df.columns)
+        # Each week's takes are indexed by team, so a team's take is a lookup
+        self.takes = {
+            key: takes.set_index("Team ID", drop=False)
+            for key, takes in df.groupby(["Year", "Week"])
+        }
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return False
+
+        self._index(pd.read_parquet(self.snapshot_path))
+        # Treat the snapshot as stale so the sheet gets retried
+        self.loaded_at = 0
+        return True
+
+    def _write_snapshot(self, df):
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        df.astype(str).to_parquet(tmp_path)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def refresh(self):
+        """
+        Load the sheet now, falling back to the snapshot if that fails.
+        """
+        try:
+            df = self.loader()
+        except Exception as e:
+            print(f"Couldn't load the power rankings takes ({e})")
+            with self._lock:
+                if self.takes is not None:
+                    # Keep serving what we have and try again after the TTL
+                    self.loaded_at = time.monotonic()
+                elif not self._load_snapshot():
+                    raise
+            return
+
+        with self._lock:
+            self._index(df)
+            self.loaded_at = time.monotonic()
+
+        # The sheet loaded fine, so not being able to save it isn't fatal
+        try:
+            self._write_snapshot(df)
+        except Exception as e:
+            print(f"Couldn't write the power rankings takes snapshot ({e})")
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def _ensure_fresh(self):
+        if self.takes is None:
+            self.refresh()
+
+        elif time.monotonic() - self.loaded_at > self.ttl:
+            with self._lock:
+                start_refresh = not self._refreshing
+                self._refreshing = True
+            if start_refresh:
+                threading.Thread(
+                    target=self._refresh_in_background, daemon=True
+                ).start()
+
+    def get(self, year, week):
+        """
+        Get the takes for a given year and week.
+        """
+        self._ensure_fresh()
+        takes = self.takes.get((str(year), str(week)))
+        if takes is None:
+            return pd.DataFrame(columns=self.columns)
+        return takes.reset_index(drop=True)
+
+    def get_team(self, year, week, team_id):
+        """
+        Get a team's take for a given year and week, as a record, or None if
+        there isn't one.
+        """
+        self._ensure_fresh()
+        takes = self.takes.get((str(year), str(week)))
+        if takes is None or str(team_id) not in takes.index:
+            return None
+        return takes.loc[str(team_id)].to_dict()
+
+
+takes_cache = TakesCache()
+
+
+def get_takes(year, week):
+    """
+    Get the power rankings takes for a given year and week.
+    """
+    return takes_cache.get(year, week)
+
+
+def get_team_take(year, week, team_id):
+    """
+    Get a team's power rankings take for a given year and week.
+    """
+    return takes_cache.get_team(year, week, team_id)
@@ -1,42 +1,186 @@
-from abc import ABC, abstractmethod
+from abc import ABC
+
+from karen import cleaning
+from karen.figures import figure_cache
+from karen.lazy import artifact
 
 
 class BaseTeam(ABC):
-    def __init__(self):
+    """
+    A team in a league on some platform.
+
+    Everything is built from the league's records and player_df, so it
+    works the same way on every platform.
+    """
+
+    def __init__(
+        self, team_name, year, league,
+    ):
         super().__init__()
+        self.team_name = team_name
+        self.year = year
+        self.league = league
+
+    # Everything is built the first time it's read (see karen.lazy). The
+    # league drops its teams when its player_df changes, so nothing here
+    # needs to be rebuilt, and the build_* methods just make sure it's built.
+
+    @artifact()
+    def team(self):
+        """
+        The team's record (see karen.adapters.base.TEAM_COLUMNS).
+        """
+        return self.league.get_team_record(self.team_name)
+
+    @artifact()
+    def unexpected_outcomes_df(self):
+        return cleaning.build_team_df_w_results(
+            self.team_name,
+            self.league.player_df,
+            matchups_df=self.league.matchups_df,
+        )
+
+    @artifact("team", "unexpected_outcomes_df")
+    def unexpected_outcomes_text(self):
+        team = self.team
+        team_df = self.unexpected_outcomes_df
+
+        # Build a paragraph of analysis.
+        unexpected_df = team_df[
+            team_df["Projected Result"] != team_df["Result"]
+        ]
+        unexpected_outcomes = len(unexpected_df)
+        unexpected_wins = len(unexpected_df[unexpected_df["Result"] == "W"])
+        unexpected_losses = len(unexpected_df[unexpected_df["Result"] == "L"])
+
+        if unexpected_wins > unexpected_losses:
+            favored = "helped"
+
+        elif unexpected_wins < unexpected_losses:
+            favored = "hurt"
+
+        else:
+            favored = "neither helped nor hurt"
+
+        wins = team["Wins"]
+        losses = team["Losses"]
+
+        unexpected_outcomes_text = f"""
+            **{team["Team"]}** currently has a record of **{wins}** wins
+            and **{losses}** losses. **{unexpected_outcomes}** of these
+            **{wins + losses}** outcomes can be considered unexpected
+            (the actual result was different than the projected result), with
+            **{unexpected_wins}** unexpected wins and **{unexpected_losses}**
+            unexpected losses.
+
+            This team has generally been **{favored}** by unexpected outcomes
+            this season.
+        """
+        return unexpected_outcomes_text
+
+    @artifact("unexpected_outcomes_df")
+    def unexpected_outcomes_chart(self):
+        return figure_cache.get(
+            "projected_vs_actual",
+            self.team_name,
+            self.league.player_df_version,
+            lambda: cleaning.build_projected_vs_actual_chart(
+                self.unexpected_outcomes_df
+            ),
+        )
+
+    @artifact()
+    def mvp_analysis_df(self):
+        return figure_cache.get(
+            "mvp",
+            self.team_name,
+            self.league.player_df_version,
+            lambda: cleaning.build_mvp_chart(
+                self.team_name, self.league.player_df
+            ),
+        )
+
+    @artifact("team")
+    def mvp_analysis_text(self):
+        team = self.team
+        team_name = team["Team"]
+
+        team_df = self.league.player_df[
+            self.league.player_df["Team"] == team_name
+        ]
+        team_df.sort_values("Cumulative Score", ascending=False, inplace=True)
+
+        top_player = team_df["Player Name"].values[0]
+        top_player_points = team_df["Cumulative Score"].values[0]
+        total_points = team["Points For"]
+        top_players_points = sum(team_df["Cumulative Score"].values[0:3])
+        top_player_points_pcent = (
+            round(top_player_points / total_points, 2) * 100
+        )
+        top_players_pcent = round(top_players_points / total_points, 2) * 100
+        is_balanced = "top-heavy" if top_players_pcent > 50 else "balanced"
+
+        mvp_text = f"""
+            **{top_player}** is the MVP of **{team_name}** with
+            **{top_player_points}** points scored. This amounts to around
+            **{top_player_points_pcent}%** of {team_name}'s
+            **{total_points}** points.
+
+            All together, the top 3 players on {team_name} scored
+            **{top_players_points}** points, which accounts for
+            **{top_players_pcent}%** of {team_name}'s points, indicating a
+            **{is_balanced}** team overall (a team is top-heavy if the top 3
+            players scored more than 50% of the team's points).
+
+            The graph below shows each players contribution to the team's total
+            score over time, with players that have a higher point contribution
+            near the bottom.
+
+        """
+        return mvp_text
+
+    @artifact("mvp_analysis_df")
+    def mvp_analysis_chart(self):
+        # The MVP "df" is already the chart
+        return self.mvp_analysis_df
+
+    @artifact()
+    def free_agents_recommendations(self):
+        # These get built for the whole league at once
+        self.league.build_free_agents_recommendations()
+
+        week = self.league.current_week
+        return self.league.free_agents_recommendations[week][self.team_name]
+
+    @artifact("team")
+    def record(self):
+        return f"{self.team['Wins']}-{self.team['Losses']}"
 
-    @abstractmethod
     def _set_team(self):
-        pass
+        # Look the team up again
+        self.team = None
+        return self.team
 
-    @abstractmethod
     def build_unexpected_outcomes_df(self):
-        pass
+        return self.unexpected_outcomes_df
 
-    @abstractmethod
     def build_unexpected_outcomes_text(self):
-        pass
+        return self.unexpected_outcomes_text
 
-    @abstractmethod
     def build_unexpected_outcomes_chart(self):
-        pass
+        return self.unexpected_outcomes_chart
 
-    @abstractmethod
     def build_mvp_analysis_df(self):
-        pass
+        return self.mvp_analysis_df
 
-    @abstractmethod
     def build_mvp_analysis_text(self):
-        pass
+        return self.mvp_analysis_text
 
-    @abstractmethod
     def build_mvp_analysis_chart(self):
-        pass
+        return self.mvp_analysis_chart
 
-    @abstractmethod
     def build_free_agents_recommendations(self):
-        pass
+        return self.free_agents_recommendations
 
-    @abstractmethod
     def build_record(self):
-        pass
+        return self.record
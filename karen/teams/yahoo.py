@@ -1 +1,8 @@
-# TODO
+from karen.teams.base import BaseTeam
+
+
+class YahooTeam(BaseTeam):
+    """
+    A team in a Yahoo league. Yahoo has no free agent projections, so its
+    teams never have free agent recommendations (see YahooLeague).
+    """
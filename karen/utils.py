@@ -1,62 +1,245 @@
 import base64
+import datetime
 import boto3
 import gspread
 import json
 import pandas as pd
+import re
 import requests
 import tempfile
+import threading
+import time
 
+from botocore.exceptions import ClientError
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from difflib import SequenceMatcher
 from espn_api.football import League
+from espn_api.requests.espn_requests import ESPNAccessDenied, ESPNUnknownError
+from google.auth.exceptions import GoogleAuthError
+from gspread.exceptions import APIError
 
+from karen.instrumentation import count_espn_bytes, record_bytes, timed
 
-def get_secrets(secret_name, region="us-east-1"):
-    session = boto3.session.Session()
-    client = session.client(service_name="secretsmanager", region_name=region)
 
-    response = client.get_secret_value(SecretId=secret_name)
+def get_current_season(today=None):
+    """
+    Get the year of the NFL season that's on (or just finished).
+    """
+    today = today or datetime.date.today()
+    return today.year if today.month >= 3 else today.year - 1
+
+
+SECRETS_TTL = 300
+
+# Process-wide caches of Secrets Manager clients (by region) and of fetched
+# secrets (by region and name, with the time they were fetched)
+_secrets_clients = {}
+_secrets_cache = {}
+_secrets_lock = threading.Lock()
+
+# Errors that mean the client's own credentials have gone stale
+EXPIRED_CREDENTIALS_ERRORS = ["ExpiredToken", "ExpiredTokenException"]
+
+
+def get_secrets_client(region="us-east-1"):
+    """
+    Get a Secrets Manager client for a region, reusing it across calls.
+    """
+    with _secrets_lock:
+        client = _secrets_clients.get(region)
+        if client is None:
+            session = boto3.session.Session()
+            client = session.client(
+                service_name="secretsmanager", region_name=region
+            )
+            _secrets_clients[region] = client
+    return client
+
+
+def set_secrets_client(client, region="us-east-1"):
+    """
+    Use a specific client for a region, e.g. a local stub in tests.
+    """
+    with _secrets_lock:
+        _secrets_clients[region] = client
+
+
+def clear_secrets_cache():
+    """
+    Forget every cached secret and client.
+    """
+    with _secrets_lock:
+        _secrets_cache.clear()
+        _secrets_clients.clear()
+
+
+@timed()
+def get_secrets(
+    secret_name, region="us-east-1", ttl=SECRETS_TTL, refresh=False
+):
+    """
+    Get a secret from AWS Secrets Manager as a dict.
+
+    Secrets are cached for `ttl` seconds. Pass `refresh=True` to skip the
+    cache, e.g. after the credentials in it were rejected.
+    """
+    key = (region, secret_name)
+
+    with _secrets_lock:
+        cached = _secrets_cache.get(key)
+    if cached and not refresh and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    try:
+        response = get_secrets_client(region).get_secret_value(
+            SecretId=secret_name
+        )
+    except ClientError as e:
+        error_code = e.response.get("Error", {}).get("Code")
+        if error_code not in EXPIRED_CREDENTIALS_ERRORS:
+            raise
+        # Build a fresh client (and session) and try once more
+        with _secrets_lock:
+            _secrets_clients.pop(region, None)
+        response = get_secrets_client(region).get_secret_value(
+            SecretId=secret_name
+        )
+
     secret_string = response.get("SecretString", "{}")
+    record_bytes(len(secret_string))
     secrets = json.loads(secret_string)
+
+    with _secrets_lock:
+        _secrets_cache[key] = (time.monotonic(), secrets)
     return secrets
 
 
+@timed()
 def get_league(
     year, league_id=503767, secret_name="fantasy-football-secrets", debug=False
 ):
     """
     Get an espn_api.football.League object from the espn_api.
     """
-    secrets = get_secrets(secret_name)
-    league = League(
-        league_id=league_id,
-        year=year,
-        username=secrets["espn_username"],
-        password=secrets["espn_password"],
-        espn_s2=secrets["espn_s2"],
-        swid=secrets["espn_swid"],
-        debug=debug,
+
+    def connect(secrets):
+        return League(
+            league_id=league_id,
+            year=year,
+            username=secrets["espn_username"],
+            password=secrets["espn_password"],
+            espn_s2=secrets["espn_s2"],
+            swid=secrets["espn_swid"],
+            debug=debug,
+        )
+
+    try:
+        league = connect(get_secrets(secret_name))
+    except ESPNAccessDenied:
+        # The cached credentials may have been rotated
+        league = connect(get_secrets(secret_name, refresh=True))
+    return count_espn_bytes(league)
+
+
+# HTTP statuses worth retrying: rate limits and server errors
+TRANSIENT_STATUS = re.compile(r"HTTP (429|5\d\d)\b")
+
+
+def is_transient_error(e):
+    """
+    Check whether a failed ESPN request might work if it's tried again.
+    """
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    # espn_api only puts the status it got in the message
+    return isinstance(e, ESPNUnknownError) and bool(
+        TRANSIENT_STATUS.search(str(e))
     )
-    return league
 
 
-def get_spreadsheet_takes():
+@timed()
+def get_week_box_scores(league, week, retries=3, backoff=1.0):
+    """
+    Get a single week's box scores, retrying transient errors with
+    exponential backoff. Anything else (e.g. ESPNAccessDenied) is raised
+    right away.
+    """
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            box_scores = league.box_scores(week=week)
+        except Exception as e:
+            if attempt == retries or not is_transient_error(e):
+                raise
+            delay = backoff * 2 ** attempt
+            print(f"Week {week} failed ({e}), retrying in {delay}s...")
+            time.sleep(delay)
+        else:
+            elapsed = time.perf_counter() - start
+            print(f"Fetched box scores for week {week} in {elapsed:.2f}s")
+            return box_scores
+
+
+def iter_box_scores(league, weeks, max_workers=4, retries=3, backoff=1.0):
+    """
+    Fetch box scores for several weeks concurrently, yielding
+    (week, box scores) as each week finishes loading.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(
+                get_week_box_scores, league, week, retries, backoff
+            ): week
+            for week in weeks
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Don't keep fetching if the caller stopped early
+            for future in futures:
+                future.cancel()
+
+
+def is_google_auth_error(e):
+    """
+    Check whether Google rejected the service account's credentials.
+    """
+    if isinstance(e, APIError):
+        return e.code == 401
+    return isinstance(e, GoogleAuthError)
+
+
+@timed()
+def get_spreadsheet_takes(secret_name="fantasy-football-secrets"):
     """
     Get data from a google spreadsheet to be used for fantasy rankings.
     """
-    with tempfile.NamedTemporaryFile() as f:
-        secrets = get_secrets("fantasy-football-secrets")
-        file_str = base64.b64decode(secrets["gcloud_service_file"])
-        f.write(file_str)
-        f.seek(0)
-        gc = gspread.service_account(f.name)
 
-        wks = gc.open("Power Rankings").sheet1
+    def get_values(secrets):
+        with tempfile.NamedTemporaryFile() as f:
+            file_str = base64.b64decode(secrets["gcloud_service_file"])
+            f.write(file_str)
+            f.seek(0)
+            gc = gspread.service_account(f.name)
+
+            wks = gc.open("Power Rankings").sheet1
+            return wks.get_all_values()
 
-        data = wks.get_all_values()
-        headers = data.pop(0)
+    try:
+        data = get_values(get_secrets(secret_name))
+    except (GoogleAuthError, APIError) as e:
+        if not is_google_auth_error(e):
+            raise
+        # The cached service account key may have been rotated
+        data = get_values(get_secrets(secret_name, refresh=True))
 
-        df = pd.DataFrame(data, columns=headers)
+    # Roughly, the sheet's JSON response is mostly its cell values
+    record_bytes(sum(len(value) for row in data for value in row))
+    headers = data.pop(0)
+
+    df = pd.DataFrame(data, columns=headers)
     return df
 
 
@@ -64,20 +247,82 @@ def similar(a, b):
     return SequenceMatcher(None, a, b).ratio()
 
 
-def get_fantasy_pros_recommendation(player1, player2):
+FANTASY_PROS_URL = "https://www.fantasypros.com/nfl/start/{}-{}.php"
+FANTASY_PROS_WORKERS = 8
+FANTASY_PROS_REQUESTS_PER_SECOND = 10
+# Seconds to wait on a FantasyPros page before giving up on it
+FANTASY_PROS_TIMEOUT = 10
+
+# Parsed comparisons keyed by (week, cleaned player pair)
+_fantasy_pros_cache = {}
+_fantasy_pros_lock = threading.Lock()
+
+
+def _build_fantasy_pros_session(pool_size=FANTASY_PROS_WORKERS):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+_fantasy_pros_session = _build_fantasy_pros_session()
+
+
+class RateLimiter:
+    """
+    Space out calls so there are at most `per_second` of them a second,
+    across threads.
+    """
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second
+        self.next_call = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            call_at = max(now, self.next_call)
+            self.next_call = call_at + self.interval
+        time.sleep(call_at - now)
+
+
+_fantasy_pros_limiter = RateLimiter(FANTASY_PROS_REQUESTS_PER_SECOND)
+
+
+def clean_player_name(player):
+    """
+    Format a player's name the way FantasyPros does in its URLs.
+    """
+    return (
+        player.lower().replace(" jr.", "").replace(" ", "-").replace(".", "")
+    )
+
+
+def _fetch_fantasy_pros_comparison(player1, player2):
     """
+    Fetch and parse FantasyPros' comparison of two players. Returns each
+    player's start percentage by cleaned name, the recommended player first,
+    or an empty dict if the page has no comparison or couldn't be fetched.
     """
+    player1_clean = clean_player_name(player1)
+    player2_clean = clean_player_name(player2)
+
     print("Fetching... ", player1, player2)
-    player1_clean = (
-        player1.lower().replace(" jr.", "").replace(" ", "-").replace(".", "")
-    )  # noqa:E501
-    player2_clean = (
-        player2.lower().replace(" jr.", "").replace(" ", "-").replace(".", "")
-    )  # noqa:E501
-    url = f"https://www.fantasypros.com/nfl/start/{player1_clean}-{player2_clean}.php"  # noqa:E501
-    response = requests.get(url)
+    url = FANTASY_PROS_URL.format(player1_clean, player2_clean)
+    _fantasy_pros_limiter.wait()
+    # One bad page shouldn't hold up or break the rest of the batch
+    try:
+        response = _fantasy_pros_session.get(url, timeout=FANTASY_PROS_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Couldn't fetch {url} ({e})")
+        return {}
+    record_bytes(len(response.content))
     soup = BeautifulSoup(response.text, "html.parser")
-    recommendation = {}
+    comparison = {}
     rec_span = soup.find_all(name="span", attrs={"class": "more"})
     not_rec_span = soup.find_all(name="span", attrs={"class": "same"})
     spans = soup.find_all(name="div", attrs={"class": "player-photo"})
@@ -92,16 +337,73 @@ def get_fantasy_pros_recommendation(player1, player2):
         recommended_player_text_2 = similar(recommended_player_text, player2)
 
         if recommended_player_text_1 > recommended_player_text_2:
-            recommended_player = player1
-            second_player = player2
+            recommended_player = player1_clean
+            second_player = player2_clean
         else:
-            recommended_player = player2
-            second_player = player1
+            recommended_player = player2_clean
+            second_player = player1_clean
 
-        recommendation[recommended_player] = recommended_player_pcnt
+        comparison[recommended_player] = recommended_player_pcnt
         second_player_pcnt = not_rec_span[0].text
-        recommendation[second_player] = second_player_pcnt
+        comparison[second_player] = second_player_pcnt
+
+    return comparison
+
+
+@timed()
+def get_fantasy_pros_recommendation(player1, player2, week=None):
+    """
+    Get FantasyPros' start/sit comparison of two players.
 
-        recommendation["url"] = url
+    Comparisons are cached for the given `week`, whichever order the players
+    are asked for in; asking for a new week drops the older ones. Pages
+    without a comparison aren't cached, so they're retried next time.
+    """
+    player1_clean = clean_player_name(player1)
+    player2_clean = clean_player_name(player2)
+    key = (week, tuple(sorted([player1_clean, player2_clean])))
+
+    with _fantasy_pros_lock:
+        comparison = _fantasy_pros_cache.get(key)
+
+    if comparison is None:
+        comparison = _fetch_fantasy_pros_comparison(player1, player2)
+        if comparison:
+            with _fantasy_pros_lock:
+                stale_keys = [k for k in _fantasy_pros_cache if k[0] != week]
+                for stale_key in stale_keys:
+                    del _fantasy_pros_cache[stale_key]
+                _fantasy_pros_cache[key] = comparison
 
+    if not comparison:
+        return {}
+
+    # Give it back in this caller's names, and their order for the URL
+    names = {player1_clean: player1, player2_clean: player2}
+    recommendation = {
+        names[player]: pcnt for player, pcnt in comparison.items()
+    }
+    recommendation["url"] = FANTASY_PROS_URL.format(
+        player1_clean, player2_clean
+    )
     return recommendation
+
+
+@timed()
+def get_fantasy_pros_recommendations(
+    pairs, week=None, max_workers=FANTASY_PROS_WORKERS
+):
+    """
+    Get FantasyPros' comparisons for a list of (player1, player2) pairs
+    concurrently. Returns a dict of pair -> recommendation.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        recommendations = executor.map(
+            lambda pair: get_fantasy_pros_recommendation(*pair, week=week),
+            pairs,
+        )
+        return dict(zip(pairs, recommendations))
@@ -0,0 +1,202 @@
+import json
+import os
+import time
+
+import pandas as pd
+
+from karen import cleaning, utils
+
+
+DEFAULT_WAREHOUSE_DIR = os.path.join(
+    os.path.expanduser("~"), ".karen", "warehouse"
+)
+
+# What gets ingested from each season's league, by table name
+TABLES = {
+    "players": "player_df",
+    "matchups": "matchups_df",
+    "teams": "teams_df",
+}
+
+# The matchups columns the league history is built from
+HISTORY_COLUMNS = [
+    "Week",
+    "Team",
+    "Team ID",
+    "Opponent ID",
+    "Points",
+    "Opponent Points",
+    "Result",
+]
+
+
+class Warehouse:
+    """
+    A local Parquet warehouse of every season of a league, partitioned by
+    year, for questions that span seasons (all-time records, a manager's
+    history, the best seasons).
+
+    Each table is laid out as
+    `<root>/<platform>/<league_id>/<table>/year=<year>.parquet`. Queries only
+    read the years they ask for, and a `manifest.json` per league records
+    what's been ingested, so adding a season only ingests that season.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.environ.get(
+            "KAREN_WAREHOUSE_DIR", DEFAULT_WAREHOUSE_DIR
+        )
+
+    def _league_dir(self, platform, league_id):
+        return os.path.join(self.root, platform.lower(), str(league_id))
+
+    def _partition_path(self, platform, league_id, table, year):
+        return os.path.join(
+            self._league_dir(platform, league_id),
+            table,
+            f"year={year}.parquet",
+        )
+
+    def manifest(self, platform, league_id):
+        """
+        Get what's been ingested for a league, by year: the week it was
+        ingested up to and whether the season was over.
+        """
+        path = os.path.join(
+            self._league_dir(platform, league_id), "manifest.json"
+        )
+        if not os.path.exists(path):
+            return {}
+
+        with open(path) as f:
+            return {int(year): season for year, season in json.load(f).items()}
+
+    def _write_manifest(self, platform, league_id, manifest):
+        path = os.path.join(
+            self._league_dir(platform, league_id), "manifest.json"
+        )
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({str(y): s for y, s in sorted(manifest.items())}, f)
+        os.replace(tmp_path, path)
+
+    def years(self, platform, league_id):
+        """
+        Get the years that have been ingested for a league.
+        """
+        return sorted(self.manifest(platform, league_id))
+
+    def missing_years(self, platform, league_id, years):
+        """
+        Get the years that still need ingesting: ones that never were, and
+        ones that weren't over yet when they were.
+        """
+        manifest = self.manifest(platform, league_id)
+        return [
+            year
+            for year in years
+            if year not in manifest or not manifest[year]["final"]
+        ]
+
+    def ingest(self, league):
+        """
+        Write a season's tables from a league (built up to whichever week
+        it's built to), replacing whatever was stored for that year.
+        """
+        platform, league_id, year = (
+            league.platform,
+            league.league_id,
+            league.year,
+        )
+
+        for table, name in TABLES.items():
+            path = self._partition_path(platform, league_id, table, year)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            # Write to a temp file first so readers never see a partial year
+            tmp_path = f"{path}.tmp"
+            getattr(league, name).to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+
+        # The manifest goes last, so a year only counts once it's written
+        manifest = self.manifest(platform, league_id)
+        manifest[year] = {
+            "current_week": league.current_week,
+            "final": year < utils.get_current_season(),
+            "ingested_at": time.time(),
+        }
+        self._write_manifest(platform, league_id, manifest)
+
+    def read(self, platform, league_id, table, years=None, columns=None):
+        """
+        Read a table back for some years (all of them by default), with a
+        "Year" column. Only those years' files are read, and only `columns`
+        from them if given. Returns None if none of them are stored.
+        """
+        stored = self.years(platform, league_id)
+        if years is not None:
+            stored = [y for y in stored if y in years]
+
+        frames = [
+            pd.read_parquet(
+                self._partition_path(platform, league_id, table, year),
+                columns=columns,
+            ).assign(Year=year)
+            for year in stored
+        ]
+        if not frames:
+            return None
+
+        # Every year has its own categories, so they don't survive the concat
+        categorical = [
+            column
+            for column, dtype in frames[0].dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        ]
+        df = pd.concat(frames, ignore_index=True)
+        return df.astype({column: "category" for column in categorical})
+
+    def season_records(self, platform, league_id, years=None):
+        """
+        Get every team's record in every season (see
+        cleaning.build_season_records).
+        """
+        matchups_df = self.read(
+            platform, league_id, "matchups", years, HISTORY_COLUMNS
+        )
+        if matchups_df is None:
+            return None
+        return cleaning.build_season_records(matchups_df)
+
+    def all_time_records(self, platform, league_id, years=None):
+        """
+        Get every team's record across seasons (see
+        cleaning.build_all_time_records).
+        """
+        season_records = self.season_records(platform, league_id, years)
+        if season_records is None:
+            return None
+        return cleaning.build_all_time_records(season_records)
+
+    def best_seasons(self, platform, league_id, n=10, years=None):
+        """
+        Get the `n` best seasons any team has had, by wins and then points.
+        """
+        season_records = self.season_records(platform, league_id, years)
+        if season_records is None:
+            return None
+        return season_records.sort_values(
+            ["Wins", "Points For"], ascending=False, ignore_index=True
+        ).head(n)
+
+    def team_history(self, platform, league_id, team_id, years=None):
+        """
+        Get one team's (manager's) record in every season, whatever the
+        team was called that year.
+        """
+        season_records = self.season_records(platform, league_id, years)
+        if season_records is None:
+            return None
+        return season_records[
+            season_records["Team ID"] == team_id
+        ].reset_index(drop=True)
@@ -8,3 +8,8 @@ python3 -m bandit . -r -lll
 
 echo "Running pytests..."
 python3 -m pytest -s
+
+echo "Running benchmarks..."
+python3 -m pytest benchmarks --scale small \
+    --karen-benchmark-compare benchmarks/baseline.json \
+    --karen-benchmark-tolerance 3
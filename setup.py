@@ -15,4 +15,5 @@ setup(
     use_scm_version=True,
     setup_requires=["setuptools_scm"],
     install_requires=reqs,
+    entry_points={"console_scripts": ["karen=karen.cli:main"]},
 )
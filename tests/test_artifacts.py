@@ -0,0 +1,98 @@
+import tempfile
+import unittest
+
+from types import SimpleNamespace
+
+import pandas as pd
+
+from karen import cleaning
+from karen.artifacts import FRAMES, ArtifactStore
+from karen.leagues.espn import EspnLeague
+from karen.store import SeasonStore
+
+
+def build_player_df():
+    # Two teams playing each other for two weeks
+    rows = []
+    for week in [1, 2]:
+        for team_id, opponent_id in [(1, 2), (2, 1)]:
+            rows.append(
+                {
+                    "Week": week,
+                    "Player Name": f"Player {team_id}",
+                    "Points": 10.0 * team_id + week,
+                    "Projected Points": 12.0,
+                    "Projection Diff": 10.0 * team_id + week - 12.0,
+                    "Position": "QB",
+                    "Slot": "QB",
+                    "Team": f"Team {team_id}",
+                    "Team ID": team_id,
+                    "Opponent": f"Team {opponent_id}",
+                    "Opponent ID": opponent_id,
+                }
+            )
+    df = cleaning.apply_player_df_schema(pd.DataFrame(rows))
+    df["Cumulative Score"] = cleaning.build_cumulative_scores(df)
+    return df
+
+
+class TestArtifacts(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.artifacts = ArtifactStore(f"{self.root.name}/artifacts")
+        self.espn_league = SimpleNamespace(current_week=3)
+
+        self.league = self.get_league()
+        self.league.player_df = build_player_df()
+        self.league.base_power_rankings = {
+            2: pd.DataFrame({"Team": ["Team 2", "Team 1"], "Team ID": [2, 1]})
+        }
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def get_league(self):
+        league = EspnLeague(
+            1, 2020, "secret", store=SeasonStore(f"{self.root.name}/store")
+        )
+        league.espn_league = self.espn_league
+        return league
+
+    def test_round_trip(self):
+        self.league.save_artifacts(self.artifacts)
+        manifest = self.artifacts.manifest("ESPN", 1, 2020)
+        assert manifest["current_week"] == 3
+        assert manifest["frames"] == FRAMES
+
+        league = self.get_league()
+        assert league.load_artifacts(self.artifacts)
+
+        for name in FRAMES:
+            pd.testing.assert_frame_equal(
+                getattr(league, name), getattr(self.league, name)
+            )
+        pd.testing.assert_frame_equal(
+            league.base_power_rankings[2], self.league.base_power_rankings[2]
+        )
+
+    def test_stale_artifacts_are_not_loaded(self):
+        self.league.save_artifacts(self.artifacts)
+
+        # ESPN has moved on to the next week since
+        self.espn_league.current_week = 4
+        league = self.get_league()
+        assert not league.load_artifacts(self.artifacts)
+        assert league.__dict__.get("player_df") is None
+
+    def test_nothing_to_load(self):
+        assert self.artifacts.read("ESPN", 1, 2020) is None
+        assert not self.get_league().load_artifacts(self.artifacts)
+
+    def test_invalid_player_df(self):
+        self.league.save_artifacts(self.artifacts)
+        _, frames, power_rankings = self.artifacts.read("ESPN", 1, 2020)
+        frames["player_df"] = frames["player_df"].drop(columns=["Team ID"])
+        self.artifacts.write("ESPN", 1, 2020, 3, frames, power_rankings)
+
+        with self.assertRaisesRegex(ValueError, "missing columns: Team ID"):
+            self.get_league().load_artifacts(self.artifacts)
@@ -0,0 +1,202 @@
+import unittest
+
+import pandas as pd
+
+from karen import cleaning
+
+
+def build_player_df(rows):
+    """
+    A player_df from (week, player, points, team ID, opponent ID) rows, with
+    "" for the opponent on a bye.
+    """
+    return pd.DataFrame(
+        [
+            {
+                "Week": week,
+                "Player Name": player,
+                "Points": points,
+                "Projected Points": 10.0,
+                "Projection Diff": points - 10.0,
+                "Position": "QB",
+                "Slot": "QB",
+                "Team": f"Team {team_id}",
+                "Team ID": team_id,
+                "Opponent": f"Team {opponent_id}" if opponent_id else "",
+                "Opponent ID": opponent_id,
+            }
+            for week, player, points, team_id, opponent_id in rows
+        ]
+    )
+
+
+class TestPlayerDfSchema(unittest.TestCase):
+    def test_bye_weeks_have_no_opponent(self):
+        df = cleaning.apply_player_df_schema(
+            build_player_df(
+                [
+                    (1, "A", 10.0, 1, 2),
+                    (1, "B", 12.0, 3, ""),
+                    (2, "A", 8.0, 1, 3),
+                ]
+            )
+        )
+
+        assert dict(df.dtypes.astype(str)) == cleaning.PLAYER_DF_SCHEMA
+        # Not filled in from the row before
+        assert df["Opponent ID"].isna().tolist() == [False, True, False]
+        assert df["Opponent ID"].iloc[2] == 3
+
+    def test_missing_columns(self):
+        df = cleaning.apply_player_df_schema(
+            build_player_df([(1, "A", 10.0, 1, 2)])
+        )
+        with self.assertRaisesRegex(ValueError, "missing columns: Slot"):
+            cleaning.validate_player_df(df.drop(columns=["Slot"]))
+
+    def test_wrong_dtypes(self):
+        df = cleaning.apply_player_df_schema(
+            build_player_df([(1, "A", 10.0, 1, 2)])
+        )
+        with self.assertRaisesRegex(ValueError, "'Team' is object"):
+            cleaning.validate_player_df(df.astype({"Team": object}))
+
+        # Values that can't be cast fail before validation
+        df = build_player_df([(1, "A", 10.0, 1, 2)])
+        df["Points"] = "lots"
+        with self.assertRaises(ValueError):
+            cleaning.apply_player_df_schema(df)
+
+    def test_invalid_values(self):
+        df = cleaning.apply_player_df_schema(
+            build_player_df([(1, "A", 10.0, 1, 2), (2, "A", 8.0, 1, 2)])
+        )
+        df.loc[df.index[1], "Opponent ID"] = pd.NA
+        with self.assertRaisesRegex(ValueError, "blank only on bye weeks"):
+            cleaning.validate_player_df(df)
+
+
+class TestTopPositions(unittest.TestCase):
+    def setUp(self):
+        # Two QBs, one K and no TEs at all
+        df = build_player_df(
+            [
+                (1, "QB 1", 20.0, 1, 2),
+                (2, "QB 1", 25.0, 1, 2),
+                (1, "QB 2", 30.0, 2, 1),
+                (1, "K 1", 8.0, 1, 2),
+            ]
+        )
+        df["Position"] = ["QB", "QB", "QB", "K"]
+        self.player_df = cleaning.apply_player_df_schema(df)
+
+    def test_short_positions_are_left_blank(self):
+        df = cleaning.build_top_positions_df(self.player_df, top=3)
+
+        assert list(df.index) == [1, 2, 3]
+        assert list(df.columns) == cleaning.POSITIONS
+        assert list(df["QB"]) == ["QB 1 (45.0)", "QB 2 (30.0)", ""]
+        assert list(df["K"]) == ["K 1 (8.0)", "", ""]
+        assert (df["TE"] == "").all()
+
+    def test_every_mode_at_once(self):
+        dfs = cleaning.build_top_positions_dfs(
+            self.player_df, top=2, week_range=(1, 1)
+        )
+
+        assert list(dfs) == list(cleaning.TOP_POSITIONS_MODES)
+        for mode, df in dfs.items():
+            assert df.equals(
+                cleaning.build_top_positions_df(
+                    self.player_df, top=2, week_range=(1, 1), mode=mode
+                )
+            )
+        # Projections were 10 points each
+        assert list(dfs["Under-performed projection"]["QB"]) == [
+            "QB 1 (10.0)",
+            "QB 2 (20.0)",
+        ]
+
+    def test_custom_positions(self):
+        df = cleaning.build_top_positions_df(
+            self.player_df, top=1, positions=["K", "QB"]
+        )
+        assert list(df.columns) == ["K", "QB"]
+        assert list(df.iloc[0]) == ["K 1 (8.0)", "QB 1 (45.0)"]
+
+    def test_invalid_mode(self):
+        with self.assertRaisesRegex(ValueError, "not a valid mode"):
+            cleaning.build_top_positions_dfs(self.player_df, modes=["Best"])
+
+
+def old_cumulative_score(row, player_df):
+    # The per-row version build_cumulative_scores replaced
+    if row["Week"] == min(player_df["Week"]):
+        return row["Points"]
+
+    cumulative_score = 0
+    for week in range(1, row["Week"] + 1):
+        filtered = player_df[
+            (player_df["Week"] == week)
+            & (player_df["Player Name"] == row["Player Name"])
+        ]
+        if not filtered["Points"].empty:
+            cumulative_score += filtered["Points"].values[0]
+    return cumulative_score
+
+
+class TestCumulativeScores(unittest.TestCase):
+    def build(self, rows):
+        return cleaning.apply_player_df_schema(
+            build_player_df(
+                [
+                    (week, player, points, 1, 2)
+                    for week, player, points in rows
+                ]
+            )
+        )
+
+    def assert_matches_old(self, df):
+        expected = df.apply(old_cumulative_score, args=[df], axis=1)
+        assert list(cleaning.build_cumulative_scores(df)) == list(expected)
+
+    def test_missed_weeks_count_as_zero(self):
+        df = self.build(
+            [
+                (1, "A", 10.0),
+                (1, "B", 5.0),
+                (2, "B", 7.0),
+                (3, "A", 4.0),
+                (4, "A", 1.5),
+                (4, "B", 2.0),
+            ]
+        )
+        self.assert_matches_old(df)
+        assert list(cleaning.build_cumulative_scores(df)) == [
+            10.0,
+            5.0,
+            12.0,
+            14.0,
+            15.5,
+            14.0,
+        ]
+
+    def test_first_week_is_not_week_one(self):
+        df = self.build([(3, "A", 10.0), (4, "B", 5.0), (5, "A", 2.0)])
+        self.assert_matches_old(df)
+        assert list(cleaning.build_cumulative_scores(df)) == [10.0, 5.0, 12.0]
+
+    def test_window(self):
+        df = self.build(
+            [(1, "A", 1.0), (2, "A", 2.0), (3, "A", 4.0), (5, "A", 8.0)]
+        )
+        scores = cleaning.build_cumulative_scores(df, window=2)
+        # Week 5 only looks back to week 4, which A missed
+        assert list(scores) == [1.0, 3.0, 6.0, 8.0]
+
+        unwindowed = cleaning.build_cumulative_scores(df, window=10)
+        assert list(unwindowed) == list(cleaning.build_cumulative_scores(df))
+
+    def test_empty(self):
+        df = self.build([(1, "A", 1.0)]).iloc[:0]
+        assert cleaning.build_cumulative_scores(df).empty
@@ -0,0 +1,78 @@
+import unittest
+
+import pandas as pd
+
+from karen import cleaning
+from karen.cube import WeekCube
+
+
+# (week, player, team, points, projection diff). Player C misses week 2 and
+# Player D only plays in week 4.
+ROWS = [
+    (1, "Player A", "Team 1", 10.0, 1.5),
+    (1, "Player B", "Team 1", 4.0, -2.0),
+    (1, "Player C", "Team 2", 20.0, 3.0),
+    (2, "Player A", "Team 1", 12.0, -0.5),
+    (2, "Player B", "Team 2", 7.0, 2.0),
+    (3, "Player A", "Team 1", 3.0, -4.0),
+    (3, "Player C", "Team 2", 15.0, 0.5),
+    (4, "Player B", "Team 2", 9.0, 1.0),
+    (4, "Player D", "Team 1", 30.0, 12.0),
+]
+
+
+def build_player_df(rows):
+    df = pd.DataFrame(
+        rows,
+        columns=["Week", "Player Name", "Team", "Points", "Projection Diff"],
+    )
+    return df.astype(
+        {
+            column: cleaning.PLAYER_DF_SCHEMA[column]
+            for column in ["Week", "Player Name", "Team"]
+        }
+    )
+
+
+class TestWeekCube(unittest.TestCase):
+    def setUp(self):
+        self.player_df = build_player_df(ROWS)
+        self.keys = ["Player Name", "Team"]
+        self.values = ["Points", "Projection Diff"]
+        self.cube = WeekCube(self.player_df, self.keys, self.values)
+
+    def filter_then_groupby(self, start, end):
+        # How the summaries were built before the cubes
+        df = self.player_df
+        df = df[(df["Week"] >= start) & (df["Week"] <= end)]
+        return df.groupby(self.keys, observed=True)[self.values].sum()
+
+    def test_matches_filter_then_groupby(self):
+        for week_range in [(1, 4), (2, 3), (3, 3), (2, 10), (0, 2), (4, 17)]:
+            expected = self.filter_then_groupby(*week_range)
+            pd.testing.assert_frame_equal(
+                self.cube.sum(week_range), expected, check_names=False
+            )
+
+    def test_every_week_by_default(self):
+        pd.testing.assert_frame_equal(
+            self.cube.sum(), self.filter_then_groupby(1, 4), check_names=False
+        )
+
+    def test_groups_without_rows_are_dropped(self):
+        players = self.cube.sum((2, 2)).index.get_level_values("Player Name")
+        assert list(players) == ["Player A", "Player B"]
+
+        # Player B played for both teams, but not for Team 1 after week 1
+        teams = self.cube.sum((2, 4)).loc["Player B"].index
+        assert list(teams) == ["Team 2"]
+
+    def test_ranges_past_the_last_week_are_empty(self):
+        df = self.cube.sum((5, 8))
+        assert df.empty
+        assert list(df.columns) == self.values
+
+    def test_empty_player_df(self):
+        cube = WeekCube(build_player_df([]), self.keys, self.values)
+        assert cube.sum().empty
+        assert cube.sum((1, 3)).empty
@@ -0,0 +1,51 @@
+import unittest
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from karen.figures import FigureCache, get_data_version
+
+
+class TestFigureCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = FigureCache(max_size=2)
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return go.Figure(go.Scatter(x=[1, 2], y=[3, 4]), layout_title="Test")
+
+    def test_hits_skip_building(self):
+        fig = self.cache.get("chart", "Team 1", "v1", self.build)
+        cached = self.cache.get("chart", "Team 1", "v1", self.build)
+
+        assert self.builds == 1
+        assert cached.to_json() == fig.to_json()
+        assert self.cache.stats()["hits"] == 1
+
+    def test_new_versions_rebuild(self):
+        self.cache.get("chart", "Team 1", "v1", self.build)
+        self.cache.get("chart", "Team 1", "v2", self.build)
+        self.cache.get("chart", "Team 2", "v2", self.build)
+        assert self.builds == 3
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.get("chart", "Team 1", "v1", self.build)
+        self.cache.get("chart", "Team 2", "v1", self.build)
+        self.cache.get("chart", "Team 1", "v1", self.build)
+        self.cache.get("chart", "Team 3", "v1", self.build)
+
+        assert self.cache.stats()["evictions"] == 1
+        self.cache.get("chart", "Team 1", "v1", self.build)
+        assert self.builds == 3
+
+
+class TestGetDataVersion(unittest.TestCase):
+    def test_changes_with_the_data(self):
+        df = pd.DataFrame({"Week": [1, 2], "Points": [10.0, 12.5]})
+        version = get_data_version(df)
+
+        assert get_data_version(df.copy()) == version
+        changed = df.copy()
+        changed.loc[1, "Points"] = 13.0
+        assert get_data_version(changed) != version
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from karen.instrumentation import (
+    ByteCountingLogger,
+    Instrumentation,
+    count_espn_bytes,
+)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.instrumentation = Instrumentation()
+
+    def test_calls_and_errors_are_counted(self):
+        @self.instrumentation.timed()
+        def fetch(fail=False):
+            if fail:
+                raise ValueError("Nope")
+
+        fetch()
+        with self.assertRaises(ValueError):
+            fetch(fail=True)
+
+        stats = self.instrumentation.stats()[fetch.__qualname__]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert stats["seconds"] >= 0
+
+    def test_bytes_go_to_the_innermost_stage(self):
+        with self.instrumentation.stage("outer"):
+            with self.instrumentation.stage("inner"):
+                self.instrumentation.record_bytes(10)
+            self.instrumentation.record_bytes(5)
+
+        # Outside of any stage, there's nothing to add them to
+        self.instrumentation.record_bytes(100)
+
+        stats = self.instrumentation.stats()
+        assert stats["inner"]["bytes"] == 10
+        assert stats["outer"]["bytes"] == 5
+
+    def test_prometheus_text(self):
+        with self.instrumentation.stage("connect"):
+            self.instrumentation.record_bytes(42)
+
+        text = self.instrumentation.to_prometheus()
+        assert 'karen_stage_calls_total{stage="connect"} 1' in text
+        assert 'karen_stage_bytes_total{stage="connect"} 42' in text
+        assert "# TYPE karen_stage_seconds_total counter" in text
+
+    def test_profiles_only_outermost_stages(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            instrumentation = Instrumentation(profile_dir=profile_dir)
+            with patch.dict(os.environ, {"KAREN_PROFILE": "cprofile"}):
+                with instrumentation.stage("outer"):
+                    with instrumentation.stage("inner"):
+                        pass
+
+            profiles = os.listdir(profile_dir)
+            assert len(profiles) == 1
+            assert profiles[0].startswith("outer-")
+            assert profiles[0].endswith(".prof")
+
+    def test_espn_bytes_are_only_counted_when_asked_for(self):
+        league = SimpleNamespace(
+            espn_request=SimpleNamespace(logger=MagicMock())
+        )
+
+        with patch.dict(os.environ, {"KAREN_COUNT_ESPN_BYTES": ""}):
+            count_espn_bytes(league)
+        assert not isinstance(league.espn_request.logger, ByteCountingLogger)
+
+        with patch.dict(os.environ, {"KAREN_COUNT_ESPN_BYTES": "1"}):
+            count_espn_bytes(league)
+        assert isinstance(league.espn_request.logger, ByteCountingLogger)
@@ -0,0 +1,65 @@
+import unittest
+
+from karen.lazy import artifact, get_dependents
+
+
+class Pipeline:
+    def __init__(self):
+        self.builds = []
+
+    @artifact()
+    def source(self):
+        self.builds.append("source")
+        return [1, 2, 3]
+
+    @artifact("source")
+    def total(self):
+        total = sum(self.source)
+        self.builds.append("total")
+        return total
+
+    @artifact("total")
+    def report(self):
+        report = f"Total: {self.total}"
+        self.builds.append("report")
+        return report
+
+    @artifact()
+    def unrelated(self):
+        self.builds.append("unrelated")
+        return "unrelated"
+
+
+class TestArtifact(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = Pipeline()
+
+    def test_built_once_on_first_read(self):
+        assert self.pipeline.builds == []
+        assert self.pipeline.report == "Total: 6"
+        assert self.pipeline.report == "Total: 6"
+        assert self.pipeline.builds == ["source", "total", "report"]
+
+    def test_setting_drops_dependents(self):
+        self.pipeline.report
+        self.pipeline.unrelated
+        self.pipeline.source = [10]
+
+        assert self.pipeline.report == "Total: 10"
+        assert self.pipeline.builds.count("total") == 2
+        assert self.pipeline.builds.count("report") == 2
+        assert self.pipeline.builds.count("unrelated") == 1
+
+    def test_setting_none_rebuilds(self):
+        self.pipeline.total
+        self.pipeline.source = None
+
+        assert self.pipeline.total == 6
+        assert self.pipeline.builds.count("source") == 2
+
+    def test_get_dependents(self):
+        assert sorted(get_dependents(Pipeline, "source")) == [
+            "report",
+            "total",
+        ]
+        assert get_dependents(Pipeline, "unrelated") == []
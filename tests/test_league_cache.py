@@ -0,0 +1,157 @@
+import datetime
+import threading
+import time
+import unittest
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from karen.leagues import cache
+from karen.leagues.cache import LeagueCache, is_game_time
+
+
+class StubLoader:
+    """
+    Hands out leagues (or raises errors) in order, optionally blocking each
+    load until `release` is set.
+    """
+
+    def __init__(self, *outcomes, block=False):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class TestLeagueCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.live = False
+        patches = [
+            patch.object(
+                cache, "time", SimpleNamespace(monotonic=lambda: self.now)
+            ),
+            patch.object(cache, "is_game_time", lambda: self.live),
+            patch.object(cache.utils, "get_current_season", lambda: 2020),
+        ]
+        for p in patches:
+            p.start()
+        self.addCleanup(patch.stopall)
+
+        self.cache = LeagueCache(max_size=2, ttl=60, live_ttl=10)
+
+    def test_second_caller_waits_for_the_first_load(self):
+        loader = StubLoader("league", block=True)
+        results = []
+
+        def get():
+            results.append(self.cache.get("ESPN", 1, 2020, loader))
+
+        threads = [threading.Thread(target=get) for _ in range(2)]
+        threads[0].start()
+        assert loader.started.wait(5)
+        threads[1].start()
+        # Give the second caller time to start waiting on the load
+        time.sleep(0.1)
+        loader.release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == ["league", "league"]
+        assert loader.calls == 1
+        assert self.cache.stats()["loads"] == 1
+
+    def test_current_season_expires(self):
+        loader = StubLoader("old", "new", "live")
+
+        assert self.cache.get("ESPN", 1, 2020, loader) == "old"
+        self.now = 59
+        assert self.cache.get("ESPN", 1, 2020, loader) == "old"
+        self.now = 61
+        assert self.cache.get("ESPN", 1, 2020, loader) == "new"
+
+        # Games are on, so it expires sooner
+        self.live = True
+        self.now = 72
+        assert self.cache.get("ESPN", 1, 2020, loader) == "live"
+        assert self.cache.stats()["expirations"] == 2
+
+    def test_finished_seasons_never_expire(self):
+        loader = StubLoader("league")
+        self.cache.get("ESPN", 1, 2019, loader)
+        self.now = 10 ** 6
+        assert self.cache.get("ESPN", 1, 2019, loader) == "league"
+        assert loader.calls == 1
+
+    def test_least_recently_used_is_evicted(self):
+        loader = StubLoader("2017", "2018", "2019", "2017 again")
+        for year in [2017, 2018]:
+            self.cache.get("ESPN", 1, year, loader)
+
+        # Using 2017 makes 2018 the least recently used
+        self.cache.get("ESPN", 1, 2017, loader)
+        self.cache.get("ESPN", 1, 2019, loader)
+        assert self.cache.get("ESPN", 1, 2017, loader) == "2017"
+        assert self.cache.stats()["evictions"] == 1
+
+        self.cache.get("ESPN", 1, 2018, loader)
+        assert loader.calls == 4
+
+    def test_failed_loads_release_waiters_and_are_not_cached(self):
+        loader = StubLoader(
+            ConnectionError("ESPN is down"), "league", block=True
+        )
+        errors = []
+        results = []
+
+        def get_first():
+            try:
+                self.cache.get("ESPN", 1, 2020, loader)
+            except ConnectionError as e:
+                errors.append(e)
+
+        def get_second():
+            results.append(self.cache.get("ESPN", 1, 2020, loader))
+
+        first = threading.Thread(target=get_first)
+        second = threading.Thread(target=get_second)
+        first.start()
+        assert loader.started.wait(5)
+        second.start()
+        time.sleep(0.1)
+        loader.release.set()
+        first.join(5)
+        second.join(5)
+
+        # The waiter loads it again itself rather than getting the error
+        assert len(errors) == 1
+        assert results == ["league"]
+        assert loader.calls == 2
+        stats = self.cache.stats()
+        assert stats["load_errors"] == 1
+        assert stats["loads"] == 1
+
+
+class TestIsGameTime(unittest.TestCase):
+    def test_game_windows(self):
+        eastern = cache.NFL_TIMEZONE
+        # Sunday afternoon and a Wednesday in October
+        assert is_game_time(datetime.datetime(2020, 10, 4, 14, tzinfo=eastern))
+        assert not is_game_time(
+            datetime.datetime(2020, 10, 7, 14, tzinfo=eastern)
+        )
+        # A Sunday in the offseason
+        assert not is_game_time(
+            datetime.datetime(2020, 6, 7, 14, tzinfo=eastern)
+        )
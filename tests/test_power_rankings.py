@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from karen import cleaning
+
+
+# (week, team ID, opponent ID, points, opponent points). Team 5 is on a bye
+# both weeks.
+GAMES = [
+    (1, 1, 2, 100.0, 80.0),
+    (1, 3, 4, 90.0, 70.0),
+    (1, 5, None, 200.0, 0.0),
+    (2, 1, 3, 110.0, 100.0),
+    (2, 2, 4, 95.0, 60.0),
+    (2, 5, None, 200.0, 0.0),
+]
+
+
+def build_matchups_df(games):
+    # Both sides of every game, like cleaning.build_matchups_df
+    rows = []
+    for week, team, opponent, points, opponent_points in games:
+        rows.append((week, team, opponent, points, opponent_points))
+        if opponent is not None:
+            rows.append((week, opponent, team, opponent_points, points))
+    columns = ["Week", "Team ID", "Opponent ID", "Points", "Opponent Points"]
+    df = pd.DataFrame(rows, columns=columns)
+    df["Opponent ID"] = df["Opponent ID"].astype(float)
+    return df
+
+
+class TestPowerRankings(unittest.TestCase):
+    def setUp(self):
+        self.scores = cleaning.build_power_ranking_scores(
+            build_matchups_df(GAMES), [5, 4, 3, 2, 1]
+        )
+
+    def test_scores_for_every_week(self):
+        assert list(self.scores.index) == [1, 2]
+        assert list(self.scores.columns) == [1, 2, 3, 4, 5]
+
+        # Team 1 beat 2 and 3, who each beat 4: 2 wins plus 2 two-step wins
+        np.testing.assert_allclose(
+            self.scores.loc[2], [19.7, 14.2, 15.3, 8.4, 30.0]
+        )
+        np.testing.assert_allclose(
+            self.scores.loc[1], [16.8, 11.0, 15.3, 9.5, 30.0]
+        )
+
+    def test_get_power_rankings(self):
+        rankings = cleaning.get_power_rankings(self.scores, 2)
+        assert list(rankings["Team ID"]) == [5, 1, 3, 2, 4]
+
+        # Later weeks haven't been played yet
+        assert rankings.equals(cleaning.get_power_rankings(self.scores, 3))
+
+    def test_ties_go_to_the_lower_team_id(self):
+        scores = cleaning.build_power_ranking_scores(
+            build_matchups_df(GAMES).iloc[:0], [3, 1, 2]
+        )
+        rankings = cleaning.get_power_rankings(scores, 1)
+
+        assert list(rankings["Team ID"]) == [1, 2, 3]
+        assert (rankings["Power Ranking Score"] == 0).all()
+
+    def test_history(self):
+        scores = pd.DataFrame(
+            [[10.0, 20.0, 5.0], [30.0, 20.0, 25.0]],
+            index=pd.Index([1, 2], name="Week"),
+            columns=pd.Index([1, 2, 3], name="Team ID"),
+        )
+        teams = pd.DataFrame({"Team": ["A", "B", "C"], "Team ID": [1, 2, 3]})
+        history = cleaning.build_power_rankings_history(scores, teams)
+
+        assert list(history["Team"]) == ["B", "A", "C", "A", "C", "B"]
+        assert list(history["Power Ranking"]) == [1, 2, 3, 1, 2, 3]
+        # Moving up is positive
+        assert list(history["Rank Change"]) == [0, 0, 0, 1, 1, -2]
+
+        # Every week's rankings are the ones looked up for that week
+        for week in [1, 2]:
+            assert list(history[history["Week"] == week]["Team ID"]) == list(
+                cleaning.get_power_rankings(scores, week)["Team ID"]
+            )
@@ -0,0 +1,139 @@
+import tempfile
+import unittest
+
+import pandas as pd
+
+from karen import cleaning, utils
+from karen.adapters.base import (
+    LINEUP_COLUMNS,
+    MATCHUP_COLUMNS,
+    TEAM_COLUMNS,
+    BaseAdapter,
+    build_records,
+)
+from karen.lazy import artifact
+from karen.leagues.base import BaseLeague
+from karen.store import SeasonStore
+
+
+class StubAdapter(BaseAdapter):
+    """
+    A two team league where team 1 scores 100 + the week, and team 2 scores
+    the week, keeping track of which weeks it was asked for.
+    """
+
+    platform = "ESPN"
+
+    def __init__(self):
+        self.fetched_weeks = []
+
+    def iter_weeks(self, weeks, max_workers=4):
+        for week in weeks:
+            self.fetched_weeks.append(week)
+            matchups = build_records(
+                [
+                    (week, "Team 1", 1, "Team 2", 2),
+                    (week, "Team 2", 2, "Team 1", 1),
+                ],
+                MATCHUP_COLUMNS,
+            )
+            lineups = build_records(
+                [
+                    (week, 1, "Player 1", 100.0 + week, 90.0, "QB", "QB"),
+                    (week, 2, "Player 2", float(week), 90.0, "QB", "QB"),
+                ],
+                LINEUP_COLUMNS,
+            )
+            yield week, matchups, lineups
+
+    def get_teams(self):
+        return build_records([], TEAM_COLUMNS)
+
+
+class StubLeague(BaseLeague):
+    platform = "ESPN"
+
+    def __init__(self, year, current_week, store):
+        super().__init__(1, year, "secret", store=store)
+        self._current_week = current_week
+
+    @artifact()
+    def adapter(self):
+        return StubAdapter()
+
+    @artifact("adapter")
+    def player_df(self):
+        return self._build_player_df()
+
+    def connect(self):
+        pass
+
+    @property
+    def current_week(self):
+        return self._current_week
+
+    def _get_default_week(self):
+        return self.current_week - 1
+
+    def build_power_rankings_df(self):
+        pass
+
+
+class TestSeasonStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.store = SeasonStore(self.root.name)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def test_weeks_are_stored_separately(self):
+        key = ("ESPN", 1, 2020)
+        for week in [1, 2, 3]:
+            self.store.write(pd.DataFrame({"Week": [week]}), *key, week)
+
+        assert self.store.weeks(*key) == [1, 2, 3]
+        assert self.store.weeks("ESPN", 1, 2019) == []
+        assert list(self.store.read(*key, weeks=[1, 3])["Week"]) == [1, 3]
+        assert self.store.read(*key, weeks=[4]) is None
+
+        self.store.invalidate(*key, weeks=[2])
+        assert self.store.weeks(*key) == [1, 3]
+        self.store.invalidate(*key)
+        assert self.store.read(*key) is None
+
+    def test_only_missing_and_unfinished_weeks_are_fetched(self):
+        # Week 4 is still being played
+        league = StubLeague(utils.get_current_season(), 4, self.store)
+        league.build_player_df(week=4)
+
+        assert league.adapter.fetched_weeks == [1, 2, 3, 4]
+        assert self.store.weeks("ESPN", 1, league.year) == [1, 2, 3]
+
+        league = StubLeague(utils.get_current_season(), 4, self.store)
+        league.build_player_df(week=4)
+
+        assert league.adapter.fetched_weeks == [4]
+        df = league.player_df
+        cleaning.validate_player_df(df)
+        assert list(df["Week"]) == [1, 1, 2, 2, 3, 3, 4, 4]
+        assert list(df["Cumulative Score"])[-2:] == [410.0, 10.0]
+
+    def test_past_seasons_store_every_week(self):
+        league = StubLeague(2019, 4, self.store)
+        league.build_player_df(week=4)
+        assert self.store.weeks("ESPN", 1, 2019) == [1, 2, 3, 4]
+
+    def test_invalidated_weeks_are_fetched_again(self):
+        league = StubLeague(2019, 4, self.store)
+        league.build_player_df()
+        league.adapter.fetched_weeks.clear()
+
+        league.invalidate_weeks([2])
+        assert league.__dict__.get("player_df") is None
+        assert self.store.weeks("ESPN", 1, 2019) == [1, 3]
+
+        league.build_player_df()
+        assert league.adapter.fetched_weeks == [2]
+        assert self.store.weeks("ESPN", 1, 2019) == [1, 2, 3]
+        assert sorted(league.player_df["Week"].unique()) == [1, 2, 3]
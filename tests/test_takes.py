@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from karen.takes import TakesCache
+
+
+TAKES = pd.DataFrame(
+    {
+        "Year": ["2020", "2020", "2020"],
+        "Week": ["1", "1", "2"],
+        "Team": ["Team A", "Team B", "Team A"],
+        "Team ID": ["1", "2", "1"],
+        "Jake's Ranking": ["2", "1", "1"],
+        "Jake's Analysis": ["Meh", "Good", "Better"],
+    }
+)
+
+
+class TestTakesCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.dir.name, "takes.parquet")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_takes_are_indexed_by_week_and_team(self):
+        cache = TakesCache(
+            snapshot_path=self.snapshot_path, loader=lambda: TAKES
+        )
+
+        takes = cache.get(2020, 1)
+        assert list(takes.columns) == list(TAKES.columns)
+        assert list(takes["Team ID"]) == ["1", "2"]
+        assert cache.get(2020, 3).empty
+
+        assert cache.get_team(2020, 2, 1)["Jake's Analysis"] == "Better"
+        assert cache.get_team(2020, 2, 2) is None
+
+    def test_falls_back_to_the_snapshot(self):
+        TakesCache(
+            snapshot_path=self.snapshot_path, loader=lambda: TAKES
+        ).refresh()
+
+        def fail():
+            raise ConnectionError("Sheets is down")
+
+        cache = TakesCache(snapshot_path=self.snapshot_path, loader=fail)
+        assert cache.get_team(2020, 1, 2)["Jake's Ranking"] == "1"
+
+    def test_snapshot_failures_are_not_fatal(self):
+        # The snapshot's directory can't be created under a file
+        cache = TakesCache(
+            snapshot_path=os.path.join(self.snapshot_path, "takes.parquet"),
+            loader=lambda: TAKES,
+        )
+        open(self.snapshot_path, "w").close()
+
+        cache.refresh()
+        assert len(cache.get(2020, 1)) == 2
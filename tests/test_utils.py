@@ -0,0 +1,248 @@
+import base64
+import json
+import unittest
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import requests
+
+from botocore.exceptions import ClientError
+from espn_api.requests.espn_requests import ESPNAccessDenied, ESPNUnknownError
+from google.auth.exceptions import RefreshError
+
+from karen import utils
+
+
+class StubSecretsClient:
+    def __init__(self, secrets, error_code=None):
+        self.secrets = secrets
+        self.error_code = error_code
+        self.calls = 0
+
+    def get_secret_value(self, SecretId):
+        self.calls += 1
+        if self.error_code:
+            raise ClientError(
+                {"Error": {"Code": self.error_code}}, "GetSecretValue"
+            )
+        return {"SecretString": json.dumps(self.secrets[SecretId])}
+
+
+class TestGetSecrets(unittest.TestCase):
+    def setUp(self):
+        utils.clear_secrets_cache()
+        self.client = StubSecretsClient({"league": {"espn_s2": "abc"}})
+        utils.set_secrets_client(self.client)
+
+    def tearDown(self):
+        utils.clear_secrets_cache()
+
+    def test_secrets_are_cached(self):
+        assert utils.get_secrets("league") == {"espn_s2": "abc"}
+        assert utils.get_secrets("league") == {"espn_s2": "abc"}
+        assert self.client.calls == 1
+
+    def test_refresh_skips_cache(self):
+        utils.get_secrets("league")
+        self.client.secrets["league"] = {"espn_s2": "def"}
+        assert utils.get_secrets("league", refresh=True) == {"espn_s2": "def"}
+        assert self.client.calls == 2
+
+    def test_expired_ttl_refetches(self):
+        utils.get_secrets("league", ttl=0)
+        utils.get_secrets("league", ttl=0)
+        assert self.client.calls == 2
+
+    def test_other_client_errors_are_raised(self):
+        utils.set_secrets_client(
+            StubSecretsClient({}, error_code="ResourceNotFoundException")
+        )
+        with self.assertRaises(ClientError):
+            utils.get_secrets("league")
+
+
+class StubSheetsClient:
+    def __init__(self, values):
+        self.values = values
+
+    def open(self, title):
+        worksheet = SimpleNamespace(get_all_values=lambda: list(self.values))
+        return SimpleNamespace(sheet1=worksheet)
+
+
+class TestGetSpreadsheetTakes(unittest.TestCase):
+    def setUp(self):
+        utils.clear_secrets_cache()
+        self.client = StubSecretsClient(
+            {
+                "fantasy-football-secrets": {
+                    "gcloud_service_file": base64.b64encode(b"{}").decode()
+                }
+            }
+        )
+        utils.set_secrets_client(self.client)
+        self.addCleanup(utils.clear_secrets_cache)
+
+    def test_rejected_credentials_are_refreshed_once(self):
+        sheets = StubSheetsClient([["Year", "Week"], ["2020", "1"]])
+        with patch.object(
+            utils.gspread,
+            "service_account",
+            side_effect=[RefreshError("invalid_grant"), sheets],
+        ):
+            df = utils.get_spreadsheet_takes()
+
+        assert list(df.columns) == ["Year", "Week"]
+        assert len(df) == 1
+        # The cached secret was skipped the second time
+        assert self.client.calls == 2
+
+    def test_other_errors_are_raised(self):
+        with patch.object(
+            utils.gspread, "service_account", side_effect=ValueError("Bad")
+        ):
+            with self.assertRaises(ValueError):
+                utils.get_spreadsheet_takes()
+        assert self.client.calls == 1
+
+
+class StubLeague:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def box_scores(self, week=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return [f"Box score for week {week}"]
+
+
+@patch("time.sleep")
+class TestGetWeekBoxScores(unittest.TestCase):
+    def test_transient_errors_are_retried(self, sleep):
+        league = StubLeague(
+            [
+                requests.ConnectionError("Reset"),
+                requests.Timeout("Slow"),
+                ESPNUnknownError("ESPN returned an HTTP 503"),
+            ]
+        )
+        assert utils.get_week_box_scores(league, 1) == ["Box score for week 1"]
+        assert league.calls == 4
+        assert sleep.call_count == 3
+
+    def test_other_errors_are_raised_right_away(self, sleep):
+        for error in [
+            ESPNAccessDenied("Nope"),
+            ESPNUnknownError("ESPN returned an HTTP 400"),
+            ValueError("Invalid week"),
+        ]:
+            league = StubLeague([error])
+            with self.assertRaises(type(error)):
+                utils.get_week_box_scores(league, 1)
+            assert league.calls == 1
+        sleep.assert_not_called()
+
+    def test_gives_up_after_the_last_retry(self, sleep):
+        league = StubLeague([requests.Timeout("Slow")] * 3)
+        with self.assertRaises(requests.Timeout):
+            utils.get_week_box_scores(league, 1, retries=2)
+        assert league.calls == 3
+
+
+FANTASY_PROS_PAGE = """
+<div class="player-photo"><img alt="Odell Beckham Jr."></div>
+<span class="more">70%</span>
+<span class="same">30%</span>
+"""
+
+
+class StubSession:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        assert timeout == utils.FANTASY_PROS_TIMEOUT
+        self.urls.append(url)
+        page = self.pages.pop(0)
+        if isinstance(page, Exception):
+            raise page
+        return SimpleNamespace(
+            content=page.encode(), text=page, raise_for_status=lambda: None
+        )
+
+
+class TestGetFantasyProsRecommendation(unittest.TestCase):
+    def setUp(self):
+        utils._fantasy_pros_cache.clear()
+        self.addCleanup(utils._fantasy_pros_cache.clear)
+        patch.object(utils._fantasy_pros_limiter, "wait").start()
+        self.addCleanup(patch.stopall)
+
+    def stub_pages(self, *pages):
+        session = StubSession(pages)
+        patch.object(utils, "_fantasy_pros_session", session).start()
+        return session
+
+    def test_hits_are_in_the_callers_names(self):
+        session = self.stub_pages(FANTASY_PROS_PAGE)
+
+        assert utils.get_fantasy_pros_recommendation(
+            "Odell Beckham Jr.", "Davante Adams", week=1
+        ) == {
+            "Odell Beckham Jr.": "70%",
+            "Davante Adams": "30%",
+            "url": utils.FANTASY_PROS_URL.format(
+                "odell-beckham", "davante-adams"
+            ),
+        }
+
+        # Cached, but named and ordered the way this caller asked
+        assert utils.get_fantasy_pros_recommendation(
+            "Davante Adams", "Odell Beckham", week=1
+        ) == {
+            "Odell Beckham": "70%",
+            "Davante Adams": "30%",
+            "url": utils.FANTASY_PROS_URL.format(
+                "davante-adams", "odell-beckham"
+            ),
+        }
+        assert len(session.urls) == 1
+
+    def test_empty_comparisons_are_not_cached(self):
+        session = self.stub_pages("<html></html>", FANTASY_PROS_PAGE)
+
+        assert (
+            utils.get_fantasy_pros_recommendation(
+                "Odell Beckham Jr.", "Davante Adams", week=1
+            )
+            == {}
+        )
+        recommendation = utils.get_fantasy_pros_recommendation(
+            "Odell Beckham Jr.", "Davante Adams", week=1
+        )
+        assert recommendation["Odell Beckham Jr."] == "70%"
+        assert len(session.urls) == 2
+
+    def test_one_failed_pair_does_not_break_the_batch(self):
+        session = self.stub_pages(
+            FANTASY_PROS_PAGE, requests.Timeout("FantasyPros is slow")
+        )
+        pairs = [
+            ("Odell Beckham Jr.", "Davante Adams"),
+            ("Davante Adams", "Tyreek Hill"),
+        ]
+
+        recommendations = utils.get_fantasy_pros_recommendations(
+            pairs, week=1, max_workers=1
+        )
+        assert recommendations[pairs[0]]["Davante Adams"] == "30%"
+        assert recommendations[pairs[1]] == {}
+
+        # The failure isn't cached
+        session.pages.append(FANTASY_PROS_PAGE)
+        utils.get_fantasy_pros_recommendation(*pairs[1], week=1)
+        assert len(session.urls) == 3
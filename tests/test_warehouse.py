@@ -0,0 +1,127 @@
+import tempfile
+import unittest
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pandas as pd
+
+from karen import cleaning, cli
+from karen.warehouse import Warehouse
+
+
+def make_league(year, team_names, winners):
+    """
+    A season of a two team league, where `winners` has the team ID that won
+    each week.
+    """
+    rows = []
+    for week, winner in enumerate(winners, start=1):
+        for team_id, team_name in team_names.items():
+            opponent_id = 3 - team_id
+            rows.append(
+                {
+                    "Week": week,
+                    "Player Name": f"Player {team_id}",
+                    "Points": 100.0 if team_id == winner else 80.0,
+                    "Projected Points": 90.0,
+                    "Projection Diff": 0.0,
+                    "Position": "QB",
+                    "Slot": "QB",
+                    "Team": team_name,
+                    "Team ID": team_id,
+                    "Opponent": team_names[opponent_id],
+                    "Opponent ID": opponent_id,
+                }
+            )
+    player_df = cleaning.apply_player_df_schema(pd.DataFrame(rows))
+    player_df["Cumulative Score"] = cleaning.build_cumulative_scores(player_df)
+    teams_df = pd.DataFrame(
+        {"Team": list(team_names.values()), "Team ID": list(team_names)}
+    )
+    return SimpleNamespace(
+        platform="ESPN",
+        league_id=1,
+        year=year,
+        current_week=len(winners) + 1,
+        player_df=player_df,
+        matchups_df=cleaning.build_matchups_df(player_df),
+        teams_df=teams_df,
+        connect=lambda: None,
+        build_player_df=lambda: None,
+    )
+
+
+LEAGUES = {
+    2019: make_league(2019, {1: "Old Name", 2: "Team B"}, [1, 1, 2]),
+    2020: make_league(2020, {1: "Team A", 2: "Team B"}, [2, 1]),
+}
+
+
+class TestWarehouse(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.warehouse = Warehouse(self.root.name)
+        for league in LEAGUES.values():
+            self.warehouse.ingest(league)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def test_read_is_partitioned_by_year(self):
+        df = self.warehouse.read("ESPN", 1, "players")
+        assert sorted(df["Year"].unique()) == [2019, 2020]
+        assert len(df) == 10
+        cleaning.validate_player_df(df)
+
+        df = self.warehouse.read(
+            "ESPN", 1, "players", years=[2020], columns=["Points"]
+        )
+        assert list(df.columns) == ["Points", "Year"]
+        assert (df["Year"] == 2020).all()
+
+        assert self.warehouse.read("ESPN", 1, "players", years=[2018]) is None
+
+    def test_season_records(self):
+        df = self.warehouse.season_records("ESPN", 1)
+
+        assert list(df["Year"]) == [2019, 2019, 2020, 2020]
+        assert list(df["Team"]) == ["Old Name", "Team B", "Team A", "Team B"]
+        assert list(df["Wins"]) == [2, 1, 1, 1]
+        assert list(df["Points For"]) == [280.0, 260.0, 180.0, 180.0]
+
+    def test_all_time_records(self):
+        df = self.warehouse.all_time_records("ESPN", 1)
+
+        assert list(df["Team"]) == ["Team A", "Team B"]
+        assert list(df["Seasons"]) == [2, 2]
+        assert list(df["Wins"]) == [3, 2]
+        assert list(df["Win %"]) == [0.6, 0.4]
+
+    def test_team_history_and_best_seasons(self):
+        history = self.warehouse.team_history("ESPN", 1, 1)
+        assert list(history["Team"]) == ["Old Name", "Team A"]
+
+        best = self.warehouse.best_seasons("ESPN", 1, n=1)
+        assert list(best[["Year", "Team"]].iloc[0]) == [2019, "Old Name"]
+
+    def test_only_new_seasons_are_ingested(self):
+        with patch.object(cli, "get_league") as get_league:
+            get_league.side_effect = (
+                lambda platform, league_id, year, secret_name: LEAGUES[year]
+            )
+
+            # 2020 is over, so it's never ingested again
+            ingested = cli.ingest(
+                "ESPN", 1, [2019, 2020], "secret", self.warehouse
+            )
+            assert ingested == []
+
+            self.warehouse.root = tempfile.mkdtemp(dir=self.root.name)
+            self.warehouse.ingest(LEAGUES[2019])
+            ingested = cli.ingest(
+                "ESPN", 1, [2019, 2020], "secret", self.warehouse
+            )
+            assert ingested == [2020]
+            get_league.assert_called_once_with("ESPN", 1, 2020, "secret")
+            assert self.warehouse.years("ESPN", 1) == [2019, 2020]
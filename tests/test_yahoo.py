@@ -0,0 +1,169 @@
+import json
+import os
+import tempfile
+import unittest
+
+from unittest.mock import MagicMock, call, patch
+
+from karen import cleaning, utils
+from karen.adapters.yahoo import get_league_key
+from karen.leagues.yahoo import YahooLeague
+from karen.store import SeasonStore
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "yahoo")
+LEAGUE_KEY = "449.l.12345"
+
+# The requests a YahooLeague makes, and the recorded responses to them
+RESPONSES = {
+    f"league/{LEAGUE_KEY}": "league.json",
+    f"league/{LEAGUE_KEY}/standings": "standings.json",
+    f"league/{LEAGUE_KEY}/teams/matchups;weeks=1,2": "matchups.json",
+    **{
+        f"league/{LEAGUE_KEY}/teams/roster;week={week}"
+        f"/players/stats;type=week;week={week}": f"roster_week_{week}.json"
+        for week in [1, 2]
+    },
+}
+
+
+class RecordedHandler:
+    """
+    Serves recorded Yahoo responses instead of going to Yahoo.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, uri):
+        self.requests.append(uri)
+        with open(os.path.join(FIXTURES_DIR, RESPONSES[uri])) as f:
+            return json.load(f)
+
+
+class TestYahooLeague(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.handler = RecordedHandler()
+        self.league = self.get_league(self.handler)
+
+    def tearDown(self):
+        self.store_dir.cleanup()
+
+    def get_league(self, handler):
+        return YahooLeague(
+            LEAGUE_KEY,
+            2024,
+            "secret",
+            store=SeasonStore(self.store_dir.name),
+            handler=handler,
+        )
+
+    def test_player_df_matches_espn_schema(self):
+        self.league.build_player_df()
+        df = self.league.player_df
+
+        cleaning.validate_player_df(df)
+        assert list(df.columns) == list(cleaning.PLAYER_DF_SCHEMA) + [
+            "Cumulative Score"
+        ]
+        assert len(df) == 24
+        assert sorted(df["Week"].unique()) == [1, 2]
+
+        kelce = df[df["Player Name"] == "Travis Kelce"].iloc[0]
+        assert kelce["Position"] == "TE"
+        assert kelce["Opponent"] == "Sunday Funday"
+        assert set(df["Slot"]) >= {"BE", "D/ST", "RB/WR/TE", "IR"}
+
+        # Waiver Wire Warriors are on a bye in week 1
+        bye = df[(df["Week"] == 1) & (df["Team ID"] == 3)]
+        assert (bye["Opponent"] == "").all()
+        assert bye["Opponent ID"].isna().all()
+
+    def test_requests_are_batched(self):
+        self.league.build_player_df()
+
+        # One request for every team's matchups, one per week for rosters
+        assert sorted(self.handler.requests) == sorted(
+            uri for uri in RESPONSES if not uri.endswith("standings")
+        )
+
+    def test_final_weeks_come_from_the_store(self):
+        self.league.build_player_df()
+
+        handler = RecordedHandler()
+        league = self.get_league(handler)
+        league.build_player_df()
+
+        assert not [uri for uri in handler.requests if "roster" in uri]
+        assert league.player_df.equals(self.league.player_df)
+
+    def test_power_rankings_are_the_standings(self):
+        self.league.build_power_rankings_df()
+        df = self.league.power_rankings_df
+
+        assert list(df["Team"]) == [
+            "Sunday Funday",
+            "Gridiron Gurus",
+            "Waiver Wire Warriors",
+        ]
+        assert list(df["Record"]) == ["2-0", "0-1", "0-1"]
+
+    def test_teams(self):
+        team = self.league.get_team("Sunday Funday")
+
+        assert team.record == "2-0"
+        assert team.team["Points For"] == 90.66
+        assert team.free_agents_recommendations.empty
+
+    def test_token_is_refreshed_before_it_expires(self):
+        self.league.oauth = MagicMock()
+        self.league.oauth.token_is_valid.return_value = False
+        self.league._reconnect = MagicMock()
+
+        self.league.settings
+        self.league._reconnect.assert_called_once()
+
+        self.league.oauth.token_is_valid.return_value = True
+        self.league.teams_df
+        self.league._reconnect.assert_called_once()
+
+    def test_rejected_token_is_refreshed_from_secrets(self):
+        rejected = RuntimeError(b'{"error": "oauth_problem=token_rejected"}')
+        self.handler.get = MagicMock(side_effect=[rejected, {"ok": True}])
+        self.league.oauth = MagicMock()
+        new_oauth = MagicMock()
+        self.league._get_oauth = MagicMock(return_value=new_oauth)
+
+        with patch.object(utils, "get_secrets") as get_secrets:
+            assert self.league._get("league") == {"ok": True}
+
+        get_secrets.assert_called_once_with("secret", refresh=True)
+        assert self.league.oauth is new_oauth
+        assert self.handler.sc is new_oauth
+
+        # Anything else isn't retried
+        self.handler.get = MagicMock(side_effect=RuntimeError(b"Not found"))
+        with self.assertRaises(RuntimeError):
+            self.league._get("league")
+        self.handler.get.assert_called_once()
+
+    def test_rejected_token_on_connect(self):
+        league = self.get_league(None)
+        league._connect = MagicMock(
+            side_effect=[KeyError("access_token"), self.handler]
+        )
+
+        with patch.object(utils, "get_secrets") as get_secrets:
+            assert league.yahoo_handler is self.handler
+
+        assert get_secrets.call_args_list == [
+            call("secret"),
+            call("secret", refresh=True),
+        ]
+
+    def test_get_league_key(self):
+        keys = ["449.l.999", "449.l.12345"]
+        assert get_league_key(keys, 12345) == "449.l.12345"
+        with self.assertRaises(ValueError):
+            get_league_key(keys, 1)